@@ -13,9 +13,7 @@ from ..colours import COLOURS
 
 from .playing.renderer import Renderer
 
-import importlib.resources
-import wumpus.levels
-from wumpus import Level
+from wumpus.templates import TEMPLATES
 
 
 class MainMenu(Scene):
@@ -40,8 +38,7 @@ class MainMenu(Scene):
         self.background.fill(COLOURS["zinc_950"])
 
         # Random level for background interesting looking
-        self.map = importlib.resources.read_text(wumpus.levels, "00.json")
-        self.level = Level(self.map)
+        self.level = TEMPLATES.level("00.json")
         self.renderer = Renderer(self.level, fov=90)
 
         # Black layer to fade out background
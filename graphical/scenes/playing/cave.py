@@ -2,7 +2,7 @@ from pygame.math import Vector2
 from .drawable import Drawable, RenderContext
 from dataclasses import dataclass
 from wumpus import Cave
-from wumpus.hazards import BottomlessPit, Superbats, Wumpus
+from wumpus.hazards import BottomlessPit, Sense, Superbats, Wumpus
 from graphical.colours import COLOURS
 import numpy as np
 import pygame as pg
@@ -19,76 +19,68 @@ class DrawableCave(Drawable):
     is_hovered: bool = False
     is_in_shooting_path: bool = False
     show_wumpus: bool = False
+    is_hinted: bool = False
 
     def get_coords(self) -> np.ndarray:
         return np.array(self.cave.coords)
 
+    def get_location(self) -> int:
+        return self.cave.location
+
     def paint(self, surf: pg.Surface, context: RenderContext, offsetx: float):
-        coords = context.get_rotated_coords(self.get_coords())
+        coords = context.cave_coords(self.cave.location)
+        depth = context.cave_depth(self.cave.location)
 
         # Skip caves that are behind the camera
-        if context.perp_dist(coords) <= 0:
+        if depth <= 0:
             return
 
-        center = context.project(coords, surf) + Vector2(offsetx, 0)
-        radius = 100 / context.perp_dist(coords)
+        center = context.cave_center(self.cave.location) + Vector2(offsetx, 0)
+        radius = 100 / depth
+
+        # Circles from the outside in, as (colour, radius scale, radius offset)
+        layers = []
 
         if self.is_hovered:
-            pg.draw.circle(
-                surf,
-                context.apply_depth_fade(COLOURS["yellow_500"], coords),
-                center,
-                radius + 20,
-            )
+            layers.append((COLOURS["yellow_500"], 1, 20))
 
         if self.is_in_shooting_path:
-            pg.draw.circle(
-                surf,
-                context.apply_depth_fade(COLOURS["red_500"], coords),
-                center,
-                radius + 15,
-            )
+            layers.append((COLOURS["red_500"], 1, 15))
+
+        if self.is_hinted:
+            layers.append((COLOURS["emerald_500"], 1, 15))
 
         hazard_in_cave = context.level.get_hazard_in_cave(self.cave)
-        nearby_hazards = context.level.get_nearby_hazards(self.cave)
-        has_nearby_pit = any(
-            isinstance(hazard, BottomlessPit) for hazard in nearby_hazards
-        )
-        has_nearby_bats = any(
-            isinstance(hazard, Superbats) for hazard in nearby_hazards
-        )
+        nearby_senses = context.level.get_nearby_senses(self.cave)
+        has_nearby_pit = Sense.PIT in nearby_senses
+        has_nearby_bats = Sense.BATS in nearby_senses
 
         outline_layers = []
 
         if not hazard_in_cave and self.explored:
             if has_nearby_pit:
-                outline_layers.append((COLOURS["green_500"], radius + 10))
+                outline_layers.append((COLOURS["green_500"], 1, 10))
 
             if has_nearby_bats:
-                outline_layers.append((COLOURS["blue_500"], radius + 5))
+                outline_layers.append((COLOURS["blue_500"], 1, 5))
 
         if not outline_layers:
-            outline_layers.append((COLOURS["zinc_600"], radius + 5))
+            outline_layers.append((COLOURS["zinc_600"], 1, 5))
 
         # Proximity border
-        for color, layer_radius in outline_layers:
-            tinted_color = context.apply_depth_fade(color, coords)
-            pg.draw.circle(surf, tinted_color, center, layer_radius)
+        layers.extend(outline_layers)
 
+        # Main cave circle
         if self.explored:
-            interior_color = COLOURS["zinc_950"]
+            layers.append((COLOURS["zinc_950"], 1, 0))
         else:
-            interior_color = COLOURS["zinc_600"]
-
-        # Draw main cave circle
-        tinted_interior = context.apply_depth_fade(interior_color, coords)
-        pg.draw.circle(surf, tinted_interior, center, radius)
+            layers.append((COLOURS["zinc_600"], 1, 0))
 
         # Wumpus indicator
         if self.near_wumpus:
-            wumpus_radius = radius * 2 / 3
-            tinted_orange = context.apply_depth_fade(COLOURS["orange_500"], coords)
-            pg.draw.circle(surf, tinted_orange, center, wumpus_radius)
+            layers.append((COLOURS["orange_500"], 2 / 3, 0))
+
+        context.draw_disc(surf, tuple(layers), radius, coords, center)
 
         hazard_icon = None
         if self.explored:
@@ -117,15 +109,19 @@ class DrawablePlayer(Drawable):
     def get_coords(self) -> np.ndarray:
         return np.array(self.cave.coords)
 
+    def get_location(self) -> int:
+        return self.cave.location
+
     def paint(self, surf: pg.Surface, context: RenderContext, offsetx: float):
-        coords = context.get_rotated_coords(self.get_coords())
+        coords = context.cave_coords(self.cave.location)
+        depth = context.cave_depth(self.cave.location)
 
         # Skip if behind camera
-        if context.perp_dist(coords) <= 0:
+        if depth <= 0:
             return
 
-        center = context.project(coords, surf) + Vector2(offsetx, 0)
-        size = int(160 / context.perp_dist(coords))
+        center = context.cave_center(self.cave.location) + Vector2(offsetx, 0)
+        size = int(160 / depth)
         opacity = int(255 - 255 * max(0, min(0.5, coords[2])))
 
         if context.player_icon:
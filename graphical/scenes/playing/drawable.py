@@ -26,16 +26,30 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from .renderer import Renderer
+    from .renderer import Projection, Renderer
+    from .sprites import Layer
     from wumpus.level import Level
 
 
 class RenderContext:
     """Provides rendering utilities and dependencies to Drawable objects."""
 
-    def __init__(self, renderer: "Renderer", level: "Level"):
+    def __init__(self, renderer: "Renderer", level: "Level", frame: "Projection"):
         self.renderer = renderer
         self.level = level
+        self.frame = frame
+
+    def cave_coords(self, location: int) -> npt.NDArray:
+        """Get a cave's rotated coordinates in this frame."""
+        return self.frame.rotated[self.renderer.index[location]]
+
+    def cave_depth(self, location: int) -> float:
+        """Get a cave's perpendicular distance along the line of sight in this frame."""
+        return float(self.frame.depth[self.renderer.index[location]])
+
+    def cave_center(self, location: int) -> pg.Vector2:
+        """Get a cave's position on screen in this frame."""
+        return pg.Vector2(*self.frame.screen[self.renderer.index[location]])
 
     def get_rotated_coords(self, coords: npt.NDArray) -> npt.NDArray:
         """Get coordinates rotated by the renderer's current rotation."""
@@ -53,6 +67,17 @@ class RenderContext:
         """Apply depth-based color fading along the line of sight."""
         return self.renderer.apply_depth_fade(color, coords)
 
+    def draw_disc(
+        self,
+        surf: pg.Surface,
+        layers: tuple["Layer", ...],
+        radius: float,
+        coords: npt.NDArray,
+        center: pg.Vector2,
+    ):
+        """Draw a cave's stack of circles, faded by depth, as one sprite."""
+        self.renderer.draw_disc(surf, layers, radius, coords, center)
+
     def draw_icon(
         self,
         surf: pg.Surface,
@@ -89,6 +114,11 @@ class Drawable(ABC):
         """Get the world coordinates of this drawable object."""
         pass
 
+    @abstractmethod
+    def get_location(self) -> int:
+        """Get the cave this object is drawn at, to look up its projection."""
+        pass
+
     @abstractmethod
     def paint(self, surf: pg.Surface, context: RenderContext, offsetx: float):
         """Render this drawable object to the surface."""
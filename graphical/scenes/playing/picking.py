@@ -0,0 +1,57 @@
+"""
+Finds the cave under a point on the screen.
+
+Caves are drawn as circles, so picking one means finding the circles that
+contain the point. Rather than test every cave, PickingGrid divides the screen
+into square cells and lists the caves whose circles overlap each cell, so a
+pick only tests the few caves in the cell under the point.
+"""
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .renderer import Projection
+
+
+class PickingGrid:
+    """
+    A uniform grid over the screen for one projection of the caves. Each cell
+    lists the caves that overlap it, nearest first, so the first cave found
+    under a point is the one drawn on top.
+    """
+
+    def __init__(self, frame: "Projection", size: tuple[int, int], cell_size=64):
+        self.frame = frame
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[int]] = {}
+
+        # Caves behind the camera aren't drawn, so can't be picked
+        visible = np.flatnonzero(frame.depth > 0)
+        nearest = visible[np.argsort(frame.depth[visible], kind="stable")]
+
+        # Only the cells on screen are kept, however large a circle is
+        last = (np.array(size) - 1) // cell_size
+        extent = frame.radius[nearest, np.newaxis]
+        low = np.floor((frame.screen[nearest] - extent) / cell_size).astype(int)
+        high = np.floor((frame.screen[nearest] + extent) / cell_size).astype(int)
+        low = np.maximum(low, 0)
+        high = np.minimum(high, last)
+
+        for index, (x0, y0), (x1, y1) in zip(
+            nearest.tolist(), low.tolist(), high.tolist()
+        ):
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    self.cells.setdefault((x, y), []).append(index)
+
+    def pick(self, x: float, y: float) -> int | None:
+        """Returns the index of the nearest cave containing a point, if any."""
+        cell = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        for index in self.cells.get(cell, ()):
+            cx, cy = self.frame.screen[index]
+            if math.hypot(x - cx, y - cy) <= self.frame.radius[index]:
+                return index
+        return None
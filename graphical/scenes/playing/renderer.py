@@ -15,6 +15,8 @@ import graphical.icons
 from .drawable import RenderContext
 from .cave import DrawableCave, DrawablePlayer
 from .drawable import Drawable
+from .picking import PickingGrid
+from .sprites import CaveAtlas, Layer, SpriteCache
 
 
 @dataclass
@@ -32,6 +34,16 @@ class RotorAnimation:
         ).normalized()
 
 
+@dataclass
+class Projection:
+    """Where a set of points land on the screen, one point per row."""
+
+    rotated: npt.NDArray  # (n, d) rotated coordinates
+    depth: npt.NDArray  # (n,) perpendicular distances from the image plane
+    screen: npt.NDArray  # (n, 2) positions on screen
+    radius: npt.NDArray  # (n,) radii of caves drawn at each point
+
+
 class Renderer:
     """
     Renders a level of abitrary dimension to 2D.
@@ -40,13 +52,20 @@ class Renderer:
     with its third (eg: z) changing to zoom.
     """
 
-    def __init__(self, level: Level, fov: float = 90):
+    def __init__(self, level: Level, fov: float = 90, antialias: bool = False):
         self.level = level
         self.fov = fov
         self.dimension = len(list(self.level.level.values())[0].coords)
         self.algebra = Algebra(self.dimension)  # Clifford algebra
         self.clock = pg.time.Clock()
 
+        # Cave coordinates as rows, so they can be projected all at once
+        self.locations = list(self.level.level.keys())
+        self.index = {location: i for i, location in enumerate(self.locations)}
+        self.coords = np.array(
+            [cave.coords for cave in self.level.level.values()], dtype=float
+        )
+
         self.basis_vectors = list(
             filter(
                 lambda blade: blade[1].grades[0] == 1, list(self.algebra.blades.items())
@@ -56,7 +75,15 @@ class Renderer:
         self.reset_rotor()
         self.reset_zoom()
 
+        # The last projection, and the rotor, camera and screen it was made for
+        self._frame_key: tuple | None = None
+        self._frame: Projection | None = None
+        self._grid: PickingGrid | None = None
+
+        self.sprites = SpriteCache()
+        self.atlas = CaveAtlas(antialias)
         self.load_icons()
+        self.warm_sprites()
 
     def focus_cave(self, cave: Cave):
         coords: MultiVector = self.algebra.vector(
@@ -139,14 +166,60 @@ class Renderer:
             + pg.Vector2(1920, 1080) / 2  # center on screen
         )
 
+    def current_rotor(self) -> MultiVector:
+        """Get the rotor, including any rotation that is being animated."""
+        if self.rotor_animation:
+            return self.rotor_animation.apply_on_rotor(self.rotor)
+        return self.rotor
+
     def rotated(self, coord: npt.NDArray) -> npt.NDArray:
         """Get the roated nD coordinates of a coordinate."""
-        rotor = self.rotor
+        rotor = self.current_rotor()
+        return self.vector_from_multivector(rotor >> self.algebra.vector(coord))
 
-        if self.rotor_animation:
-            rotor = self.rotor_animation.apply_on_rotor(rotor)
+    def rotation_matrix(self) -> npt.NDArray:
+        """
+        Get the current rotation as an n x n matrix. Its columns are the
+        rotated basis vectors, so it takes one sandwich product per dimension
+        rather than one per point.
+        """
+        rotor = self.current_rotor()
+        return np.column_stack(
+            [
+                self.vector_from_multivector(rotor >> blade)
+                for _, blade in self.basis_vectors
+            ]
+        )
 
-        return self.vector_from_multivector(rotor >> self.algebra.vector(coord))
+    def project_all(self, coords: npt.NDArray, screen) -> Projection:
+        """Rotates and projects points given as the rows of an (n, d) array."""
+        rotated = coords @ self.rotation_matrix().T
+        depth = rotated[:, 2] - self.camera_pos[2]
+        scale = screen.get_rect().height / np.maximum(
+            1e-3, depth * math.tan(math.radians(self.fov / 2))
+        )
+        positions = rotated[:, :2] * scale[:, np.newaxis] + np.array([1920, 1080]) / 2
+        radius = 100 / np.maximum(depth, 1e-6)
+        return Projection(rotated, depth, positions, radius)
+
+    def projection(self, screen) -> Projection:
+        """
+        Rotates and projects every cave in the level. The result is reused
+        until the rotor, camera or screen changes, so every part of a frame
+        sees the same positions and each cave is only transformed once.
+        """
+        rotor = self.current_rotor()
+        key = (
+            tuple(rotor.keys()),
+            np.asarray(rotor.values(), dtype=float).tobytes(),
+            self.camera_pos.tobytes(),
+            self.fov,
+            screen.get_rect().height,
+        )
+        if key != self._frame_key or self._frame is None:
+            self._frame_key = key
+            self._frame = self.project_all(self.coords, screen)
+        return self._frame
 
     def apply_depth_fade(self, color, coords: npt.NDArray) -> pg.Color:
         """
@@ -176,6 +249,29 @@ class Renderer:
             graphical.icons, "player.png", COLOURS["yellow_400"]
         )
 
+    def warm_sprites(self):
+        """
+        Renders icons for the depths caves are at before the camera moves, so
+        drawing them at those depths allocates nothing.
+        """
+        distance = -self.camera_pos[2]
+        extent = float(np.linalg.norm(self.coords, axis=1).max(initial=0))
+        nearest, farthest = max(distance - extent, 1), distance + extent
+        opacities = range(128, 257, 16)
+
+        hazard_icons = [self.pit_icon, self.bat_icon, self.wumpus_icon]
+        self.sprites.warm(
+            [icon for icon in hazard_icons if icon],
+            range(int(100 / farthest), int(100 / nearest) + 1),
+            opacities,
+        )
+        if self.player_icon:
+            self.sprites.warm(
+                [self.player_icon],
+                range(int(160 / farthest), int(160 / nearest) + 1),
+                opacities,
+            )
+
     def create_drawables(
         self,
         player_location: int | None,
@@ -184,6 +280,7 @@ class Renderer:
         explored: set[int],
         near_wumpus: set[int],
         show_wumpus: bool,
+        hints: set[int] = set(),
     ) -> list[Drawable]:
         """Create all drawable objects for the level."""
         drawables = []
@@ -199,6 +296,7 @@ class Renderer:
                 is_in_shooting_path=is_in_shooting_path,
                 near_wumpus=cave_location in near_wumpus,
                 show_wumpus=show_wumpus,
+                is_hinted=cave_location in hints,
             )
             drawables.append(drawable_cave)
 
@@ -214,6 +312,7 @@ class Renderer:
                     explored=False,
                     is_hovered=is_hovered,
                     is_in_shooting_path=is_in_shooting_path,
+                    is_hinted=adjacent_cave_location in hints,
                 )
                 drawables.append(drawable_cave)
 
@@ -224,6 +323,17 @@ class Renderer:
 
         return drawables
 
+    def draw_disc(
+        self,
+        surf: pg.surface.Surface,
+        layers: tuple[Layer, ...],
+        radius: float,
+        coords: npt.NDArray,
+        center: pg.Vector2,
+    ):
+        fade = 1.0 - max(0, min(0.5, coords[2]))
+        self.atlas.draw(surf, layers, radius, fade, center)
+
     def draw_icon(
         self,
         surf: pg.surface.Surface,
@@ -234,13 +344,8 @@ class Renderer:
     ):
         if not icon:
             return
-        scaled_icon = pg.transform.scale(icon, (size, size))
-
-        icon_with_alpha = scaled_icon.copy()
-        icon_with_alpha.set_alpha(opacity)
-
-        icon_rect = icon_with_alpha.get_rect(center=center)
-        surf.blit(icon_with_alpha, icon_rect)
+        sprite = self.sprites.icon(icon, size, opacity)
+        surf.blit(sprite, sprite.get_rect(center=center))
 
     def paint(
         self,
@@ -251,6 +356,7 @@ class Renderer:
         explored: set[int] = set(),
         near_wumpus: set[int] = set(),
         show_wumpus: bool = False,
+        hints: set[int] = set(),
         delta: int = 0,
         offsetx=0,
     ):
@@ -258,7 +364,8 @@ class Renderer:
             self.rotor_animation.rotation.update(delta)
 
         """Draws level to screen."""
-        context = RenderContext(self, self.level)
+        frame = self.projection(surf)
+        context = RenderContext(self, self.level, frame)
 
         hovered_cave = self.get_cave_at_pos(mouse_pos)
         drawables = self.create_drawables(
@@ -268,56 +375,53 @@ class Renderer:
             explored,
             near_wumpus,
             show_wumpus,
+            hints,
         )
 
         # Sort by depth (farthest first) so closer objects render on top
         # Objects with larger perpendicular distance along the third basis are farther away
         # Reverse=True means farthest objects are drawn first (painter's algorithm)
         drawables.sort(
-            key=lambda drawable: self.perp_dist(self.rotated(drawable.get_coords())),
+            key=lambda drawable: frame.depth[self.index[drawable.get_location()]],
             reverse=True,
         )
 
-        self._draw_tunnels(surf, explored, offsetx)
+        self._draw_tunnels(surf, explored, offsetx, frame)
 
         for drawable in drawables:
             drawable.paint(surf, context, offsetx)
 
     def get_cave_at_pos(self, pos: pg.Vector2) -> "Cave | None":
         """Get the cave at a given position on the screen."""
-        for cave in sorted(
-            self.level.level.values(),
-            key=lambda cave: self.perp_dist(self.rotated(np.array(cave.coords))),
-            reverse=True,
-        ):
-            coords = self.rotated(np.array(cave.coords))
-            center = self.project(coords, pg.display.get_surface())
-            radius = 100 / max(self.perp_dist(coords), 1e-6)
+        screen = pg.display.get_surface()
+        frame = self.projection(screen)
+        # The grid only needs rebuilding when the caves have moved
+        if self._grid is None or self._grid.frame is not frame:
+            self._grid = PickingGrid(frame, screen.get_size())
 
-            if pos.distance_to(center) <= radius:
-                return cave
-        return None
+        hit = self._grid.pick(pos.x, pos.y)
+        if hit is None:
+            return None
+        return self.level.get_cave(self.locations[hit])
 
     def _draw_tunnels(
-        self, surf: pg.surface.Surface, explored: set[int], offsetx: float
+        self,
+        surf: pg.surface.Surface,
+        explored: set[int],
+        offsetx: float,
+        frame: Projection,
     ):
         """Draw all tunnel connections between caves."""
         drawn = set()
         caves = self.level.level
+        screen = (frame.screen + np.array([offsetx, 0])).tolist()
 
         for location in explored:
             cave = caves[location]
-            coords = self.rotated(np.array(cave.coords))
+            start = screen[self.index[location]]
 
             for edge in cave.tunnels:
-                edge_coords = self.rotated(np.array(caves[edge].coords))
                 if (cave.location, edge) in drawn:
                     continue
-                pg.draw.line(
-                    surf,
-                    COLOURS["zinc_50"],
-                    pg.Vector2(self.project(edge_coords, surf))
-                    + pg.Vector2(offsetx, 0),
-                    pg.Vector2(self.project(coords, surf)) + pg.Vector2(offsetx, 0),
-                )
+                pg.draw.line(surf, COLOURS["zinc_50"], screen[self.index[edge]], start)
                 drawn.add((edge, cave.location))
@@ -1,14 +1,14 @@
 from collections.abc import Iterator
 import typing
 import pygame as pg
-import importlib.resources
 
 from graphical.animate import Animator
 from graphical.progress import LevelScore
 from graphical.scenes.win import Win
-from wumpus import Level, PlayerController
-from wumpus.hazards import Wumpus
-import wumpus.levels
+from wumpus import PlayerController
+from wumpus.belief import Belief
+from wumpus.hazards import BottomlessPit, Sense
+from wumpus.templates import TEMPLATES
 
 from graphical.scene import PushScene, Scene, SceneEvent, SwitchScene
 from graphical.colours import COLOURS
@@ -40,15 +40,17 @@ class Playing(Scene):
             f"Level {level_index + 1}", True, COLOURS["zinc_600"]
         )
 
-        self.map = importlib.resources.read_text(
-            wumpus.levels, f"{level_index:02}.json"
-        )
-        self.level = Level(self.map)
+        self.level = TEMPLATES.level(f"{level_index:02}.json")
         self.player = PlayerController(self.level)
 
         self.explored = {self.player.cave.location}
         self.wumpus_indicators: set[int] = set()
 
+        # What the player could have worked out so far, for hints
+        self.belief = Belief(self.level)
+        self.show_hint = False
+        self.observe()
+
         self.renderer = Renderer(self.level, fov=90)
         self.renderer.focus_cave(self.player.cave)
 
@@ -65,6 +67,26 @@ class Playing(Scene):
         self.pause_button.bg_colour = COLOURS["blue_900"]
         self.pause_button.hover_colour = COLOURS["blue_800"]
 
+    def observe(self):
+        cave = self.player.cave
+        self.belief.visit(cave.location, self.level.get_nearby_senses(cave))
+
+    def learn_from_move(self, target: int):
+        """Updates the belief with what a move into a cave revealed."""
+        landed = self.player.cave.location
+        if landed != target:
+            # Snatched by superbats
+            self.belief.found(target, Sense.BATS)
+
+        if self.player.alive:
+            self.observe()
+        elif isinstance(self.level.hazards.get(landed), BottomlessPit):
+            self.belief.found(landed, Sense.PIT)
+        else:
+            # Eaten by the Wumpus, which was startled and may have moved on
+            self.belief.found(landed, Sense.WUMPUS)
+            self.belief.missed([])
+
     def start_death_fade(self):
         self.death_fade = Animator(127, 0, 500, self.end_death_fade)
         self.death_fade.start()
@@ -91,6 +113,7 @@ class Playing(Scene):
         if event.button == 1:  # Left mouse button
             if clicked_cave.location in self.player.cave.tunnels:
                 self.player.move(clicked_cave.location)
+                self.learn_from_move(clicked_cave.location)
                 self.renderer.focus_cave(self.player.cave)
                 self.explored.add(self.player.cave.location)
                 self.explored.add(clicked_cave.location)
@@ -115,6 +138,7 @@ class Playing(Scene):
         self.player.respawn()
         self.renderer.focus_cave(self.player.cave)
         self.wumpus_indicators = set()
+        self.observe()
 
     def update(self) -> Iterator[SceneEvent]:
         up = button_up()
@@ -129,9 +153,14 @@ class Playing(Scene):
                 case pg.K_RETURN:
                     if self.shooting_path:
                         self.player.shoot(self.shooting_path)
+                        if not self.player.win:
+                            self.belief.missed(self.shooting_path)
+                            self.observe()
                         self.shooting_path = []
                 case pg.K_c:
                     self.shooting_path = []
+                case pg.K_h:
+                    self.show_hint = not self.show_hint
 
         # Respawn and flash red on death
         if not self.player.alive:
@@ -154,11 +183,8 @@ class Playing(Scene):
                 )
             )
 
-        for location in self.player.cave.tunnels:
-            if isinstance(
-                self.level.get_hazard_in_cave(self.level.get_cave(location)), Wumpus
-            ):
-                self.wumpus_indicators.add(self.player.cave.location)
+        if Sense.WUMPUS in self.level.get_nearby_senses(self.player.cave):
+            self.wumpus_indicators.add(self.player.cave.location)
 
         for event in pg.event.get(eventtype=pg.MOUSEBUTTONUP):
             self.handle_mouse_click(event)
@@ -201,6 +227,11 @@ class Playing(Scene):
             self.explored,
             self.wumpus_indicators,
             self.player.win,
+            hints=(
+                set(self.belief.hint(self.player.cave.location))
+                if self.show_hint
+                else set()
+            ),
             delta=delta,
         )
 
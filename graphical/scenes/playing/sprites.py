@@ -0,0 +1,152 @@
+"""
+Caches of pre-rendered surfaces, so drawing a frame only blits.
+
+Caves and icons are drawn at sizes and opacities that change smoothly with
+depth. Rounding them to a few steps lets the few surfaces actually drawn be
+made once and reused, rather than scaled and copied for every cave in every
+frame.
+"""
+
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+
+import pygame as pg
+
+from graphical.utils import apply_fade
+
+OPACITY_STEP = 16
+FADE_STEPS = 32
+SUPERSAMPLING = 4
+
+# A circle in a cave's disc: its colour, and its radius as a multiple of the
+# cave's radius plus an offset in pixels
+Layer = tuple[tuple[int, int, int], float, float]
+
+
+def quantize_opacity(opacity: int) -> int:
+    """Rounds an opacity to the nearest step, keeping fully opaque exact."""
+    return min(255, round(opacity / OPACITY_STEP) * OPACITY_STEP)
+
+
+class SpriteCache:
+    """
+    A least recently used cache of surfaces, evicting the oldest once the
+    surfaces take up more than `budget` bytes. A surface larger than the whole
+    budget is never kept.
+    """
+
+    def __init__(self, budget=8 * 1024 * 1024):
+        self.budget = budget
+        self.size = 0
+        self.sprites: OrderedDict[Hashable, pg.Surface] = OrderedDict()
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def get(self, key: Hashable) -> pg.Surface | None:
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+        return sprite
+
+    def put(self, key: Hashable, sprite: pg.Surface):
+        if key in self.sprites:
+            self.size -= self._bytes(self.sprites.pop(key))
+        if self._bytes(sprite) > self.budget:
+            return
+        self.sprites[key] = sprite
+        self.size += self._bytes(sprite)
+        while self.size > self.budget:
+            _, evicted = self.sprites.popitem(last=False)
+            self.size -= self._bytes(evicted)
+
+    @staticmethod
+    def _bytes(sprite: pg.Surface) -> int:
+        return sprite.get_pitch() * sprite.get_height()
+
+    def icon(self, icon: pg.Surface, size: int, opacity: int) -> pg.Surface:
+        """Returns an icon scaled to `size` with about the given opacity."""
+        opacity = quantize_opacity(opacity)
+        key = (icon, size, opacity)
+        sprite = self.get(key)
+        if sprite is None:
+            sprite = pg.transform.scale(icon, (size, size))
+            sprite.set_alpha(opacity)
+            self.put(key, sprite)
+        return sprite
+
+    def warm(self, icons: Iterable[pg.Surface], sizes: range, opacities: range):
+        """Renders icons ahead of time, for the sizes and opacities expected."""
+        for icon in icons:
+            for size in sizes:
+                for opacity in opacities:
+                    self.icon(icon, size, opacity)
+
+
+class CaveAtlas:
+    """
+    Pre-rendered cave discs, each a stack of filled circles drawn from the
+    outside in, so a cave is drawn with a single blit. Discs are rendered
+    when first needed, for whole radii and a few steps of depth fade, and
+    kept in a SpriteCache.
+
+    Caves close to the camera can be far larger than the screen, so discs with
+    a radius over `max_radius` are drawn straight onto the screen instead,
+    where drawing is clipped to what is visible.
+
+    With `antialias`, discs are supersampled so their edges are smooth.
+    """
+
+    def __init__(self, antialias=False, budget=16 * 1024 * 1024, max_radius=128):
+        self.antialias = antialias
+        self.sprites = SpriteCache(budget)
+        self.max_radius = max_radius
+
+    def draw(
+        self,
+        surf: pg.Surface,
+        layers: tuple[Layer, ...],
+        radius: float,
+        fade: float,
+        center: pg.Vector2,
+    ):
+        """Draws a disc centred on a point."""
+        if radius > self.max_radius:
+            for colour, scale, offset in layers:
+                layer_radius = radius * scale + offset
+                pg.draw.circle(surf, apply_fade(colour, fade), center, layer_radius)
+            return
+
+        sprite = self.disc(layers, radius, fade)
+        surf.blit(sprite, sprite.get_rect(center=center))
+
+    def disc(self, layers: tuple[Layer, ...], radius: float, fade: float):
+        """Returns the disc for some layers, centred in its surface."""
+        if radius > self.max_radius:
+            raise ValueError(f"radius {radius} is too large for the atlas")
+        radius = round(radius)
+        fade = round(fade * FADE_STEPS) / FADE_STEPS
+        key = (layers, radius, fade)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self._render(layers, radius, fade)
+            self.sprites.put(key, sprite)
+        return sprite
+
+    def _render(self, layers: tuple[Layer, ...], radius: int, fade: float):
+        extent = max(
+            (radius * scale + offset for _, scale, offset in layers), default=0
+        )
+        half = int(extent) + 2
+
+        # Anti-aliased discs are drawn larger and smoothly scaled down
+        factor = SUPERSAMPLING if self.antialias else 1
+        sprite = pg.Surface((2 * half * factor, 2 * half * factor), pg.SRCALPHA)
+        center = (half * factor, half * factor)
+        for colour, scale, offset in layers:
+            layer_radius = (radius * scale + offset) * factor
+            pg.draw.circle(sprite, apply_fade(colour, fade), center, layer_radius)
+
+        if self.antialias:
+            sprite = pg.transform.smoothscale(sprite, (2 * half, 2 * half))
+        return sprite
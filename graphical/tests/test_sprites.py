@@ -0,0 +1,37 @@
+import unittest
+
+import pygame as pg
+
+from graphical.scenes.playing.sprites import CaveAtlas, SpriteCache
+
+LAYERS = (((255, 0, 0), 1, 5), ((0, 0, 255), 1, 0))
+
+
+class TestSpriteCache(unittest.TestCase):
+    def test_budget(self):
+        cache = SpriteCache(budget=4 * 16 * 16 * 3)
+        for key in range(4):
+            cache.put(key, pg.Surface((16, 16), pg.SRCALPHA))
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get(0))
+        self.assertLessEqual(cache.size, cache.budget)
+
+        # Sprites larger than the whole budget are never kept
+        cache.put("large", pg.Surface((64, 64), pg.SRCALPHA))
+        self.assertIsNone(cache.get("large"))
+        self.assertEqual(len(cache), 3)
+
+
+class TestCaveAtlas(unittest.TestCase):
+    def test_large_discs_drawn_directly(self):
+        for antialias in (False, True):
+            atlas = CaveAtlas(antialias, budget=1024 * 1024, max_radius=64)
+            surf = pg.Surface((200, 100))
+            atlas.draw(surf, LAYERS, 20, 1.0, pg.Vector2(50, 50))
+            self.assertEqual(len(atlas.sprites), 1)
+
+            # A cave right in front of the camera
+            atlas.draw(surf, LAYERS, 100000, 1.0, pg.Vector2(100, 50))
+            self.assertEqual(len(atlas.sprites), 1)
+            self.assertLessEqual(atlas.sprites.size, atlas.sprites.budget)
+            self.assertEqual(surf.get_at((199, 99)), pg.Color(0, 0, 255))
@@ -0,0 +1,4 @@
+"""
+Level generators. Use `python -m level_gen` or `level_gen.build` to generate
+levels; each shape module can also be run on its own to write its default level.
+"""
@@ -0,0 +1,52 @@
+"""
+Generates levels from the command line:
+
+    python -m level_gen dodecahedron tesseract:dimension=5 --out-dir levels
+    python -m level_gen mobius:edge_length=1000 --format binary
+    python -m level_gen polytope:family=cube,dimension=16 --format binary
+    python -m level_gen surface:surface=klein-bottle,width=2000,height=1000 -f binary
+    python -m level_gen edges:path=network.txt random:caves=100000,degree=3
+"""
+
+import argparse
+import sys
+
+from .build import SHAPES, build
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m level_gen",
+        description="Generates levels, skipping any that are already up to date.",
+    )
+    parser.add_argument(
+        "specs",
+        nargs="*",
+        help='shapes to generate, like "tesseract" or "tesseract:dimension=5"',
+    )
+    parser.add_argument("-o", "--out-dir", default=".")
+    parser.add_argument("-f", "--format", choices=["json", "binary"], default="json")
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="number of processes (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="regenerate levels even if up to date"
+    )
+    parser.add_argument("--list", action="store_true", help="list available shapes")
+    args = parser.parse_args()
+
+    if args.list or not args.specs:
+        print("\n".join(SHAPES))
+        return
+
+    try:
+        written = build(args.specs, args.out_dir, args.format, args.jobs, args.force)
+    except ValueError as error:
+        parser.error(str(error))
+
+    for path in written:
+        print(f"wrote {path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmarks graph_from_edge_length on lattices of increasing size, printing the
+results as JSON:
+
+    python -m level_gen.bench
+    python -m level_gen.bench --sizes 1000 100000 --dimension 4
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from .common import graph_from_edge_length
+
+
+def lattice(vertices: int, dimension: int) -> list[np.ndarray]:
+    """
+    Returns about `vertices` points of a cubic lattice with unit spacing, each
+    jittered a little so that edges are only found within the tolerance.
+    """
+    side = max(2, round(vertices ** (1 / dimension)))
+    axes = np.meshgrid(*[np.arange(side, dtype=np.float64)] * dimension)
+    points = np.stack(axes, axis=-1).reshape(-1, dimension)
+    points += np.random.default_rng(0).uniform(-1e-3, 1e-3, points.shape)
+    return list(points)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m level_gen.bench")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="*",
+        default=[10**2, 10**3, 10**4, 10**5],
+        help="approximate vertex counts",
+    )
+    parser.add_argument("-d", "--dimension", type=int, default=3)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", help="write results to a file")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    report = {"dimension": args.dimension, "repeat": args.repeat, "sizes": []}
+    for size in args.sizes:
+        coords = lattice(size, args.dimension)
+        print(f"benchmarking {len(coords)} vertices", file=sys.stderr)
+
+        best = math.inf
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            nodes = graph_from_edge_length(coords, 1, 1e-2)
+            best = min(best, time.perf_counter() - start)
+
+        report["sizes"].append(
+            {
+                "vertices": len(coords),
+                "edges": sum(len(node.edges) for node in nodes) // 2,
+                "seconds": best,
+            }
+        )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fp:
+            fp.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
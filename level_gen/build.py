@@ -0,0 +1,164 @@
+"""
+Builds levels from shape specs, in parallel, skipping levels that are already
+up to date.
+
+A spec names a shape from SHAPES and its parameters, like
+"tesseract:dimension=5" or "polytope:family=600-cell,truncated=True". Each
+level's inputs (the spec, the output format and the source code of its
+generator) are hashed into a manifest in the output directory, so rebuilding
+only regenerates levels whose inputs have changed.
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import re
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+from . import (
+    common,
+    dodecahedron,
+    icosahedron,
+    layout,
+    mobius,
+    octaplex,
+    polytope,
+    surface,
+    tesseract,
+)
+from .common import LevelStream, Node, dump, dump_binary
+
+type Format = Literal["json", "binary"]
+
+SHAPES: dict[str, Callable[..., list[Node] | LevelStream]] = {
+    "dodecahedron": dodecahedron.generate,
+    "edges": layout.generate,
+    "icosahedron": icosahedron.generate,
+    "mobius": mobius.generate,
+    "octaplex": octaplex.generate,
+    "polytope": polytope.generate,
+    "random": layout.generate_random,
+    "surface": surface.generate,
+    "tesseract": tesseract.generate,
+}
+
+EXTENSIONS: dict[Format, str] = {"json": ".json", "binary": ".lvl"}
+
+MANIFEST = ".manifest.json"
+
+
+@dataclass(frozen=True)
+class Spec:
+    shape: str
+    params: tuple[tuple[str, object], ...] = ()
+
+    @classmethod
+    def parse(cls, spec: str) -> "Spec":
+        """Parses "shape" or "shape:key=value,key=value"."""
+        shape, _, rest = spec.partition(":")
+        if shape not in SHAPES:
+            raise ValueError(f"unknown shape {shape!r}")
+
+        params = {}
+        for param in filter(None, rest.split(",")):
+            key, equals, value = param.partition("=")
+            if not equals:
+                raise ValueError(f"expected key=value, got {param!r}")
+            try:
+                params[key.strip()] = ast.literal_eval(value.strip())
+            except (ValueError, SyntaxError):
+                params[key.strip()] = value.strip()
+        return cls(shape, tuple(sorted(params.items())))
+
+    def filename(self, format: Format) -> str:
+        name = self.shape
+        for key, value in self.params:
+            if isinstance(value, str) and Path(value).is_file():
+                value = Path(value).stem
+            name += f"-{key}=" + re.sub(r"[^\w.+-]", "_", str(value))
+        return name + EXTENSIONS[format]
+
+    def digest(self, format: Format) -> str:
+        """Hashes everything that determines the output of this spec."""
+        generator = SHAPES[self.shape]
+        digest = hashlib.sha256()
+        digest.update(json.dumps([self.shape, self.params, format]).encode())
+        for module in (inspect.getmodule(generator), common):
+            digest.update(Path(inspect.getfile(module)).read_bytes())
+
+        # Shapes read from files, like edge lists, depend on the file too
+        for _, value in self.params:
+            if isinstance(value, str) and Path(value).is_file():
+                digest.update(Path(value).read_bytes())
+        return digest.hexdigest()
+
+
+def generate(spec: Spec | str) -> list[Node] | LevelStream:
+    """Generates the nodes of a level."""
+    if isinstance(spec, str):
+        spec = Spec.parse(spec)
+    return SHAPES[spec.shape](**dict(spec.params))
+
+
+def _write(spec: Spec, path: Path, format: Format):
+    level = generate(spec)
+    match format, level:
+        case "json", LevelStream():
+            level.dump(str(path))
+        case "binary", LevelStream():
+            level.dump_binary(str(path))
+        case "json", _:
+            dump(level, str(path))
+        case "binary", _:
+            dump_binary(level, str(path))
+
+
+def build(
+    specs: Iterable[Spec | str],
+    out_dir: str | Path = ".",
+    format: Format = "json",
+    jobs: int | None = None,
+    force=False,
+) -> list[Path]:
+    """
+    Generates levels into `out_dir` across a pool of `jobs` processes, returning
+    the paths that were written. Levels whose inputs match the manifest are
+    skipped unless `force` is set.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST
+    manifest: dict[str, str] = (
+        json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    )
+
+    pending: dict[Path, tuple[Spec, str]] = {}
+    for spec in specs:
+        if isinstance(spec, str):
+            spec = Spec.parse(spec)
+        path = out_dir / spec.filename(format)
+        digest = spec.digest(format)
+        if force or not path.exists() or manifest.get(path.name) != digest:
+            pending[path] = (spec, digest)
+
+    if jobs == 1:
+        for path, (spec, _) in pending.items():
+            _write(spec, path, format)
+    else:
+        with ProcessPoolExecutor(jobs) as executor:
+            futures = [
+                executor.submit(_write, spec, path, format)
+                for path, (spec, _) in pending.items()
+            ]
+            for future in futures:
+                future.result()
+
+    for path, (_, digest) in pending.items():
+        manifest[path.name] = digest
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return list(pending)
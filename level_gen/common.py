@@ -1,9 +1,12 @@
 import json
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
 import numpy as np
 import numpy.typing as npt
 import math
 
+from wumpus.binary import LevelWriter
+
 
 @dataclass
 class Node:
@@ -12,6 +15,55 @@ class Node:
     vector: npt.NDArray
 
 
+# The tunnel counts, concatenated tunnels and (k, d) coordinates of k caves
+type Batch = tuple[npt.NDArray, npt.NDArray, npt.NDArray]
+
+
+@dataclass
+class LevelStream:
+    """
+    A level generated in batches of caves, for levels too large to hold as a
+    list of Nodes. `batches` is called each time the level is written.
+    """
+
+    caves: int
+    dimension: int
+    batches: Callable[[], Iterator[Batch]]
+
+    def nodes(self) -> list[Node]:
+        nodes: list[Node] = []
+        for degrees, neighbours, coords in self.batches():
+            splits = np.cumsum(degrees)[:-1]
+            for edges, vector in zip(np.split(neighbours, splits), coords):
+                nodes.append(Node(len(nodes), edges.tolist(), vector))
+        return nodes
+
+    def dump(self, file: str):
+        """Exports the level to JSON, in the same form as `dump`"""
+        location = 0
+        with open(file, "w") as fp:
+            fp.write("[")
+            for degrees, neighbours, coords in self.batches():
+                splits = np.cumsum(degrees)[:-1]
+                for edges, vector in zip(np.split(neighbours, splits), coords):
+                    if location:
+                        fp.write(", ")
+                    entry = {
+                        "location": location,
+                        "tunnels": edges.tolist(),
+                        "coords": vector.tolist(),
+                    }
+                    fp.write(json.dumps(entry))
+                    location += 1
+            fp.write("]")
+
+    def dump_binary(self, file: str):
+        """Exports the level to the binary level format"""
+        with LevelWriter(file, self.caves, self.dimension) as writer:
+            for batch in self.batches():
+                writer.write(*batch)
+
+
 def graph_from_edge_length(
     coords: list[npt.NDArray], edge_length: float, tolerance: float
 ) -> list[Node]:
@@ -20,19 +72,91 @@ def graph_from_edge_length(
     are joined by an edge only when it is within a tolerance
     of a given edge length.
     """
-    nodes: list[Node] = []
+    points = np.asarray(coords, dtype=np.float64).reshape(len(coords), -1)
+    sources, targets = _edges(points, edge_length, tolerance)
+
+    # Edges come out sorted by source then target, so split them per node
+    splits = np.searchsorted(sources, np.arange(1, len(coords)))
+    return [
+        Node(i, edges.tolist(), vector)
+        for i, (edges, vector) in enumerate(zip(np.split(targets, splits), coords))
+    ]
+
+
+def _edges(
+    points: npt.NDArray, edge_length: float, tolerance: float
+) -> tuple[npt.NDArray, npt.NDArray]:
+    """
+    Finds every ordered pair of points whose distance is within the tolerance of
+    the edge length, sorted by the first point and then the second.
 
-    for i, a in enumerate(coords):
-        edges = []
-        for j, b in enumerate(coords):
-            if i == j:
-                continue
-            if abs(math.sqrt(np.dot((b - a), (b - a))) - edge_length) < 1e-2:
-                edges.append(j)
+    Points are hashed into a grid of cells as wide as the longest possible edge,
+    so only points in neighbouring cells need to be compared. When the grid is
+    too fine or has too many dimensions for that to pay off, every pair is
+    compared instead, a block of rows at a time.
+    """
+    n, dimension = points.shape
+    reach = edge_length + tolerance
 
-        nodes.append(Node(i, edges, a))
+    keys = None
+    if n and reach > 0 and 3**dimension <= n:
+        keys = _cell_keys(points, reach)
 
-    return nodes
+    if keys is None:
+        candidates = _all_pairs(n, dimension)
+    else:
+        candidates = _neighbouring_pairs(*keys)
+
+    sources, targets = [], []
+    for i, j in candidates:
+        distance = np.linalg.norm(points[j] - points[i], axis=1)
+        keep = (np.abs(distance - edge_length) < tolerance) & (i != j)
+        sources.append(i[keep])
+        targets.append(j[keep])
+
+    sources = np.concatenate(sources) if sources else np.zeros(0, np.int64)
+    targets = np.concatenate(targets) if targets else np.zeros(0, np.int64)
+    order = np.lexsort((targets, sources))
+    return sources[order], targets[order]
+
+
+def _cell_keys(points: npt.NDArray, size: float):
+    """
+    Returns the key of each point's grid cell along with the key offsets of the
+    3^d neighbouring cells, or None if the keys would overflow.
+    """
+    cells = np.floor((points - points.min(axis=0)) / size).astype(np.int64)
+
+    # Pad by one cell on each side, so neighbouring keys never wrap around
+    extents = cells.max(axis=0) + 3
+    if math.prod(map(int, extents)) >= 2**62:
+        return None
+    strides = np.cumprod(np.concatenate(([1], extents[:-1])))
+
+    shifts = np.stack(np.meshgrid(*[[-1, 0, 1]] * len(strides)), axis=-1)
+    return (cells + 1) @ strides, shifts.reshape(-1, len(strides)) @ strides
+
+
+def _neighbouring_pairs(keys: npt.NDArray, shifts: npt.NDArray):
+    """Yields candidate pairs of points in neighbouring cells, a shift at a time."""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    for shift in shifts:
+        start = np.searchsorted(sorted_keys, keys + shift, "left")
+        stop = np.searchsorted(sorted_keys, keys + shift, "right")
+        counts = stop - start
+        i = np.repeat(np.arange(len(keys)), counts)
+        steps = np.arange(len(i)) - np.repeat(np.cumsum(counts) - counts, counts)
+        yield i, order[np.repeat(start, counts) + steps]
+
+
+def _all_pairs(n: int, dimension: int, block_size=2**22):
+    """Yields every pair of points, in blocks of about `block_size` values."""
+    rows = max(1, block_size // max(1, n * dimension))
+    for start in range(0, n, rows):
+        i = np.repeat(np.arange(start, min(start + rows, n)), n)
+        yield i, np.tile(np.arange(n), len(i) // n if n else 0)
 
 
 def dump(nodes: list[Node], file: str):
@@ -49,3 +173,15 @@ def dump(nodes: list[Node], file: str):
             ],
             fp,
         )
+
+
+def dump_binary(nodes: list[Node], file: str):
+    """Exports nodes to the binary level format"""
+    nodes = sorted(nodes, key=lambda node: node.index)
+    dimension = len(nodes[0].vector) if nodes else 0
+    with LevelWriter(file, len(nodes), dimension) as writer:
+        writer.write(
+            [len(node.edges) for node in nodes],
+            [edge for node in nodes for edge in node.edges],
+            np.array([node.vector for node in nodes], dtype=np.float64),
+        )
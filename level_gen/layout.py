@@ -0,0 +1,275 @@
+"""
+Force-directed layout, for turning graphs with no geometry of their own into
+levels.
+
+Tunnels pull caves together and every cave pushes the others away, in the
+style of Fruchterman and Reingold. To scale to large graphs, the layout is
+multilevel: the graph is repeatedly coarsened by merging each cave into a
+nearby cluster, the smallest graph is laid out first, and each finer graph
+starts from the positions of its clusters and only needs a few iterations of
+local refinement. Repulsion is approximated on a grid: each cave is only pushed
+by the centroids of the caves in its own and neighbouring grid cells, so an
+iteration costs O(n 3^d) rather than O(n²).
+
+    python -m level_gen edges:path=network.txt,dimension=3
+"""
+
+import math
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from .common import Batch, LevelStream
+
+type Graph = tuple[npt.NDArray, npt.NDArray]  # CSR offsets and neighbours
+
+
+def _to_csr(caves: int, sources: npt.NDArray, targets: npt.NDArray) -> Graph:
+    """Builds a two-way graph from tunnels, dropping loops and duplicates."""
+    keep = sources != targets
+    sources, targets = sources[keep], targets[keep]
+    joined = np.unique(
+        np.concatenate([sources * caves + targets, targets * caves + sources])
+    )
+    offsets = np.zeros(caves + 1, dtype=np.int64)
+    np.cumsum(np.bincount(joined // caves, minlength=caves), out=offsets[1:])
+    return offsets, joined % caves
+
+
+def read_edge_list(path: str | Path) -> tuple[Graph, list[str]]:
+    """
+    Reads a graph from a file with one tunnel per line, written as two cave
+    names separated by whitespace or a comma. Anything after the first two
+    names is ignored, as are blank lines and lines starting with # or %.
+    Returns the graph and the name of each cave, in order of first appearance.
+    """
+    names: dict[str, int] = {}
+    sources, targets = [], []
+    with open(path) as fp:
+        for line in fp:
+            fields = re.split(r"[\s,]+", line.strip())
+            if len(fields) < 2 or fields[0].startswith(("#", "%")):
+                continue
+            sources.append(names.setdefault(fields[0], len(names)))
+            targets.append(names.setdefault(fields[1], len(names)))
+
+    graph = _to_csr(
+        len(names), np.array(sources, np.int64), np.array(targets, np.int64)
+    )
+    return graph, list(names)
+
+
+def random_regular(caves: int, degree: int, seed=0) -> Graph:
+    """
+    Generates a random graph where nearly every cave has `degree` tunnels, by
+    pairing up tunnel ends at random and dropping loops and duplicate tunnels.
+    """
+    if caves * degree % 2:
+        raise ValueError("caves * degree must be even")
+    ends = np.random.default_rng(seed).permutation(np.repeat(np.arange(caves), degree))
+    return _to_csr(caves, ends[0::2], ends[1::2])
+
+
+def _coarsen(
+    graph: Graph, rng: np.random.Generator
+) -> tuple[Graph, npt.NDArray] | None:
+    """
+    Merges each cave into the cluster of the highest ranked cave among itself
+    and its neighbours, returning the graph of clusters and the cluster of
+    each cave, or None if that barely shrinks the graph.
+    """
+    offsets, neighbours = graph
+    caves = len(offsets) - 1
+    degrees = np.diff(offsets)
+
+    rank = rng.permutation(caves)
+    best = rank.copy()
+    has_tunnels = degrees > 0
+    best[has_tunnels] = np.minimum(
+        best[has_tunnels],
+        np.minimum.reduceat(rank[neighbours], offsets[:-1][has_tunnels]),
+    )
+    _, cluster = np.unique(best, return_inverse=True)
+    clusters = cluster.max() + 1
+    if clusters > 0.9 * caves:
+        return None
+
+    sources = np.repeat(cluster, degrees)
+    return _to_csr(clusters, sources, cluster[neighbours]), cluster
+
+
+def _shifts(dimension: int) -> npt.NDArray:
+    """The offsets of the grid cells whose caves push on a cave."""
+    if dimension <= 4:
+        return np.stack(np.meshgrid(*[[-1, 0, 1]] * dimension), axis=-1).reshape(
+            -1, dimension
+        )
+
+    # In higher dimensions 3^d cells is too many, so only use the cells that
+    # share a face
+    eye = np.eye(dimension, dtype=np.int64)
+    return np.concatenate([np.zeros((1, dimension), np.int64), eye, -eye])
+
+
+def _repulsion(positions: npt.NDArray, length: float, shifts: npt.NDArray):
+    """
+    Approximates the repulsive force on each cave using grid cells. Caves are
+    pushed by the other caves in their own cell individually, and by the
+    neighbouring cells as a whole, from cell centroid to cell centroid.
+    """
+    caves, dimension = positions.shape
+    size = 2 * length
+    while True:
+        cells = np.floor((positions - positions.min(axis=0)) / size).astype(np.int64)
+        extents = cells.max(axis=0) + 3
+        if math.prod(map(int, extents)) < 2**62:
+            break
+        size *= 2  # the layout has spread too far to key the cells, so coarsen
+
+    strides = np.cumprod(np.concatenate(([1], extents[:-1])))
+    keys = (cells + 1) @ strides
+    unique, cell = np.unique(keys, return_inverse=True)
+    counts = np.bincount(cell).astype(np.float64)
+    sums = np.stack(
+        [np.bincount(cell, positions[:, axis]) for axis in range(dimension)], -1
+    )
+    centroids = sums / counts[:, np.newaxis]
+    softening = (0.01 * length) ** 2
+
+    def strength(away: npt.NDArray, count: npt.NDArray) -> npt.NDArray:
+        distance2 = np.einsum("...i,...i->...", away, away) + softening
+        return length * length * count / distance2
+
+    # Between neighbouring cells, a block of cells at a time
+    cell_force = np.empty_like(centroids)
+    offsets = shifts @ strides
+    for start in range(0, len(unique), 4096):
+        block = slice(start, start + 4096)
+        neighbouring = unique[block, np.newaxis] + offsets
+        index = np.minimum(np.searchsorted(unique, neighbouring), len(unique) - 1)
+        count = np.where(unique[index] == neighbouring, counts[index], 0)
+        count[:, offsets == 0] = 0
+        away = centroids[block, np.newaxis] - centroids[index]
+        cell_force[block] = np.einsum("bsi,bs->bi", away, strength(away, count))
+
+    # Within each cell, from the centroid of the other caves
+    others = counts[cell] - 1
+    centroid = (sums[cell] - positions) / np.maximum(others, 1)[:, np.newaxis]
+    away = positions - centroid
+    return cell_force[cell] + away * strength(away, others)[:, np.newaxis]
+
+
+def _refine(
+    positions: npt.NDArray,
+    graph: Graph,
+    length: float,
+    iterations: int,
+    temperature: float,
+):
+    """Runs force-directed iterations in place, cooling as it goes."""
+    offsets, neighbours = graph
+    caves, dimension = positions.shape
+    sources = np.repeat(np.arange(caves), np.diff(offsets))
+    shifts = _shifts(dimension)
+    cooling = (0.05 * length / temperature) ** (1 / max(1, iterations))
+
+    for _ in range(iterations):
+        pull = positions[neighbours] - positions[sources]
+        pull *= (np.linalg.norm(pull, axis=1) / length)[:, np.newaxis]
+        force = np.stack(
+            [np.bincount(sources, pull[:, axis], caves) for axis in range(dimension)],
+            -1,
+        )
+        force += _repulsion(positions, length, shifts)
+
+        magnitude = np.linalg.norm(force, axis=1)
+        step = np.minimum(magnitude, temperature) / np.maximum(magnitude, 1e-12)
+        positions += force * step[:, np.newaxis]
+        temperature *= cooling
+
+
+def layout(
+    graph: Graph, dimension=3, seed=0, iterations=20, coarsest=50
+) -> npt.NDArray:
+    """
+    Lays out a graph in `dimension` dimensions, returning an (n, d) array of
+    coordinates centred on the origin with an average tunnel length of 1.
+    """
+    rng = np.random.default_rng(seed)
+    if len(graph[0]) <= 1:
+        return np.zeros((0, dimension))
+
+    # Coarsen until the graph is small or stops shrinking
+    levels = [graph]
+    clusters = []
+    while len(levels[-1][0]) - 1 > coarsest:
+        coarser = _coarsen(levels[-1], rng)
+        if coarser is None:
+            break
+        levels.append(coarser[0])
+        clusters.append(coarser[1])
+
+    # Natural tunnel lengths shrink by sqrt(4/7) per level, as in Walshaw's
+    # multilevel algorithm, so coarse clusters are spaced further apart
+    length = math.sqrt(7 / 4) ** (len(levels) - 1)
+    caves = len(levels[-1][0]) - 1
+    spread = length * caves ** (1 / dimension)
+    positions = rng.normal(scale=spread, size=(caves, dimension))
+    _refine(positions, levels[-1], length, 10 * iterations, spread)
+
+    # Start each finer graph from the positions of its clusters
+    for finer, cluster in zip(levels[-2::-1], clusters[::-1]):
+        length /= math.sqrt(7 / 4)
+        positions = positions[cluster] + rng.normal(
+            scale=0.1 * length, size=(len(cluster), dimension)
+        )
+        _refine(positions, finer, length, iterations, 2 * length)
+
+    return _normalise(positions, graph)
+
+
+def _normalise(positions: npt.NDArray, graph: Graph) -> npt.NDArray:
+    offsets, neighbours = graph
+    positions = positions - positions.mean(axis=0)
+    sources = np.repeat(np.arange(len(positions)), np.diff(offsets))
+    if len(sources):
+        mean = np.linalg.norm(positions[neighbours] - positions[sources], axis=1).mean()
+        if mean > 0:
+            positions /= mean
+    return positions
+
+
+def _stream(graph: Graph, coords: npt.NDArray, batch_size: int) -> LevelStream:
+    offsets, neighbours = graph
+
+    def batches() -> Iterator[Batch]:
+        for start in range(0, len(coords), batch_size):
+            stop = min(start + batch_size, len(coords))
+            yield (
+                np.diff(offsets[start : stop + 1]),
+                neighbours[offsets[start] : offsets[stop]],
+                coords[start:stop],
+            )
+
+    return LevelStream(len(coords), coords.shape[1], batches)
+
+
+def generate(
+    path: str, dimension=3, seed=0, iterations=20, batch_size=2**16
+) -> LevelStream:
+    """Generates a level from an edge list file, laid out in `dimension` dimensions."""
+    graph, _ = read_edge_list(path)
+    coords = layout(graph, dimension, seed, iterations)
+    return _stream(graph, coords, batch_size)
+
+
+def generate_random(
+    caves=1000, degree=3, dimension=3, seed=0, iterations=20, batch_size=2**16
+) -> LevelStream:
+    """Generates a level from a random regular graph."""
+    graph = random_regular(caves, degree, seed)
+    coords = layout(graph, dimension, seed, iterations)
+    return _stream(graph, coords, batch_size)
@@ -0,0 +1,377 @@
+"""
+Families of regular polytopes in any number of dimensions, and their
+truncations.
+
+Vertices are enumerated lazily in batches, and tunnels come from each family's
+combinatorics rather than comparing distances: neighbouring vertices of an
+n-cube differ in one coordinate, and the vertices of the 24-cell and 600-cell
+form groups of unit quaternions, where the neighbours of q are s * q for a few
+fixed generators s. The n-cube and n-orthoplex stream straight to disk, so a
+20-dimensional cube with a million caves never has to fit in memory.
+"""
+
+import itertools
+import math
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from .common import Batch, LevelStream
+
+PHI = (1 + math.sqrt(5)) / 2
+
+
+@dataclass
+class Polytope(LevelStream):
+    """A polytope, along with the number of sides of its 2D faces."""
+
+    face: int
+
+
+def _permutations(base: npt.ArrayLike, even: bool) -> Iterator[npt.NDArray]:
+    """Yields the distinct (even) permutations of `base`."""
+    base = np.asarray(base, dtype=np.float64)
+    seen = set()
+    for order in itertools.permutations(range(len(base))):
+        # The parity of a permutation is the parity of its number of inversions
+        inversions = sum(a > b for a, b in itertools.combinations(order, 2))
+        if even and inversions % 2:
+            continue
+        permuted = base[list(order)]
+        if (key := permuted.tobytes()) not in seen:
+            seen.add(key)
+            yield permuted
+
+
+def _signed(permutations: Iterable[npt.NDArray]) -> Iterator[npt.NDArray]:
+    """Yields every sign change of the nonzero entries of each vector."""
+    for vector in permutations:
+        nonzero = np.flatnonzero(vector)
+        signs = np.array(list(itertools.product((1, -1), repeat=len(nonzero))))
+        signed = np.tile(vector, (len(signs), 1))
+        signed[:, nonzero] *= signs.reshape(len(signs), len(nonzero))
+        yield signed
+
+
+def _batched(arrays: Iterable[npt.NDArray], batch_size: int) -> Iterator[npt.NDArray]:
+    """Regroups a stream of (k, d) arrays into batches of `batch_size` rows."""
+    pending: list[npt.NDArray] = []
+    rows = 0
+    for array in arrays:
+        pending.append(array)
+        rows += len(array)
+        while rows >= batch_size:
+            joined = np.concatenate(pending)
+            yield joined[:batch_size]
+            pending = [joined[batch_size:]]
+            rows -= batch_size
+    if rows:
+        yield np.concatenate(pending)
+
+
+def signed_permutations(base: npt.ArrayLike, batch_size=4096) -> Iterator[npt.NDArray]:
+    """Yields every distinct signed permutation of `base`, in batches."""
+    return _batched(_signed(_permutations(base, even=False)), batch_size)
+
+
+def even_permutations(
+    base: npt.ArrayLike, signed=True, batch_size=4096
+) -> Iterator[npt.NDArray]:
+    """Yields every distinct (signed) even permutation of `base`, in batches."""
+    permutations = _permutations(base, even=True)
+    if signed:
+        permutations = _signed(permutations)
+    else:
+        permutations = (vector[np.newaxis] for vector in permutations)
+    return _batched(permutations, batch_size)
+
+
+def _from_arrays(
+    neighbours: npt.NDArray, coords: npt.NDArray, face: int, batch_size: int
+) -> Polytope:
+    """Creates a polytope from an (n, k) array of tunnels."""
+
+    def batches() -> Iterator[Batch]:
+        for start in range(0, len(coords), batch_size):
+            tunnels = neighbours[start : start + batch_size]
+            degrees = np.full(len(tunnels), tunnels.shape[1])
+            yield degrees, tunnels.ravel(), coords[start : start + batch_size]
+
+    return Polytope(len(coords), coords.shape[1], batches, face)
+
+
+def cube(dimension: int, batch_size=4096) -> Polytope:
+    """
+    The n-cube, whose 2^n vertices are the binary numbers with n digits, each
+    joined to the n numbers that differ from it by one bit.
+    """
+    bits = 1 << np.arange(dimension, dtype=np.int64)
+    caves = 2**dimension
+
+    def batches() -> Iterator[Batch]:
+        for start in range(0, caves, batch_size):
+            index = np.arange(start, min(start + batch_size, caves), dtype=np.int64)
+            coords = np.where(index[:, np.newaxis] & bits, 1.0, -1.0)
+            neighbours = np.sort(index[:, np.newaxis] ^ bits, axis=1)
+            yield np.full(len(index), dimension), neighbours.ravel(), coords
+
+    return Polytope(caves, dimension, batches, face=4)
+
+
+def orthoplex(dimension: int, batch_size=4096) -> Polytope:
+    """
+    The n-orthoplex (cross-polytope), whose vertices are the unit vectors ±e_i,
+    each joined to every other vertex except its opposite.
+    """
+    caves = 2 * dimension
+    everything = np.arange(caves)
+
+    def batches() -> Iterator[Batch]:
+        for start in range(0, caves, batch_size):
+            index = np.arange(start, min(start + batch_size, caves))
+            coords = np.zeros((len(index), dimension))
+            coords[np.arange(len(index)), index // 2] = np.where(index % 2, -1, 1)
+
+            # Vertex 2i is +e_i and vertex 2i + 1 is -e_i
+            joined = (everything != index[:, np.newaxis]) & (
+                everything != (index ^ 1)[:, np.newaxis]
+            )
+            neighbours = np.nonzero(joined)[1]
+            yield joined.sum(axis=1), neighbours, coords
+
+    return Polytope(caves, dimension, batches, face=3 if dimension > 2 else 4)
+
+
+def simplex(dimension: int, batch_size=4096) -> Polytope:
+    """The n-simplex, whose n + 1 vertices are all joined to each other."""
+    caves = dimension + 1
+
+    # The standard basis of R^(n+1) lies in a hyperplane, centred and rotated
+    # into R^n by the singular value decomposition
+    centred = np.eye(caves) - 1 / caves
+    u, s, _ = np.linalg.svd(centred)
+    coords = u[:, :dimension] * s[:dimension]
+
+    everything = np.arange(caves)
+    neighbours = np.array([np.delete(everything, i) for i in everything])
+    return _from_arrays(neighbours, coords, face=3, batch_size=batch_size)
+
+
+def _multiply(a: npt.NDArray, b: npt.NDArray) -> npt.NDArray:
+    """Multiplies arrays of quaternions (w, x, y, z), broadcasting."""
+    w1, x1, y1, z1 = np.moveaxis(a, -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(b, -1, 0)
+    return np.stack(
+        [
+            w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+        ],
+        axis=-1,
+    )
+
+
+def _group_tunnels(vertices: npt.NDArray, generators: npt.NDArray) -> npt.NDArray:
+    """
+    Joins each vertex q to s * q for each generator s, returning an (n, k)
+    array of tunnels, sorted along each row.
+    """
+    products = _multiply(generators[np.newaxis], vertices[:, np.newaxis])
+
+    # Look the products up among the vertices by their rounded coordinates
+    # (adding 0.0 turns -0.0 into 0.0, so both round to the same key)
+    rounded = np.round(np.concatenate([vertices, products.reshape(-1, 4)]), 6) + 0.0
+    _, inverse = np.unique(rounded, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    index = np.full(inverse.max() + 1, -1)
+    index[inverse[: len(vertices)]] = np.arange(len(vertices))
+    neighbours = index[inverse[len(vertices) :]].reshape(len(vertices), -1)
+    if (neighbours < 0).any():
+        raise ValueError("the vertices are not closed under the generators")
+    return np.sort(neighbours, axis=1)
+
+
+def icositetrachoron(batch_size=4096) -> Polytope:
+    """
+    The 24-cell, with the same vertices as level_gen.octaplex. Scaled down by
+    √2, they are a coset of the Hurwitz units, so multiplying on the left by a
+    Hurwitz unit with real part 1/2 moves to a neighbour.
+    """
+    vertices = np.concatenate(list(signed_permutations([1, 1, 0, 0])))
+    generators = np.concatenate([[[1]] * 8, next(signed_permutations([1, 1, 1]))], 1)
+    neighbours = _group_tunnels(vertices, generators / 2)
+    return _from_arrays(neighbours, vertices, face=3, batch_size=batch_size)
+
+
+def _icosians() -> npt.NDArray:
+    """The 120 unit icosians, the vertices of the 600-cell."""
+    return np.concatenate(
+        [
+            *signed_permutations([1, 0, 0, 0]),
+            *signed_permutations([0.5, 0.5, 0.5, 0.5]),
+            *even_permutations([PHI / 2, 0.5, 1 / PHI / 2, 0]),
+        ]
+    )
+
+
+def hexacosichoron(batch_size=4096) -> Polytope:
+    """
+    The 600-cell. Its vertices form a group of unit quaternions, and the
+    neighbours of 1 are the 12 vertices with real part φ/2.
+    """
+    vertices = _icosians()
+    generators = vertices[np.isclose(vertices[:, 0], PHI / 2)]
+    neighbours = _group_tunnels(vertices, generators)
+    return _from_arrays(neighbours, vertices, face=3, batch_size=batch_size)
+
+
+def hecatonicosachoron(batch_size=4096) -> Polytope:
+    """
+    The 120-cell, as the dual of the 600-cell: a vertex at the centre of each of
+    the 600-cell's tetrahedra, joined to the tetrahedra sharing a face with it.
+    """
+    vertices = _icosians()
+    generators = vertices[np.isclose(vertices[:, 0], PHI / 2)]
+    neighbours = _group_tunnels(vertices, generators)
+
+    n = len(vertices)
+    adjacent = np.zeros((n, n), dtype=np.bool_)
+    adjacent[np.repeat(np.arange(n), neighbours.shape[1]), neighbours.ravel()] = True
+
+    # Extend each edge to triangles, and each triangle to tetrahedra, always
+    # adding a vertex larger than the rest so each is found once
+    edges = np.argwhere(np.triu(adjacent))
+    common = adjacent[edges[:, 0]] & adjacent[edges[:, 1]]
+    common &= np.arange(n) > edges[:, 1:]
+    row, last = np.nonzero(common)
+    triangles = np.column_stack([edges[row], last])
+
+    common = adjacent[triangles].all(axis=1) & (np.arange(n) > triangles[:, 2:])
+    row, last = np.nonzero(common)
+    tetrahedra = np.column_stack([triangles[row], last])
+
+    # Two tetrahedra are neighbours when they have the same key for a face
+    faces = np.array(list(itertools.combinations(range(4), 3)))
+    keys = (tetrahedra[:, faces] * np.array([n * n, n, 1])).sum(axis=2).ravel()
+    owners = np.repeat(np.arange(len(tetrahedra)), len(faces))
+    order = np.argsort(keys, kind="stable")
+    first, second = owners[order[0::2]], owners[order[1::2]]
+    if not (keys[order[0::2]] == keys[order[1::2]]).all():
+        raise ValueError("every face should be shared by exactly two tetrahedra")
+
+    sources = np.concatenate([first, second])
+    targets = np.concatenate([second, first])
+    order = np.lexsort((targets, sources))
+    neighbours = targets[order].reshape(len(tetrahedra), -1)
+
+    centres = vertices[tetrahedra].mean(axis=1)
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    return _from_arrays(neighbours, centres, face=5, batch_size=batch_size)
+
+
+def truncate(polytope: Polytope, depth=1 / 3, batch_size=4096) -> LevelStream:
+    """
+    Cuts off every vertex of a polytope. Each tunnel from v to w becomes a cave
+    `depth` of the way along it from v, joined to the cave at the other end of
+    the tunnel and to the caves around v on the same 2D faces.
+
+    Two tunnels from v to w1 and w2 lie on a common face when there is a walk
+    from w1 to w2 around the rest of the face, avoiding v. Since the faces are
+    the shortest cycles in a regular polytope, any walk of that length will do.
+    """
+    degrees, neighbours, coords = (
+        np.concatenate(arrays) for arrays in zip(*polytope.batches())
+    )
+    n = polytope.caves
+    offsets = np.concatenate([[0], np.cumsum(degrees)])
+    sources = np.repeat(np.arange(n), degrees)
+
+    # Tunnels are sorted by source then target, so this finds a tunnel's index
+    keys = sources * n + neighbours
+
+    def find(a: npt.NDArray, b: npt.NDArray) -> npt.NDArray:
+        """Returns the index of each tunnel from a to b, or -1 if there is none."""
+        index = np.minimum(np.searchsorted(keys, a * n + b), len(keys) - 1)
+        return np.where(keys[index] == a * n + b, index, -1)
+
+    def step(tunnels: npt.NDArray, at: npt.NDArray):
+        counts = degrees[at]
+        gathered = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        return (
+            np.repeat(tunnels, counts),
+            neighbours[np.repeat(offsets[at], counts) + gathered],
+        )
+
+    # Walk from w1 for all but the last step, never going back to v
+    tunnels, at = np.arange(len(neighbours)), neighbours
+    for _ in range(polytope.face - 3):
+        tunnels, at = step(tunnels, at)
+        keep = at != sources[tunnels]
+        unique = np.unique(tunnels[keep] * n + at[keep])
+        tunnels, at = unique // n, unique % n
+
+    # The last step has to end next to v, at a different w2
+    tunnels, at = step(tunnels, at)
+    partners = find(sources[tunnels], at)
+    keep = (partners >= 0) & (partners != tunnels)
+    tunnels, partners = tunnels[keep], partners[keep]
+
+    opposite = find(neighbours, sources)
+    m = len(neighbours)
+    joined = np.unique(
+        np.concatenate([np.arange(m) * m + opposite, tunnels * m + partners])
+    )
+    truncated_sources, truncated_targets = joined // m, joined % m
+    truncated_degrees = np.bincount(truncated_sources, minlength=m)
+    truncated_coords = coords[sources] + depth * (coords[neighbours] - coords[sources])
+
+    truncated_offsets = np.concatenate([[0], np.cumsum(truncated_degrees)])
+
+    def batches() -> Iterator[Batch]:
+        for start in range(0, m, batch_size):
+            stop = min(start + batch_size, m)
+            yield (
+                truncated_degrees[start:stop],
+                truncated_targets[truncated_offsets[start] : truncated_offsets[stop]],
+                truncated_coords[start:stop],
+            )
+
+    return LevelStream(m, polytope.dimension, batches)
+
+
+FAMILIES = {
+    "cube": cube,
+    "orthoplex": orthoplex,
+    "simplex": simplex,
+    "24-cell": icositetrachoron,
+    "120-cell": hecatonicosachoron,
+    "600-cell": hexacosichoron,
+}
+
+
+def generate(
+    family: str, dimension=4, truncated=False, depth=1 / 3, batch_size=4096
+) -> LevelStream:
+    """
+    Generates a polytope from one of FAMILIES. The 24-, 120- and 600-cells only
+    exist in 4 dimensions.
+    """
+    match family:
+        case "cube" | "orthoplex" | "simplex":
+            polytope = FAMILIES[family](dimension, batch_size=batch_size)
+        case "24-cell" | "120-cell" | "600-cell":
+            if dimension != 4:
+                raise ValueError(f"the {family} only exists in 4 dimensions")
+            polytope = FAMILIES[family](batch_size=batch_size)
+        case _:
+            raise ValueError(f"unknown polytope family {family!r}")
+
+    if truncated:
+        return truncate(polytope, depth, batch_size)
+    return polytope
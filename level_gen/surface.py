@@ -0,0 +1,169 @@
+"""
+Levels on parametric surfaces, sampled on a grid of (u, v) parameters.
+
+Caves sit at the centres of the cells of a width by height grid, and each cave
+has tunnels to the caves next to it in the grid. The edges of the grid are
+either left open, wrapped around to the opposite edge, or wrapped around with a
+twist that reverses the other parameter, which is how a Möbius strip, torus,
+Klein bottle and projective plane are glued together. Sampling at cell centres
+means a twist maps caves exactly onto caves.
+
+Coordinates are computed with NumPy a batch of rows at a time, so grids of
+millions of caves can be streamed to disk.
+"""
+
+import math
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+import numpy.typing as npt
+
+from .common import Batch, LevelStream
+
+type Identification = Literal["open", "wrap", "twist"]
+
+
+@dataclass
+class Surface:
+    """
+    A parametric surface over (u, v) in [0, 1)², mapping arrays of u and v to
+    an array of points with `dimension` coordinates in the last axis.
+    """
+
+    dimension: int
+    u_edges: Identification
+    v_edges: Identification
+    points: Callable[[npt.NDArray, npt.NDArray], npt.NDArray]
+
+
+def _mobius(u: npt.NDArray, v: npt.NDArray) -> npt.NDArray:
+    # The same strip as level_gen.mobius, with v running across it from -1 to 1
+    u, v = 2 * math.pi * u, 2 * v - 1
+    radius = 1 + v / 2 * np.cos(u / 2)
+    return np.stack([radius * np.cos(u), radius * np.sin(u), v / 2 * np.sin(u / 2)], -1)
+
+
+def _torus(u: npt.NDArray, v: npt.NDArray) -> npt.NDArray:
+    u, v = 2 * math.pi * u, 2 * math.pi * v
+    radius = 1 + np.cos(v) / 2
+    return np.stack([radius * np.cos(u), radius * np.sin(u), np.sin(v) / 2], -1)
+
+
+def _klein_bottle(u: npt.NDArray, v: npt.NDArray) -> npt.NDArray:
+    # In 4D the bottle doesn't need to pass through itself: the tube rotates
+    # through the fourth dimension by half a turn on the way around
+    u, v = 2 * math.pi * u, 2 * math.pi * v
+    radius = 1 + np.cos(v) / 2
+    return np.stack(
+        [
+            radius * np.cos(u),
+            radius * np.sin(u),
+            np.sin(v) * np.cos(u / 2) / 2,
+            np.sin(v) * np.sin(u / 2) / 2,
+        ],
+        -1,
+    )
+
+
+def _projective_plane(u: npt.NDArray, v: npt.NDArray) -> npt.NDArray:
+    # Stretch the square onto a disk, and the disk onto the upper hemisphere,
+    # so opposite points on the edge of the square land on opposite points of
+    # the equator. Every coordinate is quadratic, so opposite points on the
+    # sphere map to the same point in 4D.
+    x, y = 2 * u - 1, 2 * v - 1
+    square = np.maximum(np.abs(x), np.abs(y))
+    length = np.hypot(x, y)
+    scale = np.divide(square, length, out=np.zeros_like(length), where=length > 0)
+    x, y = x * scale, y * scale
+
+    polar = np.hypot(x, y) * math.pi / 2
+    azimuth = np.arctan2(y, x)
+    x = np.sin(polar) * np.cos(azimuth)
+    y = np.sin(polar) * np.sin(azimuth)
+    z = np.cos(polar)
+    return np.stack([x * y, x * z, y * z, (x * x - y * y) / 2], -1)
+
+
+SURFACES: dict[str, Surface] = {
+    "mobius": Surface(3, "twist", "open", _mobius),
+    "torus": Surface(3, "wrap", "wrap", _torus),
+    "klein-bottle": Surface(4, "twist", "wrap", _klein_bottle),
+    "projective-plane": Surface(4, "twist", "twist", _projective_plane),
+}
+
+
+def _step(
+    along: npt.NDArray,
+    across: npt.NDArray,
+    size: int,
+    other_size: int,
+    edges: Identification,
+) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+    """
+    Steps to `along` in one direction of the grid, returning the new position
+    in both directions and whether the step is possible.
+    """
+    outside = (along < 0) | (along >= size)
+    match edges:
+        case "open":
+            return along, across, ~outside
+        case "wrap":
+            return along % size, across, np.ones_like(outside)
+        case "twist":
+            return (
+                along % size,
+                np.where(outside, other_size - 1 - across, across),
+                np.ones_like(outside),
+            )
+
+
+def tunnels(
+    surface: Surface, rows: npt.NDArray, width: int, height: int
+) -> tuple[npt.NDArray, npt.NDArray]:
+    """
+    Returns the number of tunnels from each cave in the given rows, and the
+    tunnels themselves, sorted for each cave. Cave (i, j) is i * height + j.
+    """
+    i, j = np.meshgrid(rows, np.arange(height), indexing="ij")
+    i, j = i.ravel(), j.ravel()
+
+    candidates = []
+    for delta in (-1, 1):
+        along, across, valid = _step(i + delta, j, width, height, surface.u_edges)
+        candidates.append(np.where(valid, along * height + across, -1))
+        along, across, valid = _step(j + delta, i, height, width, surface.v_edges)
+        candidates.append(np.where(valid, across * height + along, -1))
+
+    # Tiny grids can wrap a cave onto itself, or onto the same cave twice
+    candidates = np.sort(np.stack(candidates, -1), axis=1)
+    keep = candidates >= 0
+    keep &= candidates != (i * height + j)[:, np.newaxis]
+    keep[:, 1:] &= candidates[:, 1:] != candidates[:, :-1]
+    return keep.sum(axis=1), candidates[keep]
+
+
+def generate(surface="torus", width=32, height=16, batch_size=2**16) -> LevelStream:
+    """
+    Generates a level on one of SURFACES, with `width` caves around the u
+    direction and `height` caves around the v direction.
+    """
+    if surface not in SURFACES:
+        raise ValueError(f"unknown surface {surface!r}")
+    if width < 1 or height < 1:
+        raise ValueError("surfaces need at least one cave in each direction")
+    shape = SURFACES[surface]
+    rows_per_batch = max(1, batch_size // height)
+
+    def batches() -> Iterator[Batch]:
+        for start in range(0, width, rows_per_batch):
+            rows = np.arange(start, min(start + rows_per_batch, width))
+            degrees, neighbours = tunnels(shape, rows, width, height)
+            u, v = np.meshgrid(
+                (rows + 0.5) / width, (np.arange(height) + 0.5) / height, indexing="ij"
+            )
+            coords = shape.points(u, v).reshape(-1, shape.dimension)
+            yield degrees, neighbours, coords
+
+    return LevelStream(width * height, shape.dimension, batches)
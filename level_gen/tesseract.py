@@ -1,15 +1,21 @@
+import itertools
+
 import numpy as np
 import numpy.typing as npt
-from .common import dump, graph_from_edge_length
+from .common import Node, dump, graph_from_edge_length
 
-coords: list[npt.NDArray] = []
 plus_or_minus = (-1, 1)
 
-for w in plus_or_minus:
-    for x in plus_or_minus:
-        for y in plus_or_minus:
-            for z in plus_or_minus:
-                coords.append(np.array([w, x, y, z]))
+
+def generate(dimension=4) -> list[Node]:
+    """Generates a hypercube, the tesseract by default."""
+    coords: list[npt.NDArray] = [
+        np.array(vertex)
+        for vertex in itertools.product(plus_or_minus, repeat=dimension)
+    ]
+
+    return graph_from_edge_length(coords, 2, 1e-2)
 
 
-dump(graph_from_edge_length(coords, 2, 1e-2), "tesseract.json")
+if __name__ == "__main__":
+    dump(generate(), "tesseract.json")
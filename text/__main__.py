@@ -8,6 +8,7 @@ import random
 import importlib.resources
 
 from wumpus import Level
+from wumpus.endless import EndlessLevel
 import wumpus.levels
 from .player import TextPlayerController
 
@@ -15,6 +16,7 @@ from .player import TextPlayerController
 parser = argparse.ArgumentParser(prog="Wumpus OOP")
 parser.add_argument("-d", "--debug", action="store_true")
 parser.add_argument("-s", "--seed")
+parser.add_argument("-e", "--endless", action="store_true")
 args = parser.parse_args()
 DEBUG = args.debug
 SEED = args.seed
@@ -23,9 +25,13 @@ SEED = args.seed
 if SEED:
     random.seed(SEED)
 
-level_map = importlib.resources.read_text(wumpus.levels, "00.json")
-level = Level(level_map, debug=DEBUG)
+if args.endless:
+    level = EndlessLevel(SEED or 0, debug=DEBUG)
+else:
+    level_map = importlib.resources.read_text(wumpus.levels, "00.json")
+    level = Level(level_map, debug=DEBUG)
 player = TextPlayerController(level)
+setup = level.snapshot(random_state=False)
 
 while True:
     if DEBUG:
@@ -43,7 +49,9 @@ while True:
         break
 
     if input("Same setup (Y-N)? ")[0].lower() == "n":
-        level = Level(level_map, debug=DEBUG)
+        level.spawn_hazards()
         player = TextPlayerController(level)
+        setup = level.snapshot(random_state=False)
     else:
+        level.restore(setup)
         player.respawn()
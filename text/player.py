@@ -1,8 +1,8 @@
+from collections.abc import Mapping
 from wumpus import Cave, PlayerController
-from random import choice
 
 
-def input_location(msg: str, level: dict[int, Cave]):
+def input_location(msg: str, level: Mapping[int, Cave]):
     while True:
         try:
             location = int(input(msg))
@@ -48,7 +48,7 @@ class TextPlayerController(PlayerController):
                         in (
                             cave := self.level.get_cave(prev_loc)
                         ).tunnels  # ensure that the next cave is adjacent to current cave
-                        else choice(
+                        else self.level.rng.choice(
                             cave.tunnels
                         )  # otherwise the arrow should go randomly
                         for prev_loc, next_loc in zip(
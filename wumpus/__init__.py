@@ -1,5 +1,6 @@
 from .cave import Cave
+from .graph import CaveGraph
 from .level import Level
 from .player import PlayerController
 
-__all__ = ["Cave", "Level", "PlayerController"]
+__all__ = ["Cave", "CaveGraph", "Level", "PlayerController"]
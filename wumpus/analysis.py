@@ -0,0 +1,247 @@
+"""
+Graph metrics for levels: BFS distance fields, diameter, girth and degree
+statistics.
+
+Breadth-first searches expand a whole frontier at a time over a CaveGraph's
+CSR arrays rather than visiting caves one by one, and all-pairs distances run
+many searches at once as rows of one distance matrix. Computing these for a large
+map is slow, so `analyse` caches its results on disk, keyed by a hash of the
+map's tunnels and the parameters that affect the results.
+
+Tunnels may be one-way. Distances and the diameter follow tunnels in their
+direction, while the girth is the shortest cycle of caves with tunnels between
+them either way, since going back through a two-way tunnel isn't a cycle.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from .graph import CaveGraph
+
+type StrPath = str | os.PathLike[str]
+
+# Bumped whenever the metrics for the same map and parameters change
+CACHE_VERSION = 2
+
+DEFAULT_CACHE = Path(os.environ.get("WUMPUS_CACHE", Path.home() / ".cache" / "wumpus"))
+
+
+@dataclass
+class LevelMetrics:
+    """
+    Metrics describing the shape of a level. Distances are -1 between caves
+    that can't be reached from each other. When a map has more caves than
+    the exact limit passed to `analyse`, the diameter is a lower bound, the
+    girth is an upper bound, `exact` is False and `distances` is None.
+    """
+
+    caves: int
+    tunnels: int
+    diameter: int
+    girth: int | None  # None if the map has no cycles
+    degree_histogram: list[int]
+    exact: bool
+    distances: npt.NDArray[np.int32] | None = None
+
+
+def graph_hash(graph: CaveGraph) -> str:
+    """Hashes the tunnels of a map, which is all the metrics depend on."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(graph.offsets, dtype="<i8").tobytes())
+    digest.update(np.ascontiguousarray(graph.neighbours, dtype="<i8").tobytes())
+    return digest.hexdigest()
+
+
+def _gather(
+    offsets: npt.NDArray, neighbours: npt.NDArray, caves: npt.NDArray
+) -> npt.NDArray:
+    """Returns the tunnels of every cave in `caves`, concatenated."""
+    starts = offsets[caves]
+    counts = offsets[caves + 1] - starts
+    steps = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return neighbours[np.repeat(starts, counts) + steps]
+
+
+def distances(graph: CaveGraph, source: int | npt.ArrayLike) -> npt.NDArray[np.int32]:
+    """
+    Returns the number of tunnels from the nearest source to every cave, or -1
+    for caves that cannot be reached.
+    """
+    offsets = np.asarray(graph.offsets, dtype=np.int64)
+    neighbours = np.asarray(graph.neighbours, dtype=np.int64)
+
+    field = np.full(len(graph), -1, dtype=np.int32)
+    frontier = np.unique(np.atleast_1d(np.asarray(source, dtype=np.int64)))
+    field[frontier] = 0
+
+    distance = 0
+    while len(frontier):
+        distance += 1
+        reached = _gather(offsets, neighbours, frontier)
+        frontier = np.unique(reached[field[reached] < 0])
+        field[frontier] = distance
+    return field
+
+
+def _two_way(graph: CaveGraph) -> bool:
+    """Returns whether every tunnel in a map has a tunnel back."""
+    n = len(graph)
+    sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(graph.offsets))
+    targets = np.asarray(graph.neighbours, dtype=np.int64)
+    forward = np.unique(sources * n + targets)
+    backward = np.unique(targets * n + sources)
+    return np.array_equal(forward, backward)
+
+
+def _undirected(graph: CaveGraph) -> CaveGraph:
+    """Returns a map with a two-way tunnel wherever a map has a tunnel."""
+    n = len(graph)
+    sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(graph.offsets))
+    targets = np.asarray(graph.neighbours, dtype=np.int64)
+    edges = np.unique(np.concatenate([sources * n + targets, targets * n + sources]))
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edges // n, minlength=n), out=offsets[1:])
+    return CaveGraph(offsets, edges % n, graph.coords)
+
+
+def _search(
+    graph: CaveGraph, sources: npt.NDArray, girth: int | None, stop_early=False
+) -> tuple[npt.NDArray[np.int32], int | None]:
+    """
+    Runs a breadth-first search from each source at once, returning the
+    (k, n) distance matrix and the length of the shortest cycle found, or
+    `girth` if that is shorter. With `stop_early`, the searches stop once no
+    shorter cycle can be found, leaving the farther distances at -1.
+    Cycles are only found correctly if every tunnel is two-way.
+    """
+    offsets = np.asarray(graph.offsets, dtype=np.int64)
+    neighbours = np.asarray(graph.neighbours, dtype=np.int64)
+    n = len(graph)
+
+    field = np.full((len(sources), n), -1, dtype=np.int32)
+    flat = field.reshape(-1)
+
+    # The frontier holds indices into the flattened matrix, row * n + cave
+    frontier = np.arange(len(sources)) * n + sources
+    flat[frontier] = 0
+
+    distance = 0
+    while len(frontier):
+        if stop_early and girth is not None and 2 * distance + 1 >= girth:
+            break
+
+        rows, caves = np.divmod(frontier, n)
+        targets = _gather(offsets, neighbours, caves)
+        targets += np.repeat(rows * n, offsets[caves + 1] - offsets[caves])
+        seen = flat[targets]
+
+        # A tunnel between two caves at the same distance closes an odd cycle
+        if (seen == distance).any():
+            girth = min(girth or 2 * distance + 1, 2 * distance + 1)
+
+        # Reaching a cave from two caves at once closes an even cycle
+        frontier, paths = np.unique(targets[seen < 0], return_counts=True)
+        if (paths > 1).any():
+            girth = min(girth or 2 * distance + 2, 2 * distance + 2)
+
+        distance += 1
+        flat[frontier] = distance
+
+    return field, girth
+
+
+def analyse(
+    graph: CaveGraph,
+    cache_dir: StrPath | None = DEFAULT_CACHE,
+    exact_limit=4096,
+    chunk=256,
+) -> LevelMetrics:
+    """
+    Computes the metrics for a map, or reads them from the cache.
+
+    Maps with up to `exact_limit` caves get exact metrics along with all-pairs
+    distances. Larger maps are estimated from a few searches: the diameter with
+    a double sweep, and the girth from a sample of caves.
+    """
+    cache_file = None
+    if cache_dir is not None:
+        # The sample size for large maps is `chunk`, so it can change the girth
+        name = f"{graph_hash(graph)}-v{CACHE_VERSION}-{exact_limit}-{chunk}.npz"
+        cache_file = Path(cache_dir) / name
+        if cache_file.exists():
+            return _load(cache_file)
+
+    # Cycles are found on a two-way copy of a map with one-way tunnels
+    two_way = _two_way(graph)
+    cycles = graph if two_way else _undirected(graph)
+
+    degrees = np.diff(graph.offsets)
+    histogram = np.bincount(degrees).tolist() if len(degrees) else []
+    exact = len(graph) <= exact_limit
+
+    if exact:
+        rows = []
+        girth = None
+        for start in range(0, len(graph), chunk):
+            sources = np.arange(start, min(start + chunk, len(graph)))
+            if two_way:
+                field, girth = _search(graph, sources, girth)
+            else:
+                field, _ = _search(graph, sources, None)
+                _, girth = _search(cycles, sources, girth, stop_early=True)
+            rows.append(field)
+        all_pairs = np.concatenate(rows) if rows else np.zeros((0, 0), np.int32)
+        diameter = int(all_pairs.max(initial=0))
+    else:
+        all_pairs = None
+        # Double sweep: the farthest cave from the farthest cave from anywhere
+        far = int(np.argmax(distances(graph, 0)))
+        diameter = int(distances(graph, far).max())
+
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(graph), size=min(chunk, len(graph)), replace=False)
+        _, girth = _search(cycles, np.sort(sample), None, stop_early=True)
+
+    metrics = LevelMetrics(
+        caves=len(graph),
+        tunnels=len(graph.neighbours),
+        diameter=diameter,
+        girth=girth,
+        degree_histogram=histogram,
+        exact=exact,
+        distances=all_pairs,
+    )
+    if cache_file is not None:
+        _save(cache_file, metrics)
+    return metrics
+
+
+def _save(path: Path, metrics: LevelMetrics):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    summary = {
+        "caves": metrics.caves,
+        "tunnels": metrics.tunnels,
+        "diameter": metrics.diameter,
+        "girth": metrics.girth,
+        "degree_histogram": metrics.degree_histogram,
+        "exact": metrics.exact,
+    }
+    arrays = {} if metrics.distances is None else {"distances": metrics.distances}
+
+    # Write to a temporary file first so a partly written cache is never read
+    temporary = path.with_suffix(".tmp.npz")
+    np.savez(temporary, summary=np.array(json.dumps(summary)), **arrays)
+    temporary.replace(path)
+
+
+def _load(path: Path) -> LevelMetrics:
+    with np.load(path, allow_pickle=False) as data:
+        summary = json.loads(str(data["summary"]))
+        distances = data["distances"] if "distances" in data else None
+    return LevelMetrics(**summary, distances=distances)
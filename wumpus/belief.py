@@ -0,0 +1,204 @@
+"""
+What a player can deduce about where the hazards are from what they have
+sensed, for hints and bots.
+
+A Belief is updated as the player explores, one cave at a time, and only
+looks at the caves around the one that changed, so updates take time
+proportional to the square of a cave's degree rather than the size of the map.
+"""
+
+from collections.abc import Iterable
+
+from .hazards import Sense
+from .level import Level
+
+KINDS = (Sense.PIT, Sense.BATS, Sense.WUMPUS)
+
+
+class Belief:
+    """
+    The caves that could hold each kind of hazard, given the senses felt in
+    the caves the player has visited.
+
+    For every kind, `cleared` holds the caves known not to hold it and `known`
+    the caves known to hold it. A cave where a kind was sensed has at least one
+    of that kind next to it, so once all but one of its neighbours are cleared,
+    the last one is known. There is only one Wumpus, so the caves it could be in
+    are narrowed to the caves next to every smell.
+
+    Tunnels may be one-way: a cave senses the hazards its tunnels lead to, so
+    a hazard is sensed from its cave's entrances, as in Level.
+    """
+
+    def __init__(self, level: Level):
+        self.level = level
+        self.visited: set[int] = set()
+        self.cleared: dict[Sense, set[int]] = {kind: set() for kind in KINDS}
+        self.known: dict[Sense, set[int]] = {kind: set() for kind in KINDS}
+        self.sensed: dict[Sense, set[int]] = {kind: set() for kind in KINDS}
+        self.counts = {Sense.PIT: level.pits, Sense.BATS: level.bats, Sense.WUMPUS: 1}
+        # The caves next to every smell, once there has been one
+        self.suspects: set[int] | None = None
+
+    def tunnels(self, location: int) -> list[int]:
+        return self.level.get_cave(location).tunnels
+
+    def entrances(self, location: int) -> list[int]:
+        return self.level.get_entrances(location)
+
+    def visit(self, location: int, senses: Sense):
+        """Records that the player is in a cave, and what they sense there."""
+        self.visited.add(location)
+        for kind in KINDS:
+            self.clear(location, kind)
+
+        for kind in KINDS:
+            if not senses & kind:
+                for tunnel in self.tunnels(location):
+                    self.clear(tunnel, kind)
+                continue
+
+            self.sensed[kind].add(location)
+            if kind == Sense.WUMPUS:
+                tunnels = set(self.tunnels(location)) - self.cleared[kind]
+                if self.suspects is None:
+                    self.suspects = tunnels
+                else:
+                    self.suspects &= tunnels
+                self._deduce_wumpus()
+            else:
+                self._deduce(location, kind)
+
+    def found(self, location: int, kind: Sense):
+        """Records that a cave is known to hold a kind of hazard."""
+        if kind == Sense.WUMPUS:
+            # Only the Wumpus moves, so it may be in a cave cleared before
+            self.cleared[kind].discard(location)
+            self.suspects = {location}
+        self.known[kind].add(location)
+        for other in KINDS:
+            # Caves never hold more than one hazard
+            if other != kind:
+                self.clear(location, other)
+
+    def missed(self, path: Iterable[int]):
+        """
+        Records an arrow that missed, which startles the Wumpus. It wasn't in
+        any cave on the path, but may since have moved through a tunnel, so
+        the only caves still cleared are those with every entrance cleared.
+        """
+        cleared = self.cleared[Sense.WUMPUS] | set(path)
+        self.cleared[Sense.WUMPUS] = {
+            location
+            for location in cleared
+            if all(entrance in cleared for entrance in self.entrances(location))
+        }
+        self.known[Sense.WUMPUS] = set()
+        self.sensed[Sense.WUMPUS] = set()
+        self.suspects = None
+
+    def clear(self, location: int, kind: Sense):
+        """Records that a cave doesn't hold a kind of hazard."""
+        if location in self.cleared[kind]:
+            return
+        self.cleared[kind].add(location)
+
+        if kind == Sense.WUMPUS:
+            if self.suspects is not None:
+                self.suspects.discard(location)
+                self._deduce_wumpus()
+            return
+
+        # Clearing a cave may leave one candidate for a sense next to it
+        for entrance in self.entrances(location):
+            if entrance in self.sensed[kind]:
+                self._deduce(entrance, kind)
+
+    def _candidates(self, location: int, kind: Sense) -> list[int]:
+        return [
+            tunnel
+            for tunnel in self.tunnels(location)
+            if tunnel not in self.cleared[kind]
+        ]
+
+    def _deduce(self, location: int, kind: Sense):
+        candidates = self._candidates(location, kind)
+        if len(candidates) == 1 and candidates[0] not in self.known[kind]:
+            self.found(candidates[0], kind)
+
+    def _deduce_wumpus(self):
+        if self.suspects is None:
+            return
+        if len(self.suspects) == 1:
+            self.known[Sense.WUMPUS] = set(self.suspects)
+        elif not self.suspects:
+            # The smells disagree, so the Wumpus must have moved unseen
+            self.sensed[Sense.WUMPUS] = set()
+            self.suspects = None
+
+    def wumpus(self) -> int | None:
+        """The Wumpus' cave, if it is certain."""
+        if self.suspects is not None and len(self.suspects) == 1:
+            return next(iter(self.suspects))
+        return None
+
+    def possible(self, location: int, kind: Sense) -> bool:
+        """Whether a cave could hold a kind of hazard."""
+        if location in self.known[kind]:
+            return True
+        if kind == Sense.WUMPUS and self.suspects is not None:
+            return location in self.suspects
+        return location not in self.cleared[kind]
+
+    def safe(self, location: int) -> bool:
+        """Whether a cave is known to hold no hazard at all."""
+        return not any(self.possible(location, kind) for kind in KINDS)
+
+    def probability(self, location: int, kind: Sense) -> float:
+        """
+        Estimates the chance that a cave holds a kind of hazard: the share of
+        the hazards left over the caves they could be in, or more if the cave
+        is one of only a few that could explain a sense next to it.
+        """
+        if location in self.known[kind]:
+            return 1.0
+        if not self.possible(location, kind):
+            return 0.0
+        if kind == Sense.WUMPUS and self.suspects is not None:
+            return 1 / len(self.suspects)
+
+        known = len(self.known[kind])
+        unknown = len(self.level.level) - len(self.cleared[kind]) - known
+        chance = max(0, self.counts[kind] - known) / max(unknown, 1)
+        for entrance in self.entrances(location):
+            if entrance not in self.sensed[kind]:
+                continue
+            candidates = self._candidates(entrance, kind)
+            # A sense already explained by a known hazard doesn't raise the
+            # chance for the other candidates
+            if candidates and not self.known[kind].intersection(candidates):
+                chance = max(chance, 1 / len(candidates))
+        return min(chance, 1.0)
+
+    def danger(self, location: int) -> float:
+        """Estimates the chance that entering a cave kills the player."""
+        pit = self.probability(location, Sense.PIT)
+        wumpus = self.probability(location, Sense.WUMPUS)
+        return 1 - (1 - pit) * (1 - wumpus)
+
+    def risk(self, location: int) -> float:
+        """Estimates the chance that entering a cave meets any hazard."""
+        bats = self.probability(location, Sense.BATS)
+        return 1 - (1 - self.danger(location)) * (1 - bats)
+
+    def hint(self, location: int) -> list[int]:
+        """
+        The best caves to move to from a cave: those known to be safe, or the
+        least risky if there are none.
+        """
+        tunnels = self.tunnels(location)
+        if safe := [tunnel for tunnel in tunnels if self.safe(tunnel)]:
+            return safe
+        risks = {tunnel: self.risk(tunnel) for tunnel in tunnels}
+        least = min(risks.values(), default=0)
+        return [tunnel for tunnel, risk in risks.items() if risk == least]
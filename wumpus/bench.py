@@ -0,0 +1,189 @@
+"""
+Headless throughput benchmarks for the core game engine.
+
+Runs Level construction and the PlayerController actions on every map in
+wumpus.levels and on synthetic maps of increasing size, printing the results
+as JSON so runs can be saved and compared:
+
+    python -m wumpus.bench --output before.json
+    python -m wumpus.bench --sizes 1000 10000 --storage csr
+"""
+
+import argparse
+import importlib.resources
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import wumpus.levels
+from .level import Level
+from .player import PlayerController
+
+
+def synthetic_map(caves: int) -> str:
+    """
+    Generates a Möbius ladder level: a ring of caves where every cave also has a
+    tunnel to the cave opposite it, so each cave has three tunnels like the
+    dodecahedron. Caves are laid out on a twisted loop in 3D.
+    """
+    if caves < 4 or caves % 2:
+        raise ValueError("synthetic maps need an even number of at least 4 caves")
+
+    half = caves // 2
+    entries = []
+    for location in range(caves):
+        angle = 2 * math.pi * location / caves
+        tunnels = [
+            (location - 1) % caves,
+            (location + 1) % caves,
+            (location + half) % caves,
+        ]
+        coords = [math.cos(angle), math.sin(angle), math.sin(angle / 2) / 2]
+        entries.append(
+            f'{{"location": {location}, "tunnels": {json.dumps(tunnels)}, '
+            f'"coords": {json.dumps(coords)}}}'
+        )
+    return "[" + ", ".join(entries) + "]"
+
+
+def measure(
+    op: Callable[[], object],
+    min_time: float,
+    reset: Callable[[], object] = lambda: None,
+) -> dict[str, float]:
+    """
+    Times `op` until at least `min_time` seconds have been spent in it, then
+    repeats it under tracemalloc to measure its memory use per call:
+    `retained_blocks` still allocated after the call, and `transient_bytes`
+    allocated at the call's peak, which also counts memory freed again before
+    it returns. `reset` is called between calls, outside the timed region.
+    """
+    calls = 0
+    elapsed = 0.0
+    while elapsed < min_time:
+        reset()
+        start = time.perf_counter()
+        op()
+        elapsed += time.perf_counter() - start
+        calls += 1
+
+    # Allocation pass, kept separate since tracing slows everything down
+    traced_calls = min(calls, 1000)
+    transient = 0
+    peak = 0
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(traced_calls):
+        reset()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        op()
+        _, call_peak = tracemalloc.get_traced_memory()
+        transient += call_peak - current
+        peak = max(peak, call_peak)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # Leave out the memory taken by the snapshots themselves
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    retained = sum(
+        stat.count_diff
+        for stat in after.filter_traces(ignore).compare_to(
+            before.filter_traces(ignore), "lineno"
+        )
+    )
+
+    return {
+        "calls": calls,
+        "ops_per_sec": calls / elapsed,
+        "retained_blocks": retained / traced_calls,
+        "transient_bytes": transient / traced_calls,
+        "peak_bytes": peak,
+    }
+
+
+def bench_level(level_map: str, storage: str, min_time: float) -> dict:
+    """Benchmarks construction and every player action on one map."""
+    results = {
+        "construct": measure(lambda: Level(level_map, storage=storage), min_time)
+    }
+
+    level = Level(level_map, storage=storage)
+    player = PlayerController(level)
+
+    def restart():
+        if not player.alive or player.win:
+            player.respawn()
+
+    results["move"] = measure(
+        lambda: player.move(random.choice(player.cave.tunnels)), min_time, restart
+    )
+    results["shoot"] = measure(
+        lambda: player.shoot([random.choice(player.cave.tunnels)]), min_time, restart
+    )
+    results["respawn"] = measure(player.respawn, min_time)
+    results["get_nearby_msgs"] = measure(player.get_nearby_msgs, min_time, restart)
+
+    results["caves"] = len(level.level)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m wumpus.bench")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="*",
+        default=[10**3, 10**4, 10**5, 10**6],
+        help="cave counts of the synthetic maps",
+    )
+    parser.add_argument("--storage", choices=["dict", "csr"], default="dict")
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="seconds to spend timing each benchmark",
+    )
+    parser.add_argument("-s", "--seed", default="bench")
+    parser.add_argument("-o", "--output", help="write results to a file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    maps: dict[str, str] = {
+        resource.name: resource.read_text()
+        for resource in sorted(
+            importlib.resources.files(wumpus.levels).iterdir(),
+            key=lambda resource: resource.name,
+        )
+        if resource.name.endswith(".json")
+    }
+    for size in args.sizes:
+        maps[f"synthetic-{size}"] = synthetic_map(size)
+
+    report = {
+        "python": platform.python_version(),
+        "storage": args.storage,
+        "min_time": args.min_time,
+        "seed": args.seed,
+        "levels": {},
+    }
+    for name, level_map in maps.items():
+        print(f"benchmarking {name}", file=sys.stderr)
+        report["levels"][name] = bench_level(level_map, args.storage, args.min_time)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fp:
+            fp.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
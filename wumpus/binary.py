@@ -0,0 +1,180 @@
+"""
+Binary level format, for maps too large to parse as JSON on every load.
+
+A binary level stores a CaveGraph's arrays back to back, so it can be opened
+with `numpy.memmap` in constant time and its pages shared between processes:
+
+    magic       8 bytes             b"WUMPUS\\x00\\x01"
+    caves       uint64              n
+    tunnels     uint64              m, the total length of every tunnel list
+    dimension   uint64              d
+    offsets     int64[n + 1]
+    coords      float64[n, d]
+    neighbours  int32[m]
+
+All values are little-endian. The neighbours come last, so a LevelWriter can
+stream them without knowing m in advance.
+
+Convert a JSON level with `python -m wumpus.binary level.json level.lvl`.
+"""
+
+import argparse
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from .graph import CaveGraph
+
+MAGIC = b"WUMPUS\x00\x01"
+HEADER = struct.Struct("<8sQQQ")
+
+OFFSET_TYPE = np.dtype("<i8")
+COORD_TYPE = np.dtype("<f8")
+NEIGHBOUR_TYPE = np.dtype("<i4")
+
+type StrPath = str | os.PathLike[str]
+
+
+class LevelWriter:
+    """
+    Writes a binary level in batches of caves, so levels larger than memory
+    can be generated straight to disk.
+
+    Example:
+        with LevelWriter("big.lvl", caves=n, dimension=3) as writer:
+            for degrees, neighbours, coords in batches:
+                writer.write(degrees, neighbours, coords)
+    """
+
+    def __init__(self, path: StrPath, caves: int, dimension: int):
+        self.path = path
+        self.caves = caves
+        self.dimension = dimension
+
+        self.written = 0  # caves written so far
+        self.tunnels = 0  # tunnel entries written so far
+
+        self.coords_start = HEADER.size + (caves + 1) * OFFSET_TYPE.itemsize
+        self.neighbours_start = (
+            self.coords_start + caves * dimension * COORD_TYPE.itemsize
+        )
+
+        self.fp = open(path, "wb")
+        self.fp.write(HEADER.pack(MAGIC, caves, 0, dimension))
+        self.fp.write(np.zeros(1, OFFSET_TYPE).tobytes())
+
+    def write(
+        self,
+        degrees: npt.ArrayLike,
+        neighbours: npt.ArrayLike,
+        coords: npt.ArrayLike,
+    ):
+        """
+        Writes the next batch of caves: the number of tunnels out of each cave,
+        all of their tunnels concatenated, and an (k, d) array of coordinates.
+        """
+        degrees = np.asarray(degrees, dtype=OFFSET_TYPE)
+        neighbours = np.asarray(neighbours, dtype=NEIGHBOUR_TYPE)
+        coords = np.asarray(coords, dtype=COORD_TYPE).reshape(-1, self.dimension)
+
+        if len(degrees) != len(coords):
+            raise ValueError("expected one degree per set of coordinates")
+        if int(degrees.sum()) != len(neighbours):
+            raise ValueError("degrees do not add up to the number of neighbours")
+        if self.written + len(degrees) > self.caves:
+            raise ValueError("too many caves written")
+
+        offsets = self.tunnels + np.cumsum(degrees)
+        self.fp.seek(HEADER.size + (self.written + 1) * OFFSET_TYPE.itemsize)
+        self.fp.write(offsets.tobytes())
+
+        self.fp.seek(
+            self.coords_start + self.written * self.dimension * COORD_TYPE.itemsize
+        )
+        self.fp.write(coords.tobytes())
+
+        self.fp.seek(self.neighbours_start + self.tunnels * NEIGHBOUR_TYPE.itemsize)
+        self.fp.write(neighbours.tobytes())
+
+        self.written += len(degrees)
+        self.tunnels += len(neighbours)
+
+    def close(self):
+        if self.fp.closed:
+            return
+        self.fp.seek(0)
+        self.fp.write(HEADER.pack(MAGIC, self.caves, self.tunnels, self.dimension))
+        self.fp.close()
+
+        if self.written != self.caves:
+            raise ValueError(f"expected {self.caves} caves, wrote {self.written}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None:
+            self.fp.close()  # leave the original error to propagate
+        else:
+            self.close()
+
+
+def save(graph: CaveGraph, path: StrPath):
+    """Writes a CaveGraph as a binary level."""
+    with LevelWriter(path, len(graph), graph.dimension) as writer:
+        writer.write(np.diff(graph.offsets), graph.neighbours, graph.coords)
+
+
+def _array(
+    path: StrPath, dtype: np.dtype, offset: int, shape: tuple[int, ...], mmap: bool
+):
+    if not mmap or 0 in shape:
+        with open(path, "rb") as fp:
+            fp.seek(offset)
+            count = int(np.prod(shape))
+            return np.fromfile(fp, dtype=dtype, count=count).reshape(shape)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+
+def load(path: StrPath, mmap=True) -> CaveGraph:
+    """
+    Opens a binary level. With `mmap`, the arrays are read-only memory maps of
+    the file, so only the pages that are used are ever read from disk.
+    """
+    with open(path, "rb") as fp:
+        header = fp.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise ValueError(f"{path} is too short to be a binary level")
+
+    magic, caves, tunnels, dimension = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a binary level")
+
+    coords_start = HEADER.size + (caves + 1) * OFFSET_TYPE.itemsize
+    neighbours_start = coords_start + caves * dimension * COORD_TYPE.itemsize
+
+    return CaveGraph(
+        _array(path, OFFSET_TYPE, HEADER.size, (caves + 1,), mmap),
+        _array(path, NEIGHBOUR_TYPE, neighbours_start, (tunnels,), mmap),
+        _array(path, COORD_TYPE, coords_start, (caves, dimension), mmap),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m wumpus.binary",
+        description="Converts a JSON level to the binary level format.",
+    )
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path, nargs="?")
+    args = parser.parse_args()
+
+    output = args.output or args.input.with_suffix(".lvl")
+    save(CaveGraph.from_json(args.input.read_text()), output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+"""
+Monte Carlo difficulty estimates for levels.
+
+Plays many games on each level with a bot, through the same Level and
+PlayerController as a human would, and reports the bot's win rate, how many
+actions its games take and how it dies, with 95% confidence intervals:
+
+    python -m wumpus.difficulty --bot cautious --games 10000
+    python -m wumpus.difficulty 00.json 03.json --jobs 8 --output results.json
+
+Games are split into chunks across a process pool. Each worker parses the
+levels once and shares the cave maps between all of its games, and each chunk
+is reduced to a Tally before it is sent back. Game i always uses random stream
+i of the seed, so results are the same however many workers there are.
+"""
+
+import argparse
+import importlib.resources
+import json
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import wumpus.levels
+from .belief import Belief
+from .cave import Cave
+from .hazards import BottomlessPit, Sense
+from .level import Level, find_entrances
+from .player import PlayerController
+from .rng import BufferedGenerator, spawn_rngs
+from .sim import Cause
+
+
+class Bot(ABC):
+    """Plays one game through a PlayerController, one action at a time."""
+
+    def __init__(self, player: PlayerController, rng: BufferedGenerator):
+        self.player = player
+        self.rng = rng
+        self.moves = 0
+        self.arrows = 0
+        self.cause = Cause.NONE
+
+    @property
+    def playing(self) -> bool:
+        return self.player.alive and not self.player.win
+
+    @property
+    def location(self) -> int:
+        return self.player.cave.location
+
+    def tunnels(self, location: int) -> list[int]:
+        return self.player.level.get_cave(location).tunnels
+
+    def senses(self) -> Sense:
+        return self.player.level.get_nearby_senses(self.player.cave)
+
+    def move(self, location: int):
+        self.moves += 1
+        self.player.move(location)
+        if not self.player.alive:
+            hazard = self.player.level.hazards.get(self.location)
+            # The Wumpus may have fled after eating the player
+            self.cause = (
+                Cause.PIT if isinstance(hazard, BottomlessPit) else Cause.WUMPUS
+            )
+
+    def shoot(self, locations: list[int]):
+        self.arrows += 1
+        self.player.shoot(locations)
+        if not self.player.alive:
+            # Unless the arrow passed through the player's cave, a missed arrow
+            # startled the Wumpus into it, and it may have moved on since
+            self.cause = Cause.ARROW if self.location in locations else Cause.WUMPUS
+
+    @abstractmethod
+    def act(self):
+        """Takes one action: a move or a shot."""
+        pass
+
+
+class RandomBot(Bot):
+    """Walks to a random neighbouring cave every turn and never shoots."""
+
+    def act(self):
+        self.move(self.rng.choice(self.tunnels(self.location)))
+
+
+class CautiousBot(Bot):
+    """
+    Explores caves it hasn't visited, steering clear of the unexplored caves
+    next to a draft or bats, and shoots into a random unexplored neighbouring
+    cave when it smells the Wumpus. If it wanders for a while without finding
+    anywhere new, it gives up on avoiding caves and takes its chances.
+    """
+
+    def __init__(self, player: PlayerController, rng: BufferedGenerator):
+        super().__init__(player, rng)
+        self.visited = {self.location}
+        self.avoid: set[int] = set()
+        self.wandering = 0
+
+    def act(self):
+        senses = self.senses()
+        tunnels = self.tunnels(self.location)
+        unvisited = [tunnel for tunnel in tunnels if tunnel not in self.visited]
+
+        if senses & Sense.WUMPUS:
+            self.shoot([self.rng.choice(unvisited or tunnels)])
+            return
+        if senses:
+            self.avoid.update(unvisited)
+
+        if self.wandering > 2 * len(self.visited):
+            choices = unvisited or tunnels
+        else:
+            choices = (
+                [tunnel for tunnel in unvisited if tunnel not in self.avoid]
+                or [tunnel for tunnel in tunnels if tunnel not in self.avoid]
+                or tunnels
+            )
+        self.move(self.rng.choice(choices))
+
+        if self.location in self.visited:
+            self.wandering += 1
+        else:
+            self.wandering = 0
+            self.visited.add(self.location)
+            self.avoid.discard(self.location)
+
+
+class BeliefBot(Bot):
+    """
+    Keeps a Belief about where the hazards could be, given what it has
+    sensed, and explores the nearest of the least risky caves next to the
+    caves it has visited. When it is sure where the Wumpus is, it shoots it,
+    and rather than take a deadly risk it shoots a cave that could hold it.
+    """
+
+    def __init__(self, player: PlayerController, rng: BufferedGenerator):
+        super().__init__(player, rng)
+        self.belief = Belief(player.level)
+        self.observe()
+
+    def observe(self):
+        self.belief.visit(self.location, self.senses())
+
+    def search(self, through: set[int] | None = None) -> dict[int, int | None]:
+        """
+        Searches outwards from the player, only passing through the caves in
+        `through` if it is given. Returns the cave each cave reached was
+        reached from, in order of distance.
+        """
+        parents: dict[int, int | None] = {self.location: None}
+        queue = deque([self.location])
+        while queue:
+            location = queue.popleft()
+            if location != self.location and through is not None:
+                if location not in through:
+                    continue
+            for tunnel in self.tunnels(location):
+                if tunnel not in parents:
+                    parents[tunnel] = location
+                    queue.append(tunnel)
+        return parents
+
+    def route(self, parents: dict[int, int | None], target: int) -> list[int]:
+        path = [target]
+        while (parent := parents[path[-1]]) != self.location:
+            assert parent is not None
+            path.append(parent)
+        return path[::-1]
+
+    def act(self):
+        belief = self.belief
+        parents = self.search(belief.visited)
+        frontier = [
+            location
+            for location in parents
+            if location not in belief.visited
+            and location not in belief.known[Sense.BATS]
+        ]
+        target = min(frontier, key=belief.risk, default=None)
+
+        suspects = belief.suspects
+        if (wumpus := belief.wumpus()) is not None:
+            suspects = {wumpus}
+        if suspects and (
+            wumpus is not None or target is None or belief.danger(target) > 0
+        ):
+            anywhere = self.search()
+            paths = [
+                self.route(anywhere, cave)
+                for cave in sorted(suspects)
+                if cave in anywhere and len(self.route(anywhere, cave)) <= 5
+            ]
+            if paths:
+                path = self.rng.choice(paths)
+                self.shoot(path)
+                if self.playing:
+                    belief.missed(path)
+                    self.observe()
+                return
+
+        if target is None:
+            self.move(self.rng.choice(self.tunnels(self.location)))
+            if self.playing:
+                self.observe()
+            return
+
+        step = self.route(parents, target)[0]
+        self.move(step)
+        if self.playing:
+            if self.location != step:
+                belief.found(step, Sense.BATS)
+            self.observe()
+
+
+BOTS: dict[str, type[Bot]] = {
+    "random": RandomBot,
+    "cautious": CautiousBot,
+    "belief": BeliefBot,
+}
+
+
+@dataclass
+class Tally:
+    """Totals over a number of games, which can be added together."""
+
+    games: int = 0
+    wins: int = 0
+    timeouts: int = 0
+    actions: int = 0
+    actions_squared: int = 0
+    arrows: int = 0
+    causes: dict[str, int] = field(default_factory=dict)
+
+    def add(self, bot: Bot):
+        self.games += 1
+        self.wins += bot.player.win
+        self.timeouts += bot.playing
+        actions = bot.moves + bot.arrows
+        self.actions += actions
+        self.actions_squared += actions * actions
+        self.arrows += bot.arrows
+        if bot.cause != Cause.NONE:
+            name = bot.cause.name.lower()
+            self.causes[name] = self.causes.get(name, 0) + 1
+
+    def __add__(self, other: "Tally") -> "Tally":
+        causes = dict(self.causes)
+        for name, count in other.causes.items():
+            causes[name] = causes.get(name, 0) + count
+        return Tally(
+            self.games + other.games,
+            self.wins + other.wins,
+            self.timeouts + other.timeouts,
+            self.actions + other.actions,
+            self.actions_squared + other.actions_squared,
+            self.arrows + other.arrows,
+            causes,
+        )
+
+    def report(self, z=1.96) -> dict[str, object]:
+        """Summarises the games, with confidence intervals for `z` standard errors."""
+        mean = self.actions / max(self.games, 1)
+        variance = self.actions_squared / max(self.games, 1) - mean * mean
+        error = z * math.sqrt(max(variance, 0) / max(self.games, 1))
+        return {
+            "games": self.games,
+            "win_rate": self.wins / max(self.games, 1),
+            "win_rate_ci": wilson(self.wins, self.games, z),
+            "actions": mean,
+            "actions_ci": (mean - error, mean + error),
+            "arrows": self.arrows / max(self.games, 1),
+            "timeouts": self.timeouts,
+            "deaths": {
+                name: {
+                    "rate": count / self.games,
+                    "ci": wilson(count, self.games, z),
+                }
+                for name, count in sorted(self.causes.items())
+            },
+        }
+
+
+def wilson(successes: int, trials: int, z=1.96) -> tuple[float, float]:
+    """The Wilson score interval for a binomial proportion."""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials**2))
+    return centre - spread / denominator, centre + spread / denominator
+
+
+def play(
+    level_map: Mapping[int, Cave],
+    bot: type[Bot],
+    rng: BufferedGenerator,
+    max_actions=1000,
+    entrances: Mapping[int, Cave] | None = None,
+) -> Bot:
+    """
+    Plays a game to the end, or until the bot has taken `max_actions`.
+    `entrances` are passed on to the Level, so games on a map can share them.
+    """
+    level = Level(level_map, rng=rng, entrances=entrances)
+    player = bot(PlayerController(level), rng)
+    for _ in range(max_actions):
+        if not player.playing:
+            break
+        player.act()
+    return player
+
+
+def parse_map(level_map: str) -> dict[int, Cave]:
+    return {
+        cave["location"]: Cave(cave["location"], cave["tunnels"], tuple(cave["coords"]))
+        for cave in json.loads(level_map)
+    }
+
+
+# The maps of the levels being played and their entrances, found once in each worker
+_maps: dict[str, dict[int, Cave]] = {}
+_entrances: dict[str, Mapping[int, Cave]] = {}
+
+
+def _init_worker(level_maps: dict[str, str]):
+    for name, level_map in level_maps.items():
+        _maps[name] = parse_map(level_map)
+        _entrances[name] = find_entrances(_maps[name])
+
+
+def _play_chunk(
+    name: str, bot: str, seed: int, start: int, games: int, max_actions: int
+) -> tuple[str, Tally]:
+    tally = Tally()
+    for rng in spawn_rngs(seed, games, buffer_size=256, start=start):
+        tally.add(play(_maps[name], BOTS[bot], rng, max_actions, _entrances[name]))
+    return name, tally
+
+
+def _chunks(games: int, chunk: int) -> Iterator[tuple[int, int]]:
+    for start in range(0, games, chunk):
+        yield start, min(chunk, games - start)
+
+
+def estimate(
+    level_maps: dict[str, str],
+    bot="cautious",
+    games=1000,
+    seed=0,
+    jobs: int | None = None,
+    chunk=250,
+    max_actions=1000,
+) -> dict[str, Tally]:
+    """
+    Plays `games` games on each level with a bot across `jobs` processes,
+    returning the totals for each level.
+    """
+    if bot not in BOTS:
+        raise ValueError(f"unknown bot {bot!r}")
+
+    tallies = {name: Tally() for name in level_maps}
+    tasks = [
+        (name, bot, seed, start, count, max_actions)
+        for name in level_maps
+        for start, count in _chunks(games, chunk)
+    ]
+
+    if jobs == 1:
+        _init_worker(level_maps)
+        results = [_play_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(
+            jobs, initializer=_init_worker, initargs=(level_maps,)
+        ) as executor:
+            results = list(executor.map(_play_chunk, *zip(*tasks)))
+
+    for name, tally in results:
+        tallies[name] += tally
+    return tallies
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m wumpus.difficulty")
+    parser.add_argument(
+        "levels", nargs="*", help="levels in wumpus.levels to play (default: all)"
+    )
+    parser.add_argument("-b", "--bot", choices=list(BOTS), default="cautious")
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes")
+    parser.add_argument("--chunk", type=int, default=250, help="games per task")
+    parser.add_argument("--max-actions", type=int, default=1000)
+    parser.add_argument("-o", "--output", help="write results to a file")
+    args = parser.parse_args()
+
+    level_maps: dict[str, str] = {
+        resource.name: resource.read_text()
+        for resource in sorted(
+            importlib.resources.files(wumpus.levels).iterdir(),
+            key=lambda resource: resource.name,
+        )
+        if resource.name.endswith(".json")
+        and (not args.levels or resource.name in args.levels)
+    }
+    if missing := set(args.levels) - set(level_maps):
+        parser.error(f"unknown levels: {', '.join(sorted(missing))}")
+
+    tallies = estimate(
+        level_maps,
+        args.bot,
+        args.games,
+        args.seed,
+        args.jobs,
+        args.chunk,
+        args.max_actions,
+    )
+    report = {
+        "bot": args.bot,
+        "seed": args.seed,
+        "levels": {name: tally.report() for name, tally in tallies.items()},
+    }
+
+    for name, results in report["levels"].items():
+        low, high = results["win_rate_ci"]
+        print(
+            f"{name}: win rate {results['win_rate']:.3f} [{low:.3f}, {high:.3f}], "
+            f"{results['actions']:.1f} actions, deaths "
+            + ", ".join(
+                f"{cause} {death['rate']:.3f}"
+                for cause, death in results["deaths"].items()
+            )
+        )
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            fp.write(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
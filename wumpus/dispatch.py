@@ -0,0 +1,108 @@
+"""
+Iterative event dispatch.
+
+Handling an event can produce follow-up events, for example a PlayerMoved into
+a bat cave produces another PlayerMoved. Rather than recursing into nested
+generators for each follow-up, the Dispatcher keeps an explicit stack of the
+events still to be handled. A handler yields either events to pass back to the
+caller, or a Cascade of follow-up events, which are dispatched depth-first
+before the handler resumes. This gives the same order as recursively chaining
+the handlers, without growing the Python stack.
+"""
+
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+
+from .events import Event
+
+
+@dataclass
+class Cascade:
+    """Follow-up events to dispatch before the current handler continues."""
+
+    events: list[Event]
+
+
+type Handler[T] = Callable[[Event], Iterator[T | Cascade]]
+type TimingHook = Callable[[Event, float], None]
+
+
+class Dispatcher[T]:
+    """
+    Dispatches events to a handler, keeping count of how many events of each
+    type have been handled. The handler passes back items of type T, usually
+    the subset of events meant for the caller.
+
+    When timing is enabled, the time spent inside the handler for each event
+    (excluding follow-up events and the caller's own processing) is added to
+    `seconds` and passed to every timing hook.
+    """
+
+    def __init__(self, handler: Handler[T], timed=False):
+        self.handler = handler
+        self.timed = timed
+        self.counts: Counter[type] = Counter()
+        self.seconds: defaultdict[type, float] = defaultdict(float)
+        self.hooks: list[TimingHook] = []
+
+    def add_hook(self, hook: TimingHook):
+        """Calls `hook(event, seconds)` after each event is handled."""
+        self.hooks.append(hook)
+        self.timed = True
+
+    def reset_stats(self):
+        self.counts.clear()
+        self.seconds.clear()
+
+    def dispatch(self, event: Event) -> Iterator[T]:
+        """Handles an event, yielding the events passed back by the handler."""
+        return self._run([(True, self._start(event))])
+
+    def dispatch_all(self, events: Iterable[Event]) -> Iterator[T]:
+        """Handles a batch of events in order."""
+        return self._run([(False, iter(events))])
+
+    def _start(self, event: Event) -> Iterator[T | Cascade]:
+        self.counts[type(event)] += 1
+        reactions = self.handler(event)
+        if self.timed:
+            reactions = self._timed(event, reactions)
+        return reactions
+
+    def _run(self, stack: list[tuple[bool, Iterator]]) -> Iterator[T]:
+        # Each entry is either a queue of events waiting to be handled, or a
+        # running handler. Breaking out of the for loop leaves the iterator
+        # where it was, so it resumes once the entries above it are done.
+        while stack:
+            is_handler, iterator = stack[-1]
+            for item in iterator:
+                if not is_handler:
+                    stack.append((True, self._start(item)))
+                    break
+                if type(item) is Cascade:
+                    stack.append((False, iter(item.events)))
+                    break
+                yield item
+            else:
+                stack.pop()
+
+    def _timed(
+        self, event: Event, reactions: Iterator[T | Cascade]
+    ) -> Iterator[T | Cascade]:
+        """Wraps a running handler to measure the time spent inside it."""
+        seconds = 0.0
+        while True:
+            start = time.perf_counter()
+            reaction = next(reactions, None)
+            seconds += time.perf_counter() - start
+            if reaction is None:
+                break
+            yield reaction
+        self._record(event, seconds)
+
+    def _record(self, event: Event, seconds: float):
+        self.seconds[type(event)] += seconds
+        for hook in self.hooks:
+            hook(event, seconds)
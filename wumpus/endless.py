@@ -0,0 +1,339 @@
+"""
+Endless levels, made of chunks of caves generated as the player explores.
+
+The world is an infinite grid of square chunks. A chunk's caves, tunnels and
+hazards are generated from the level's seed and the chunk's position, so a
+chunk can be evicted from memory and later regenerated exactly as it was.
+Tunnels between neighbouring chunks are generated from the seed and the border
+they cross, so both chunks agree on them without loading each other.
+"""
+
+import math
+import random
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping
+
+from .cave import Cave
+from .events import Event, PlayerMoved
+from .hazards import BottomlessPit, Hazard, Superbats, Wumpus
+from .level import Level
+from .rng import Random
+
+type ChunkKey = tuple[int, int]
+
+
+def _zigzag(n: int) -> int:
+    """Maps the integers onto the natural numbers: 0, -1, 1, -2, 2, ..."""
+    return 2 * n if n >= 0 else -2 * n - 1
+
+
+def _unzigzag(n: int) -> int:
+    return n // 2 if n % 2 == 0 else -(n + 1) // 2
+
+
+def _pair(key: ChunkKey) -> int:
+    """Numbers every chunk, counting outwards from the origin."""
+    a, b = map(_zigzag, key)
+    return a * a + a + b if a >= b else a + b * b
+
+
+def _unpair(n: int) -> ChunkKey:
+    root = math.isqrt(n)
+    rest = n - root * root
+    a, b = (rest, root) if rest < root else (root, rest - root)
+    return _unzigzag(a), _unzigzag(b)
+
+
+class ChunkedCaves(Mapping[int, Cave]):
+    """
+    An infinite map of caves, generated a chunk at a time when a cave in the
+    chunk is first looked up. Location n is cave n % chunk_size of chunk
+    n // chunk_size, where chunks are numbered outwards from the origin.
+
+    Loaded chunks are kept in least recently used order, and once there are
+    more than `max_chunks`, the oldest are evicted unless `pinned` says they
+    must stay. Iterating over the map only gives the caves that are loaded.
+    """
+
+    def __init__(self, seed: object = 0, chunk_size=32, portals=2, max_chunks=64):
+        if chunk_size < 4:
+            raise ValueError("chunks need at least 4 caves")
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.portals = portals
+        self.max_chunks = max_chunks
+        self.chunks: OrderedDict[ChunkKey, dict[int, Cave]] = OrderedDict()
+
+        self.on_load: list[Callable[[ChunkKey], None]] = []
+        self.on_evict: list[Callable[[ChunkKey], None]] = []
+        self.pinned: Callable[[ChunkKey], bool] = lambda key: False
+
+        # The side of a chunk, so caves are about one unit apart
+        self.scale = math.sqrt(chunk_size)
+
+    def chunk_of(self, location: int) -> ChunkKey:
+        return _unpair(location // self.chunk_size)
+
+    def location(self, key: ChunkKey, index: int) -> int:
+        return _pair(key) * self.chunk_size + index
+
+    def load(self, key: ChunkKey) -> dict[int, Cave]:
+        """Returns the caves in a chunk, generating it if it isn't loaded."""
+        if (caves := self.chunks.get(key)) is not None:
+            self.chunks.move_to_end(key)
+            return caves
+
+        caves = self._generate(key)
+        self.chunks[key] = caves
+        for callback in self.on_load:
+            callback(key)
+        self.evict()
+        return caves
+
+    def evict(self):
+        """Evicts the least recently used chunks that aren't pinned."""
+        for key in list(self.chunks):
+            if len(self.chunks) <= self.max_chunks:
+                break
+            if self.pinned(key):
+                continue
+            for callback in self.on_evict:
+                callback(key)
+            del self.chunks[key]
+
+    def random_location(self, near: int, radius: int, rng: Random = random) -> int:
+        """
+        Chooses a random cave in the chunks within `radius` chunks of a cave,
+        without loading any of them.
+        """
+        x, y = self.chunk_of(near)
+        key = (
+            x + rng.randrange(-radius, radius + 1),
+            y + rng.randrange(-radius, radius + 1),
+        )
+        return self.location(key, rng.randrange(self.chunk_size))
+
+    def rng(self, key: ChunkKey, purpose: str) -> random.Random:
+        """A random number generator determined by the seed, a chunk and a purpose."""
+        return random.Random(f"{self.seed}:{key[0]}:{key[1]}:{purpose}")
+
+    def _points(self, key: ChunkKey) -> list[tuple[float, float]]:
+        """The position of each cave within a chunk, in [0, 1)²."""
+        rng = self.rng(key, "points")
+        return [(rng.random(), rng.random()) for _ in range(self.chunk_size)]
+
+    def _portals(self, key: ChunkKey, dx: int, dy: int) -> list[tuple[int, int]]:
+        """
+        Returns the tunnels across the east (dx = 1) or north (dy = 1) border of
+        a chunk, as pairs of cave indices in this chunk and the next.
+        """
+        axis = 0 if dx else 1
+        here = self._points(key)
+        there = self._points((key[0] + dx, key[1] + dy))
+
+        # Join caves near the border, on both sides
+        near_here = sorted(range(self.chunk_size), key=lambda i: -here[i][axis])
+        near_there = sorted(range(self.chunk_size), key=lambda i: there[i][axis])
+        candidates = max(self.portals, self.chunk_size // 4)
+
+        rng = self.rng(key, f"portals:{dx}:{dy}")
+        return list(
+            zip(
+                rng.sample(near_here[:candidates], self.portals),
+                rng.sample(near_there[:candidates], self.portals),
+            )
+        )
+
+    def _generate(self, key: ChunkKey) -> dict[int, Cave]:
+        points = self._points(key)
+        size = self.chunk_size
+        tunnels: list[set[int]] = [set() for _ in range(size)]
+
+        def join(a: int, b: int):
+            tunnels[a].add(b)
+            tunnels[b].add(a)
+
+        # A loop around the centre of the chunk, with every other cave joined
+        # across to the cave opposite it
+        ring = sorted(
+            range(size),
+            key=lambda i: math.atan2(points[i][1] - 0.5, points[i][0] - 0.5),
+        )
+        for i in range(size):
+            join(ring[i], ring[(i + 1) % size])
+        for i in range(0, size // 2, 2):
+            join(ring[i], ring[i + size // 2])
+
+        # Tunnels out of the chunk, to the east, north, west and south
+        x, y = key
+        outside: list[list[int]] = [[] for _ in range(size)]
+        for here, there in self._portals(key, 1, 0):
+            outside[here].append(self.location((x + 1, y), there))
+        for here, there in self._portals(key, 0, 1):
+            outside[here].append(self.location((x, y + 1), there))
+        for there, here in self._portals((x - 1, y), 1, 0):
+            outside[here].append(self.location((x - 1, y), there))
+        for there, here in self._portals((x, y - 1), 0, 1):
+            outside[here].append(self.location((x, y - 1), there))
+
+        rng = self.rng(key, "heights")
+        return {
+            self.location(key, i): Cave(
+                self.location(key, i),
+                sorted(self.location(key, j) for j in tunnels[i]) + outside[i],
+                (
+                    (x + points[i][0]) * self.scale,
+                    (y + points[i][1]) * self.scale,
+                    rng.uniform(-0.5, 0.5),
+                ),
+            )
+            for i in range(size)
+        }
+
+    def __getitem__(self, location: int) -> Cave:
+        if location not in self:
+            raise KeyError(location)
+        return self.load(self.chunk_of(location))[location]
+
+    def __contains__(self, location: object) -> bool:
+        return isinstance(location, int) and location >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        for caves in list(self.chunks.values()):
+            yield from list(caves)
+
+    def __len__(self) -> int:
+        return sum(map(len, self.chunks.values()))
+
+
+class RoamingSuperbats(Superbats):
+    """Superbats that drop the player within a few chunks of their cave."""
+
+    def __init__(self, level: ChunkedCaves, radius: int, rng: Random = random):
+        super().__init__(level, rng)
+        self.level: ChunkedCaves = level
+        self.radius = radius
+
+    def destination(self) -> int:
+        if self.location is None:
+            raise Exception("Cannot snatch the player without a location.")
+        return self.level.random_location(self.location, self.radius, self.rng)
+
+
+class EndlessLevel(Level):
+    """
+    A Level on an infinite, procedurally generated map.
+
+    Each chunk has its own bottomless pits and superbats, which are placed
+    when the chunk is loaded and removed when it is evicted, so they are
+    always where the seed says. The chunks within `radius` of the player and of
+    the Wumpus stay loaded, so the player can always sense every hazard next to
+    them, and the single Wumpus is never evicted.
+    """
+
+    def __init__(
+        self,
+        seed: object = 0,
+        chunk_size=32,
+        radius=1,
+        max_chunks=64,
+        pits=1,
+        bats=1,
+        teleport_radius=2,
+        debug=False,
+        rng: Random = random,
+    ):
+        if pits + bats > chunk_size:
+            raise ValueError("too many hazards for the chunk size")
+        if max_chunks < 2 * (2 * radius + 1) ** 2:
+            raise ValueError("max_chunks is too small to keep the chunks in use loaded")
+
+        self.caves = ChunkedCaves(seed, chunk_size, max_chunks=max_chunks)
+        self.radius = radius
+        self.teleport_radius = teleport_radius
+        self.chunk_hazards: dict[ChunkKey, list[Hazard]] = {}
+
+        self.caves.on_load.append(self._spawn_chunk_hazards)
+        self.caves.on_evict.append(self._remove_chunk_hazards)
+        self.caves.pinned = self._is_pinned
+
+        # Every chunk gets `pits` pits and `bats` bats as it is loaded
+        super().__init__(self.caves, debug, rng=rng, pits=pits, bats=bats)
+
+    def spawn_hazards(self):
+        """Places a new Wumpus near the player, or near the origin to begin with."""
+        for hazard in self.spawned:
+            if hazard.location is not None:
+                self.remove_hazard(hazard)
+
+        self.visit(
+            self.caves.location((0, 0), 0) if self.player is None else self.player
+        )
+        self.spawned = [Wumpus(self.level, self.rng)]
+        for hazard in self.spawned:
+            self.place_hazard(hazard, self.choose_empty_cave().location)
+
+    def _find_entrances(self) -> ChunkedCaves:
+        # Chunks and the portals between them are generated with two-way
+        # tunnels, and can't all be reversed up front
+        return self.caves
+
+    def visit(self, location: int):
+        """Loads every chunk within `radius` of a cave."""
+        x, y = self.caves.chunk_of(location)
+        for dx in range(-self.radius, self.radius + 1):
+            for dy in range(-self.radius, self.radius + 1):
+                self.caves.load((x + dx, y + dy))
+
+    def react(self, event: Event):
+        if isinstance(event, PlayerMoved):
+            # Load the caves around the player before looking for hazards
+            self.player = event.location
+            self.visit(event.location)
+        return super().react(event)
+
+    def place_hazard(self, hazard: Hazard, location: int):
+        # Load the cave's chunk first, so its own hazards don't land on this one
+        self.get_cave(location)
+        super().place_hazard(hazard, location)
+
+    def _is_pinned(self, key: ChunkKey) -> bool:
+        centres = [self.player] + [hazard.location for hazard in self.spawned]
+        for location in centres:
+            if location is None:
+                continue
+            x, y = self.caves.chunk_of(location)
+            if max(abs(key[0] - x), abs(key[1] - y)) <= self.radius:
+                return True
+        return False
+
+    def _spawn_chunk_hazards(self, key: ChunkKey):
+        for location in self.caves.chunks[key]:
+            if location not in self.hazards:
+                self.empty_caves.add(location)
+
+        rng = self.caves.rng(key, "hazards")
+        indices = rng.sample(range(self.caves.chunk_size), self.pits + self.bats)
+        hazards: list[Hazard] = [
+            BottomlessPit(self.caves, self.rng) for _ in range(self.pits)
+        ]
+        hazards += [
+            RoamingSuperbats(self.caves, self.teleport_radius, self.rng)
+            for _ in range(self.bats)
+        ]
+
+        self.chunk_hazards[key] = []
+        for hazard, index in zip(hazards, indices):
+            location = self.caves.location(key, index)
+            if location in self.hazards:
+                continue  # the Wumpus got here first
+            self.place_hazard(hazard, location)
+            self.chunk_hazards[key].append(hazard)
+
+    def _remove_chunk_hazards(self, key: ChunkKey):
+        for hazard in self.chunk_hazards.pop(key, []):
+            # A hazard may have already been replaced by the Wumpus
+            if hazard.location is not None:
+                self.remove_hazard(hazard)
+        for location in self.caves.chunks[key]:
+            self.empty_caves.discard(location)
@@ -19,6 +19,9 @@ type Event = (
     | str
 )
 
+# The events a Level passes back to the PlayerController
+type PlayerEvent = PlayerKilled | PlayerWon | PlayerMoved | ArrowHit | str
+
 
 @dataclass
 class EntityMoved:
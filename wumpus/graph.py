@@ -0,0 +1,148 @@
+"""
+Array-backed storage for the cave graph.
+
+A CaveGraph keeps tunnels in compressed sparse row (CSR) form: the tunnels of
+cave `i` are `neighbours[offsets[i]:offsets[i + 1]]`, and coordinates are kept
+in a single `(n, d)` array. Caves are only materialised as lightweight
+CaveViews when they are looked up, so a map with hundreds of thousands of
+caves costs three arrays rather than a dataclass and a list per cave.
+"""
+
+import json
+from collections.abc import Iterable, Iterator, Mapping
+
+import numpy as np
+import numpy.typing as npt
+
+from .cave import Cave
+
+
+class CaveView(Cave):
+    """
+    A Cave whose tunnels and coordinates are read from a CaveGraph.
+
+    Cave's __init__ isn't run, since it would copy the fields out of the
+    arrays up front. Instead each field is converted the first time it is read
+    and kept, so a view can be read repeatedly without allocating. Unlike a
+    Cave, a view equals any Cave with the same fields.
+    """
+
+    def __init__(self, graph: "CaveGraph", location: int):
+        self.graph = graph
+        self.location = location
+
+    def __getattr__(self, name: str):
+        # Only called for fields that haven't been read yet
+        match name:
+            case "tunnels":
+                value = self.graph.tunnels(self.location).tolist()
+            case "coords":
+                value = tuple(self.graph.coords[self.location].tolist())
+            case _:
+                raise AttributeError(name)
+        setattr(self, name, value)
+        return value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Cave):
+            return NotImplemented
+        return (self.location, self.tunnels, self.coords) == (
+            other.location,
+            other.tunnels,
+            other.coords,
+        )
+
+
+class CaveGraph(Mapping[int, Cave]):
+    """
+    A read-only mapping of locations to caves, stored as NumPy arrays.
+
+    Locations must be numbered 0 to n - 1, which lets a location double as the
+    row index into `offsets` and `coords`.
+    """
+
+    def __init__(
+        self,
+        offsets: npt.NDArray[np.integer],
+        neighbours: npt.NDArray[np.integer],
+        coords: npt.NDArray[np.floating],
+    ):
+        if offsets.ndim != 1 or len(offsets) != len(coords) + 1:
+            raise ValueError("offsets must have one more entry than there are caves")
+        if coords.ndim != 2:
+            raise ValueError("coords must be an (n, d) array")
+
+        self.offsets = offsets
+        self.neighbours = neighbours
+        self.coords = coords
+
+    @classmethod
+    def from_caves(cls, caves: Iterable[Cave]) -> "CaveGraph":
+        caves = sorted(caves, key=lambda cave: cave.location)
+        if any(cave.location != index for index, cave in enumerate(caves)):
+            raise ValueError("cave locations must be numbered 0 to n - 1")
+
+        degrees = np.fromiter(
+            (len(cave.tunnels) for cave in caves), np.int64, len(caves)
+        )
+        offsets = np.zeros(len(caves) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=offsets[1:])
+
+        neighbours = np.fromiter(
+            (tunnel for cave in caves for tunnel in cave.tunnels),
+            np.int32,
+            int(offsets[-1]),
+        )
+        coords = np.array([cave.coords for cave in caves], dtype=np.float64)
+
+        return cls(offsets, neighbours, coords.reshape(len(caves), -1))
+
+    @classmethod
+    def from_json(cls, level_map: str) -> "CaveGraph":
+        """Parses a level in the same JSON format accepted by Level."""
+        return cls.from_caves(
+            Cave(cave["location"], cave["tunnels"], tuple(cave["coords"]))
+            for cave in json.loads(level_map)
+        )
+
+    @property
+    def dimension(self) -> int:
+        return self.coords.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the underlying arrays."""
+        return self.offsets.nbytes + self.neighbours.nbytes + self.coords.nbytes
+
+    def tunnels(self, location: int) -> npt.NDArray[np.integer]:
+        """Returns the tunnels of a cave as a view into `neighbours`."""
+        return self.neighbours[self.offsets[location] : self.offsets[location + 1]]
+
+    def reversed(self) -> "CaveGraph":
+        """Returns the graph with every tunnel running the other way."""
+        sources = np.repeat(
+            np.arange(len(self), dtype=self.neighbours.dtype), np.diff(self.offsets)
+        )
+        order = np.argsort(self.neighbours, kind="stable")
+        offsets = np.zeros_like(self.offsets)
+        np.cumsum(np.bincount(self.neighbours, minlength=len(self)), out=offsets[1:])
+        return CaveGraph(offsets, sources[order], self.coords)
+
+    def degree(self, location: int) -> int:
+        return int(self.offsets[location + 1] - self.offsets[location])
+
+    def __getitem__(self, location: int) -> Cave:
+        if location not in self:
+            raise KeyError(location)
+        return CaveView(self, location)
+
+    def __contains__(self, location: object) -> bool:
+        if not isinstance(location, (int, np.integer)):
+            return False
+        return bool(0 <= location < len(self))
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self)))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
@@ -1,19 +1,34 @@
-from collections.abc import Iterator
-from random import choice
+from collections.abc import Iterator, Mapping, Sequence
+from enum import IntFlag, auto
+import random
 from .events import ArrowHit, Event, PlayerKilled, PlayerWon, WumpusMoved
 from .cave import Cave
+from .graph import CaveGraph
 from .events import PlayerMoved
+from .rng import Random
+
+
+class Sense(IntFlag):
+    """Kinds of hazard that can be sensed from a neighbouring cave."""
+
+    NONE = 0
+    PIT = auto()
+    BATS = auto()
+    WUMPUS = auto()
 
 
 class Hazard:
     """
     Hazards are located in a cave, they can affect the player's location or
-    cause the player to lose.
+    cause the player to lose. Any random choices are drawn from `rng`.
     """
 
-    def __init__(self, level: dict[int, Cave]):
+    sense = Sense.NONE
+
+    def __init__(self, level: Mapping[int, Cave], rng: Random = random):
         self.location: int | None = None
         self.level = level
+        self.rng = rng
 
     def on_arrow_miss(self) -> Iterator[Event]:
         """Called when an arrow does not hit any hazards that are not immune."""
@@ -45,6 +60,8 @@ class Wumpus(Hazard):
     eating the player.
     """
 
+    sense = Sense.WUMPUS
+
     def nearby_msg(self):
         return "I smell a Wumpus."
 
@@ -64,15 +81,17 @@ class Wumpus(Hazard):
         if self.location is None:
             raise Exception("Cannot startle Wumpus without location.")
 
-        move = choice([*self.level[self.location].tunnels, None])
+        move = self.rng.choice([*self.level[self.location].tunnels, None])
 
-        if move:
+        if move is not None:
             yield WumpusMoved(move)
 
 
 class BottomlessPit(Hazard):
     """Kills the player when it enters the cave."""
 
+    sense = Sense.PIT
+
     def nearby_msg(self):
         return "I feel a draft."
 
@@ -87,9 +106,27 @@ class Superbats(Hazard):
     with hazards.
     """
 
+    sense = Sense.BATS
+
+    def __init__(self, level: Mapping[int, Cave], rng: Random = random):
+        super().__init__(level, rng)
+        # Maps never change, so the list of caves is only built once
+        self._locations: Sequence[int] | None = None
+
     def nearby_msg(self):
         return "Bats nearby."
 
     def on_player_enter(self):
         yield "ZAP -- Super bat snatch! Elsewhereville for you!"
-        yield PlayerMoved(choice(list(self.level.values())).location)
+        yield PlayerMoved(self.destination())
+
+    def destination(self) -> int:
+        """Chooses the cave the player is dropped in."""
+        if self._locations is None:
+            # A CaveGraph's caves are numbered, so they needn't be listed
+            self._locations = (
+                range(len(self.level))
+                if isinstance(self.level, CaveGraph)
+                else list(self.level)
+            )
+        return self.rng.choice(self._locations)
@@ -1,8 +1,9 @@
 import json
-from random import choice
-from collections.abc import Iterator
-from typing import assert_never
-from itertools import chain
+import random
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Literal, assert_never
 
 from .events import (
     ArrowMissed,
@@ -10,50 +11,276 @@ from .events import (
     PlayerKilled,
     PlayerWon,
     PlayerMoved,
+    PlayerEvent,
     ArrowShot,
     ArrowHit,
     WumpusMoved,
 )
-from .hazards import Hazard, BottomlessPit, Superbats, Wumpus
+from .hazards import Hazard, BottomlessPit, Sense, Superbats, Wumpus
 from .cave import Cave
+from .dispatch import Cascade, Dispatcher
+from .graph import CaveGraph
+from .rng import Random
+
+
+class CaveSet:
+    """
+    A set of cave locations that supports adding, removing and choosing a
+    random location in O(1). Locations are kept in a sequence, and removing one
+    moves the last location into its place.
+
+    `CaveSet.every(n)` holds every location from 0 to n - 1 and is made in
+    constant time: the sequence starts out as 0, 1, ..., n - 1 without being
+    stored, and only the positions that have changed since are kept.
+    """
+
+    def __init__(self, locations: Iterable[int] = ()):
+        # Locations below `numbered` are at their own position unless moved
+        self.numbered = 0
+        self.size = 0
+        self.locations: dict[int, int] = {}
+        # None marks a numbered location that has been removed
+        self.positions: dict[int, int | None] = {}
+        for location in locations:
+            self.add(location)
+
+    @classmethod
+    def every(cls, count: int) -> "CaveSet":
+        caves = cls()
+        caves.numbered = caves.size = count
+        return caves
+
+    def _position(self, location: int) -> int | None:
+        if location in self.positions:
+            return self.positions[location]
+        if 0 <= location < self.numbered:
+            return location
+        return None
+
+    def add(self, location: int):
+        if self._position(location) is None:
+            self.locations[self.size] = location
+            self.positions[location] = self.size
+            self.size += 1
+
+    def discard(self, location: int):
+        position = self._position(location)
+        if position is None:
+            return
+        self.size -= 1
+        last = self.locations.pop(self.size, self.size)
+        if 0 <= location < self.numbered:
+            self.positions[location] = None
+        else:
+            del self.positions[location]
+        if last != location:
+            self.locations[position] = last
+            self.positions[last] = position
+
+    def choice(self, rng: Random = random) -> int:
+        if not self.size:
+            raise IndexError("Cannot choose from an empty set")
+        return self[rng.randrange(self.size)]
+
+    def __getitem__(self, position: int) -> int:
+        if not 0 <= position < self.size:
+            raise IndexError(position)
+        return self.locations.get(position, position)
+
+    def __contains__(self, location: object) -> bool:
+        return isinstance(location, int) and self._position(location) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return (self[position] for position in range(self.size))
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def find_entrances(level_map: Mapping[int, Cave]) -> Mapping[int, Cave]:
+    """
+    Reverses every tunnel in a map, giving for each cave the caves with a
+    tunnel leading into it, as the tunnels of a cave at the same location.
+    """
+    if isinstance(level_map, CaveGraph):
+        return level_map.reversed()
+
+    entrances = {
+        location: Cave(location, [], cave.coords)
+        for location, cave in level_map.items()
+    }
+    for cave in level_map.values():
+        for tunnel in cave.tunnels:
+            entrances[tunnel].tunnels.append(cave.location)
+    return entrances
+
+
+@dataclass(frozen=True)
+class LevelSnapshot:
+    """
+    The mutable state of a Level: the location of each hazard (in the order
+    they were spawned, None once a hazard has been removed), the player's
+    location and optionally the state of the level's random number generator.
+    """
+
+    hazards: tuple[int | None, ...]
+    player: int | None
+    random_state: object | None = None
 
 
 class Level:
-    """A connected map of caves, as well as the locations of hazards."""
+    """
+    A connected map of caves, as well as the locations of hazards: `pits`
+    bottomless pits, `bats` superbats and one Wumpus.
+
+    The map can be given as JSON, and stored in one of two ways:
+        - "dict": a dictionary of Cave dataclasses, one per cave
+        - "csr": a CaveGraph, which keeps tunnels and coordinates in NumPy
+          arrays and is much more compact for large generated maps
+    An already loaded map, such as a binary level opened with
+    `wumpus.binary.load`, can also be passed in directly. Maps are never
+    modified, so one map can be shared by many levels.
+
+    Hazards are indexed as they are placed and moved: `hazard_locations` holds
+    the caves occupied by each type of hazard, and `senses` holds, for every
+    cave next to a hazard, the kinds of hazard that can be sensed from it.
+    Tunnels may be one-way, so `entrances` maps each cave to a cave whose
+    tunnels lead the other way, into it: a hazard is sensed from its cave's
+    entrances. They only depend on the map, so levels sharing a map can share
+    them too by passing `entrances`, from `find_entrances` or another level,
+    rather than each reversing the map again. The caves with no hazard are
+    kept in `empty_caves`, so a random one can be chosen in constant time.
+
+    Random choices, by the level and its hazards, are drawn from `rng`. This is
+    the global `random` module unless another generator is given, such as a
+    `random.Random` or one of the streams from `wumpus.rng.spawn_rngs`.
+    """
 
-    def __init__(self, level_map: str, debug=False):
+    def __init__(
+        self,
+        level_map: str | Mapping[int, Cave],
+        debug=False,
+        storage: Literal["dict", "csr"] = "dict",
+        rng: Random = random,
+        pits=2,
+        bats=2,
+        entrances: Mapping[int, Cave] | None = None,
+    ):
         self.debug = debug
-        level = json.loads(level_map)
-        self.level: dict[int, Cave] = {
-            cave["location"]: Cave(
-                cave["location"], cave["tunnels"], tuple(cave["coords"])
-            )
-            for cave in level
-        }
+        self.rng = rng
+        self.pits = pits
+        self.bats = bats
+        self.dispatcher: Dispatcher[PlayerEvent] = Dispatcher(self.react)
+        self.level: Mapping[int, Cave]
+        if isinstance(level_map, str):
+            match storage:
+                case "dict":
+                    self.level = {
+                        cave["location"]: Cave(
+                            cave["location"], cave["tunnels"], tuple(cave["coords"])
+                        )
+                        for cave in json.loads(level_map)
+                    }
+                case "csr":
+                    self.level = CaveGraph.from_json(level_map)
+                case _:
+                    assert_never(storage)
+        else:
+            self.level = level_map
         self.hazards: dict[int, Hazard] = {}
+        self.hazard_locations: defaultdict[type[Hazard], set[int]] = defaultdict(set)
+        self.senses: dict[int, Sense] = {}
+        # Number of hazards of each kind next to a cave, so senses can be
+        # cleared once the last one leaves
+        self._sense_counts: Counter[tuple[int, Sense]] = Counter()
         self.player: int | None = None
+        self.empty_caves = (
+            CaveSet.every(len(self.level))
+            if isinstance(self.level, CaveGraph)
+            else CaveSet(self.level)
+        )
+        self.entrances = entrances if entrances is not None else self._find_entrances()
+
+        self.spawned: list[Hazard] = []
+        self.spawn_hazards()
+
+    def _find_entrances(self) -> Mapping[int, Cave]:
+        return find_entrances(self.level)
+
+    def get_entrances(self, location: int) -> list[int]:
+        """Returns the caves with a tunnel leading into a cave."""
+        return self.entrances[location].tunnels
+
+    def spawn_hazards(self):
+        """Replaces any existing hazards with a fresh set in random empty caves."""
+        for hazard in self.spawned:
+            if hazard.location is not None:
+                self.remove_hazard(hazard)
 
-        # Spawn 2 bottomless pits, 2 superbats and 1 Wumpus
-        for hazard in [
-            BottomlessPit(self.level),
-            BottomlessPit(self.level),
-            Superbats(self.level),
-            Superbats(self.level),
-            Wumpus(self.level),
-        ]:
-            location = self.choose_empty_cave().location
-            self.hazards[location] = hazard
-            hazard.location = location
-
-    def handle_event(
-        self, event: Event
-    ) -> Iterator[PlayerKilled | PlayerWon | PlayerMoved | ArrowHit | str]:
+        # Leave room for the Wumpus and the player
+        if self.pits + self.bats + 2 > len(self.level):
+            raise ValueError("not enough caves for the hazards and the player")
+
+        self.spawned = [
+            *(BottomlessPit(self.level, self.rng) for _ in range(self.pits)),
+            *(Superbats(self.level, self.rng) for _ in range(self.bats)),
+            Wumpus(self.level, self.rng),
+        ]
+        for hazard in self.spawned:
+            self.place_hazard(hazard, self.choose_empty_cave().location)
+
+    def snapshot(self, random_state=True) -> LevelSnapshot:
         """
-        Handles an event triggered by an object in the game.
+        Captures the state of the level that changes during play, without
+        copying the cave graph, so it can later be passed to `restore`.
+        """
+        return LevelSnapshot(
+            tuple(hazard.location for hazard in self.spawned),
+            self.player,
+            self.rng.getstate() if random_state else None,
+        )
+
+    def restore(self, snapshot: LevelSnapshot):
+        """Returns the hazards, player and random state to a snapshot."""
+        if len(snapshot.hazards) != len(self.spawned):
+            raise ValueError("snapshot was taken from a different set of hazards")
+
+        moved = [
+            (hazard, location)
+            for hazard, location in zip(self.spawned, snapshot.hazards)
+            if hazard.location != location
+        ]
+        for hazard, _ in moved:
+            if hazard.location is not None:
+                self.remove_hazard(hazard)
+        for hazard, location in moved:
+            if location is not None:
+                self.place_hazard(hazard, location)
+
+        self.player = snapshot.player
+        if snapshot.random_state is not None:
+            self.rng.setstate(snapshot.random_state)
+
+    def handle_event(self, event: Event) -> Iterator[PlayerEvent]:
+        """
+        Handles an event triggered by an object in the game, along with any
+        events that follow from it.
 
         Yields:
             - Events to be handled by the PlayerController
         """
+        return self.dispatcher.dispatch(event)
+
+    def handle_events(self, events: Iterable[Event]) -> Iterator[PlayerEvent]:
+        """Handles a batch of events in order."""
+        return self.dispatcher.dispatch_all(events)
+
+    def react(self, event: Event) -> Iterator[PlayerEvent | Cascade]:
+        """
+        Reacts to a single event, yielding events for the PlayerController and
+        Cascades of events raised by hazards, which the dispatcher handles
+        before resuming.
+        """
         if self.debug:
             print(event)
         match event:
@@ -69,33 +296,21 @@ class Level:
                 if self.debug:
                     print(f"handling player moved, hazard: {hazard}, cave: {cave}")
                 if hazard:
-                    yield from chain(
-                        *(
-                            self.handle_event(event)
-                            for event in hazard.on_player_enter()
-                        )
-                    )
+                    yield Cascade(list(hazard.on_player_enter()))
 
             case WumpusMoved(location):
                 wumpus = self.get_hazard_in_cave(
                     self.get_cave(self.get_wumpus_location())
                 )
-                if not wumpus or not wumpus.location:
+                if not wumpus:
                     raise ValueError("no wumpus")
 
                 # move the wumpus
-                self.hazards[location] = wumpus
-                del self.hazards[wumpus.location]
-                wumpus.location = location
+                self.move_hazard(wumpus, location)
 
                 # if we enter the room the player is in
                 if wumpus.location == self.player:
-                    yield from chain(
-                        *(
-                            self.handle_event(event)
-                            for event in wumpus.on_player_enter()
-                        )
-                    )
+                    yield Cascade(list(wumpus.on_player_enter()))
             case ArrowShot(location):
                 hazard = self.get_hazard_in_cave(self.get_cave(location))
 
@@ -104,29 +319,16 @@ class Level:
                     yield PlayerKilled()
                     return
 
+                # Only the hazard in the cave the arrow enters can be hit
                 if hazard:
-                    yield from chain(
-                        *(
-                            self.handle_event(event)
-                            for event in chain(
-                                *(
-                                    hazard.on_arrow_enter()
-                                    for hazard in self.hazards.values()
-                                )
-                            )
-                        )
-                    )
+                    yield Cascade(list(hazard.on_arrow_enter()))
             case ArrowMissed():
-                yield from chain(
-                    *(
-                        self.handle_event(event)
-                        for event in chain(
-                            *(
-                                hazard.on_arrow_miss()
-                                for hazard in self.hazards.values()
-                            )
-                        )
-                    )
+                yield Cascade(
+                    [
+                        event
+                        for hazard in self.hazards.values()
+                        for event in hazard.on_arrow_miss()
+                    ]
                 )
             case str():
                 yield event
@@ -134,18 +336,64 @@ class Level:
                 assert_never(event)
 
     def get_wumpus_location(self) -> int:
-        cave = next(
-            (hazard for hazard in self.hazards.values() if isinstance(hazard, Wumpus))
-        ).location
-        if not cave:
-            raise ValueError()
-        return cave
+        for location in self.hazard_locations[Wumpus]:
+            return location
+        raise ValueError("no wumpus")
+
+    def place_hazard(self, hazard: Hazard, location: int):
+        """
+        Puts a hazard in a cave, replacing any hazard already there, and
+        updates the hazard index.
+        """
+        if replaced := self.hazards.get(location):
+            self.remove_hazard(replaced)
+
+        self.hazards[location] = hazard
+        self.empty_caves.discard(location)
+        hazard.location = location
+        self.hazard_locations[type(hazard)].add(location)
+        self._update_senses(location, hazard.sense, 1)
+
+    def remove_hazard(self, hazard: Hazard):
+        """Takes a hazard out of its cave and updates the hazard index."""
+        location = hazard.location
+        if location is None:
+            raise ValueError("hazard is not in a cave")
+
+        del self.hazards[location]
+        self.empty_caves.add(location)
+        hazard.location = None
+        self.hazard_locations[type(hazard)].discard(location)
+        self._update_senses(location, hazard.sense, -1)
+
+    def move_hazard(self, hazard: Hazard, location: int):
+        self.remove_hazard(hazard)
+        self.place_hazard(hazard, location)
+
+    def _update_senses(self, location: int, sense: Sense, change: int):
+        """Adds or removes a hazard kind from the senses of a cave's entrances."""
+        if not sense:
+            return
+
+        for neighbour in self.get_entrances(location):
+            key = (neighbour, sense)
+            self._sense_counts[key] += change
+
+            if self._sense_counts[key] <= 0:
+                del self._sense_counts[key]
+                if remaining := self.senses.get(neighbour, Sense.NONE) & ~sense:
+                    self.senses[neighbour] = remaining
+                else:
+                    self.senses.pop(neighbour, None)
+            else:
+                self.senses[neighbour] = self.senses.get(neighbour, Sense.NONE) | sense
+
+    def get_nearby_senses(self, cave: Cave) -> Sense:
+        """Returns the kinds of hazard in caves next to a cave."""
+        return self.senses.get(cave.location, Sense.NONE)
 
     def choose_empty_cave(self) -> Cave:
-        empty_caves = filter(
-            lambda cave: cave.location not in self.hazards.keys(), self.level.values()
-        )
-        return choice(list(empty_caves))
+        return self.get_cave(self.empty_caves.choice(self.rng))
 
     def get_hazard_in_cave(self, cave: Cave) -> Hazard | None:
         return self.hazards.get(cave.location)
@@ -162,6 +410,8 @@ class Level:
 
     def get_nearby_hazards(self, cave: Cave):
         hazards: list[Hazard] = []
+        if not self.get_nearby_senses(cave):
+            return hazards
 
         for location in cave.tunnels:
             cave = self.get_cave(location)
@@ -44,7 +44,7 @@ class PlayerController:
             ):
                 return
 
-        self.emit_to_level(ArrowMissed())
+        list(self.emit_to_level(ArrowMissed()))
 
     def emit_to_level(self, event: Event) -> Iterator[ArrowHit]:
         """Sends an event to the level, yielding events that happen in return."""
@@ -0,0 +1,112 @@
+"""
+Random number generators for games.
+
+Levels and hazards draw random numbers through the small `Random` interface,
+which the `random` module itself satisfies, so by default games share the
+global generator and `random.seed` makes them reproducible. For simulating many
+games at once, `spawn_rngs` splits a single seed into independent streams, one
+per game or worker, which stay reproducible however the games are scheduled.
+"""
+
+from collections.abc import Sequence
+from typing import Protocol
+
+import numpy as np
+
+
+class Random(Protocol):
+    """The parts of `random.Random` used by the game."""
+
+    def choice[T](self, seq: Sequence[T]) -> T: ...
+
+    def randrange(self, start: int, stop: int | None = None) -> int: ...
+
+    def getstate(self) -> object: ...
+
+    def setstate(self, state, /): ...
+
+
+class BufferedGenerator:
+    """
+    Adapts a NumPy Generator to the `Random` interface. Uniform numbers are
+    drawn `buffer_size` at a time, so each draw in the game is only a lookup.
+
+    The state is the generator's state before the current buffer was drawn and
+    the position in the buffer, so it stays small however large the buffer is.
+    """
+
+    def __init__(
+        self, generator: np.random.Generator | int | None = None, buffer_size=4096
+    ):
+        if not isinstance(generator, np.random.Generator):
+            generator = np.random.default_rng(generator)
+        self.generator = generator
+        self.buffer_size = buffer_size
+
+        # The buffer is only drawn once it is needed, so spawning generators
+        # for many games is cheap
+        self._state = generator.bit_generator.state
+        self._buffer: list[float] = []
+        self._position = 0
+
+    def _refill(self):
+        self._state = self.generator.bit_generator.state
+        self._buffer = self.generator.random(self.buffer_size).tolist()
+        self._position = 0
+
+    def random(self) -> float:
+        """Returns a uniform float in [0, 1)."""
+        if self._position >= len(self._buffer):
+            self._refill()
+        value = self._buffer[self._position]
+        self._position += 1
+        return value
+
+    def randrange(self, start: int, stop: int | None = None) -> int:
+        if stop is None:
+            start, stop = 0, start
+        if stop <= start:
+            raise ValueError(f"empty range for randrange({start}, {stop})")
+        return start + int(self.random() * (stop - start))
+
+    def randint(self, a: int, b: int) -> int:
+        return self.randrange(a, b + 1)
+
+    def choice[T](self, seq: Sequence[T]) -> T:
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[self.randrange(len(seq))]
+
+    def getstate(self) -> tuple[dict, int]:
+        return self._state, self._position
+
+    def setstate(self, state: tuple[dict, int], /):
+        bit_state, position = state
+        self.generator.bit_generator.state = bit_state
+        if position:
+            self._refill()
+            self._position = position
+        else:
+            self._state = bit_state
+            self._buffer = []
+            self._position = 0
+
+
+def spawn_rngs(
+    seed: int | None, count: int, buffer_size=4096, start=0
+) -> list[BufferedGenerator]:
+    """
+    Splits a seed into independent generators, numbered `start` to
+    `start + count`. The same seed always gives the same generators, and
+    generator i only depends on the seed and i, so games can be split across
+    workers in any way.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    return [
+        BufferedGenerator(
+            np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(i,))),
+            buffer_size,
+        )
+        for i in range(start, start + count)
+    ]
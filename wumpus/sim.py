@@ -0,0 +1,241 @@
+"""
+Vectorised simulation of many games on the same map.
+
+Instead of a Level and PlayerController per game, a BatchLevel keeps the
+player, Wumpus, pit and bat positions for N games in NumPy arrays and applies
+each action to every game at once. The rules match those in hazards.py:
+
+    - entering a pit kills the player
+    - entering a bat cave moves the player to a uniformly random cave,
+      which is then entered in turn
+    - entering the Wumpus' cave gets the player eaten and startles the Wumpus
+    - an arrow that enters the Wumpus' cave wins the game, and one that enters
+      the player's cave kills them
+    - an arrow that misses startles the Wumpus, which moves to a random
+      tunnel or stays put with equal probability, eating the player if it
+      moves into their cave
+"""
+
+from dataclasses import dataclass
+from enum import IntEnum
+
+import numpy as np
+import numpy.typing as npt
+
+from .graph import CaveGraph
+
+
+class Cause(IntEnum):
+    """Why a game ended, stored per game in BatchLevel.cause."""
+
+    NONE = 0
+    PIT = 1
+    WUMPUS = 2
+    ARROW = 3
+
+
+@dataclass
+class Outcomes:
+    """Per-game results of a batch of simulated games."""
+
+    won: npt.NDArray[np.bool_]
+    alive: npt.NDArray[np.bool_]
+    cause: npt.NDArray[np.int8]
+    moves: npt.NDArray[np.int32]
+    arrows: npt.NDArray[np.int32]
+
+
+class BatchLevel:
+    """
+    N independent games played in lockstep on one cave graph.
+
+    Every action takes one entry per game. Games that have already been won or
+    lost ignore further actions, so callers can keep stepping the whole batch
+    until `active` is all False.
+    """
+
+    def __init__(
+        self,
+        graph: CaveGraph,
+        games: int,
+        rng: np.random.Generator | None = None,
+        pits: int = 2,
+        bats: int = 2,
+    ):
+        if len(graph) < pits + bats + 2:
+            raise ValueError("not enough caves for the hazards and the player")
+
+        self.graph = graph
+        self.games = games
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.offsets = graph.offsets.astype(np.int64)
+        self.degrees = np.diff(self.offsets)
+        self.neighbours = graph.neighbours.astype(np.int64)
+
+        # Tunnels padded to the maximum degree with -1, for sense checks
+        max_degree = int(self.degrees.max(initial=0))
+        self.padded = np.full((len(graph), max(max_degree, 1)), -1, dtype=np.int64)
+        columns = np.arange(len(self.neighbours)) - np.repeat(
+            self.offsets[:-1], self.degrees
+        )
+        self.padded[np.repeat(np.arange(len(graph)), self.degrees), columns] = (
+            self.neighbours
+        )
+
+        # Each game gets its hazards and player in distinct caves
+        spawns = self._distinct_caves(pits + bats + 2)
+        self.pits = spawns[:, :pits]
+        self.bats = spawns[:, pits : pits + bats]
+        self.wumpus = spawns[:, pits + bats]
+        self.player = spawns[:, pits + bats + 1]
+
+        self.alive = np.ones(games, dtype=np.bool_)
+        self.won = np.zeros(games, dtype=np.bool_)
+        self.cause = np.zeros(games, dtype=np.int8)
+        self.moves = np.zeros(games, dtype=np.int32)
+        self.arrows = np.zeros(games, dtype=np.int32)
+
+    @classmethod
+    def from_json(cls, level_map: str, games: int, **kwargs) -> "BatchLevel":
+        return cls(CaveGraph.from_json(level_map), games, **kwargs)
+
+    @property
+    def active(self) -> npt.NDArray[np.bool_]:
+        """Games that are still being played."""
+        return self.alive & ~self.won
+
+    def outcomes(self) -> Outcomes:
+        return Outcomes(
+            self.won.copy(),
+            self.alive.copy(),
+            self.cause.copy(),
+            self.moves.copy(),
+            self.arrows.copy(),
+        )
+
+    def _distinct_caves(self, count: int) -> npt.NDArray[np.int64]:
+        """
+        Draws `count` distinct caves per game, redrawing repeated caves until
+        there are none left. Columns are then shuffled, so no column is more
+        likely than another to have been redrawn.
+        """
+        caves = self.rng.integers(0, len(self.graph), size=(self.games, count))
+        clashed = False
+        while True:
+            order = np.argsort(caves, axis=1)
+            ordered = np.take_along_axis(caves, order, axis=1)
+            rows, columns = np.nonzero(ordered[:, 1:] == ordered[:, :-1])
+            if not len(rows):
+                return self.rng.permuted(caves, axis=1) if clashed else caves
+            clashed = True
+            caves[rows, order[rows, columns + 1]] = self.rng.integers(
+                0, len(self.graph), size=len(rows)
+            )
+
+    def random_tunnels(
+        self, locations: npt.NDArray[np.integer]
+    ) -> npt.NDArray[np.int64]:
+        """Picks a uniformly random tunnel out of each location."""
+        choice = (self.rng.random(len(locations)) * self.degrees[locations]).astype(
+            np.int64
+        )
+        return self.neighbours[self.offsets[locations] + choice]
+
+    def nearby(self, positions: npt.NDArray[np.integer]) -> npt.NDArray[np.bool_]:
+        """
+        Returns whether any of `positions` is one tunnel away from the player.
+        `positions` is either one location per game or an (N, k) array.
+        """
+        tunnels = self.padded[self.player]
+        if positions.ndim == 1:
+            return (tunnels == positions[:, None]).any(axis=1)
+        return (tunnels[:, :, None] == positions[:, None, :]).any(axis=(1, 2))
+
+    def move(
+        self,
+        targets: npt.NDArray[np.integer],
+        mask: npt.NDArray[np.bool_] | None = None,
+    ):
+        """
+        Moves the player of every active game into the given cave, or only of
+        the games in `mask` if it is given.
+        """
+        moving = self.active if mask is None else self.active & mask
+        self.player[moving] = targets[moving]
+        self.moves[moving] += 1
+        self._enter(moving)
+
+    def shoot(
+        self,
+        paths: npt.NDArray[np.integer],
+        mask: npt.NDArray[np.bool_] | None = None,
+    ):
+        """
+        Shoots an arrow in every active game, or only in the games in `mask`
+        if it is given. `paths` is an (N, length) array of caves for the arrow
+        to pass through, padded with -1 when a game's arrow travels fewer rooms.
+        """
+        shooting = self.active if mask is None else self.active & mask
+        self.arrows[shooting] += 1
+
+        flying = shooting.copy()
+        for step in range(paths.shape[1]):
+            location = paths[:, step]
+            flying &= location >= 0
+
+            shot_self = flying & (location == self.player)
+            self.alive[shot_self] = False
+            self.cause[shot_self] = Cause.ARROW
+
+            hit = flying & (location == self.wumpus)
+            self.won[hit] = True
+
+            flying &= ~(shot_self | hit)
+
+        self.startle(shooting & self.active)
+
+    def startle(self, mask: npt.NDArray[np.bool_]):
+        """
+        Startles the Wumpus in the masked games. It moves through each tunnel
+        or stays put with equal probability, eating the player if it moves
+        into their cave.
+        """
+        games = np.flatnonzero(mask)
+        wumpus = self.wumpus[games]
+        degree = self.degrees[wumpus]
+        choice = (self.rng.random(len(games)) * (degree + 1)).astype(np.int64)
+        moved = choice < degree
+
+        games, wumpus, choice = games[moved], wumpus[moved], choice[moved]
+        self.wumpus[games] = self.neighbours[self.offsets[wumpus] + choice]
+
+        eaten = np.zeros(self.games, dtype=np.bool_)
+        eaten[games] = self.wumpus[games] == self.player[games]
+        eaten &= self.active
+        self._eaten(eaten)
+
+    def _eaten(self, mask: npt.NDArray[np.bool_]):
+        self.alive[mask] = False
+        self.cause[mask] = Cause.WUMPUS
+        if mask.any():
+            self.startle(mask)
+
+    def _enter(self, mask: npt.NDArray[np.bool_]):
+        """Applies the hazard in the player's cave for the masked games."""
+        entering = mask.copy()
+        while entering.any():
+            player = self.player[:, None]
+
+            in_pit = entering & (self.pits == player).any(axis=1)
+            self.alive[in_pit] = False
+            self.cause[in_pit] = Cause.PIT
+
+            self._eaten(entering & (self.wumpus == self.player))
+
+            # Bats drop the player in a random cave, which is entered in turn
+            snatched = entering & self.alive & (self.bats == player).any(axis=1)
+            self.player[snatched] = self.rng.integers(
+                0, len(self.graph), size=int(snatched.sum())
+            )
+            entering = snatched
@@ -0,0 +1,91 @@
+"""
+Parsed level templates.
+
+Reading and parsing a map is the expensive part of creating a Level, but only
+the hazards and the player change from game to game. A LevelTemplates registry
+parses each map once into a read-only CaveGraph and reverses it to find its
+entrances, and new games share both and only spawn fresh hazards, so creating
+a game takes constant time however large the map. The least recently used
+templates are evicted once their arrays go over a memory budget.
+"""
+
+import importlib.resources
+from collections import OrderedDict
+from types import ModuleType
+
+import wumpus.levels
+from . import binary
+from .graph import CaveGraph
+from .level import Level
+
+
+class LevelTemplates:
+    """An LRU cache of parsed maps from a package, keyed by file name."""
+
+    def __init__(self, package: ModuleType = wumpus.levels, max_bytes=64 * 2**20):
+        self.package = package
+        self.max_bytes = max_bytes
+        self.templates: OrderedDict[str, CaveGraph] = OrderedDict()
+        self.entrances: dict[str, CaveGraph] = {}
+        self.nbytes = 0
+
+    def get(self, name: str) -> CaveGraph:
+        """Returns the parsed map for a file, parsing it on first use."""
+        if (template := self.templates.get(name)) is not None:
+            self.templates.move_to_end(name)
+            return template
+
+        template = self.load(name)
+        entrances = template.reversed()
+        self._freeze(entrances)
+        self.templates[name] = template
+        self.entrances[name] = entrances
+        self.nbytes += self._nbytes(name)
+        self.evict()
+        return template
+
+    def level(self, name: str, **kwargs) -> Level:
+        """Creates a new game from a map, with freshly spawned hazards."""
+        template = self.get(name)
+        return Level(template, entrances=self.entrances[name], **kwargs)
+
+    def load(self, name: str) -> CaveGraph:
+        """Parses a JSON or binary (.lvl) map, making its arrays read-only."""
+        resource = importlib.resources.files(self.package) / name
+        if name.endswith(".lvl"):
+            with importlib.resources.as_file(resource) as path:
+                template = binary.load(path)
+        else:
+            template = CaveGraph.from_json(resource.read_text())
+
+        self._freeze(template)
+        return template
+
+    @staticmethod
+    def _freeze(graph: CaveGraph):
+        for array in (graph.offsets, graph.neighbours, graph.coords):
+            array.flags.writeable = False
+
+    def _nbytes(self, name: str) -> int:
+        # The entrances share the template's coordinates
+        entrances = self.entrances[name]
+        return (
+            self.templates[name].nbytes
+            + entrances.offsets.nbytes
+            + entrances.neighbours.nbytes
+        )
+
+    def evict(self):
+        """Drops least recently used templates until within the memory budget."""
+        while self.nbytes > self.max_bytes and len(self.templates) > 1:
+            name = next(iter(self.templates))
+            self.nbytes -= self._nbytes(name)
+            del self.templates[name], self.entrances[name]
+
+    def clear(self):
+        self.templates.clear()
+        self.entrances.clear()
+        self.nbytes = 0
+
+
+TEMPLATES = LevelTemplates()
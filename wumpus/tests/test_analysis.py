@@ -0,0 +1,80 @@
+import unittest
+import importlib.resources
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+import wumpus.levels
+from wumpus import Cave, CaveGraph
+from wumpus.analysis import analyse, distances
+from wumpus.bench import synthetic_map
+
+
+class TestAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.graph = CaveGraph.from_json(
+            importlib.resources.read_text(wumpus.levels, "00.json")
+        )
+
+    def test_dodecahedron(self):
+        metrics = analyse(self.graph, cache_dir=None)
+        self.assertEqual(metrics.caves, 20)
+        self.assertEqual(metrics.tunnels, 60)
+        self.assertEqual(metrics.diameter, 5)
+        self.assertEqual(metrics.girth, 5)
+        self.assertListEqual(metrics.degree_histogram, [0, 0, 0, 20])
+        self.assertTrue(metrics.exact)
+
+    def test_distances_match_all_pairs(self):
+        metrics = analyse(self.graph, cache_dir=None)
+        for source in self.graph:
+            np.testing.assert_array_equal(
+                distances(self.graph, source), metrics.distances[source]
+            )
+        np.testing.assert_array_equal(metrics.distances, metrics.distances.T)
+
+    def test_one_way_tunnels(self):
+        """Distances follow one-way tunnels, and cycles ignore their direction."""
+        graph = CaveGraph.from_caves(
+            [Cave(0, [1], (0.0,)), Cave(1, [2], (1.0,)), Cave(2, [0], (2.0,))]
+        )
+        metrics = analyse(graph, cache_dir=None)
+        self.assertListEqual(metrics.distances[0].tolist(), [0, 1, 2])
+        self.assertListEqual(metrics.distances[1].tolist(), [2, 0, 1])
+        self.assertEqual(metrics.diameter, 2)
+        self.assertEqual(metrics.girth, 3)
+
+        graph = CaveGraph.from_json(
+            importlib.resources.read_text(wumpus.levels, "02.json")
+        )
+        metrics = analyse(graph, cache_dir=None)
+        self.assertEqual(metrics.distances[0, 31], 1)
+        self.assertGreater(metrics.distances[31, 0], 1)
+        np.testing.assert_array_equal(metrics.distances[31], distances(graph, 31))
+
+    def test_estimates_large_maps(self):
+        """A Möbius ladder of n caves has diameter n / 4 and girth 4."""
+        graph = CaveGraph.from_json(synthetic_map(400))
+        metrics = analyse(graph, cache_dir=None, exact_limit=100)
+        self.assertFalse(metrics.exact)
+        self.assertIsNone(metrics.distances)
+        self.assertEqual(metrics.diameter, 100)
+        self.assertEqual(metrics.girth, 4)
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            computed = analyse(self.graph, cache_dir=cache_dir)
+            cached = analyse(self.graph, cache_dir=cache_dir)
+
+        self.assertEqual(cached.diameter, computed.diameter)
+        self.assertEqual(cached.girth, computed.girth)
+        self.assertListEqual(cached.degree_histogram, computed.degree_histogram)
+        np.testing.assert_array_equal(cached.distances, computed.distances)
+
+    def test_cache_keys(self):
+        """Results computed with different parameters are cached separately."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            analyse(self.graph, cache_dir=cache_dir, exact_limit=10, chunk=4)
+            analyse(self.graph, cache_dir=cache_dir, exact_limit=10, chunk=8)
+            self.assertEqual(len(list(Path(cache_dir).iterdir())), 2)
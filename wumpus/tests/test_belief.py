@@ -0,0 +1,80 @@
+import unittest
+import importlib.resources
+
+from random import seed
+
+import wumpus.levels
+from wumpus import Level
+from wumpus.belief import Belief
+from wumpus.hazards import Sense
+
+
+class TestBelief(unittest.TestCase):
+    def setUp(self):
+        level_map = importlib.resources.read_text(wumpus.levels, "00.json")
+        seed("test")
+        # Cave 0 has tunnels to 8, 9 and 10, and cave 8 to 0, 4 and 14
+        self.belief = Belief(Level(level_map))
+
+    def test_nothing_sensed(self):
+        self.belief.visit(0, Sense.NONE)
+        self.assertTrue(all(self.belief.safe(cave) for cave in (0, 8, 9, 10)))
+        self.assertFalse(self.belief.safe(14))
+        self.assertEqual(sorted(self.belief.hint(0)), [8, 9, 10])
+
+    def test_deduce_pit(self):
+        self.belief.visit(0, Sense.NONE)
+        self.belief.visit(8, Sense.PIT)
+        self.assertEqual(self.belief.probability(14, Sense.PIT), 0.5)
+        self.assertEqual(self.belief.hint(8), [0])
+
+        # Only 14 is left to explain the draft
+        self.belief.visit(4, Sense.NONE)
+        self.assertEqual(self.belief.known[Sense.PIT], {14})
+        self.assertEqual(self.belief.danger(14), 1)
+        self.assertFalse(self.belief.possible(14, Sense.BATS))
+
+    def test_wumpus(self):
+        self.belief.visit(0, Sense.WUMPUS)
+        self.assertEqual(self.belief.suspects, {8, 9, 10})
+        self.assertIsNone(self.belief.wumpus())
+        self.belief.visit(4, Sense.WUMPUS)
+        self.assertEqual(self.belief.wumpus(), 8)
+        self.assertFalse(self.belief.possible(9, Sense.WUMPUS))
+
+        # The Wumpus may have moved anywhere next to where it was
+        self.belief.missed([8])
+        self.assertIsNone(self.belief.wumpus())
+        self.assertTrue(self.belief.possible(8, Sense.WUMPUS))
+        self.assertTrue(self.belief.possible(0, Sense.WUMPUS))
+
+    def test_bats(self):
+        self.belief.visit(0, Sense.BATS)
+        self.belief.found(9, Sense.BATS)
+        self.assertEqual(self.belief.probability(9, Sense.BATS), 1)
+        self.assertEqual(self.belief.danger(9), 0)
+        self.assertEqual(sorted(self.belief.hint(0)), [8, 10])
+
+        # The bats explain the sense, so 8 is as likely as any unknown cave
+        self.assertAlmostEqual(self.belief.probability(8, Sense.BATS), 1 / 18)
+
+    def test_eaten(self):
+        """The Wumpus may move on after eating the player."""
+        self.belief.visit(0, Sense.NONE)
+        self.belief.found(8, Sense.WUMPUS)
+        self.belief.missed([])
+        self.assertIsNone(self.belief.wumpus())
+        for cave in (0, 4, 8, 14):
+            self.assertTrue(self.belief.possible(cave, Sense.WUMPUS))
+        self.assertFalse(self.belief.safe(0))
+
+    def test_one_way_tunnels(self):
+        level_map = importlib.resources.read_text(wumpus.levels, "02.json")
+        belief = Belief(Level(level_map))
+
+        # 0 leads to 1, 2 and 31, but 31 doesn't lead back
+        belief.visit(0, Sense.PIT)
+        belief.clear(1, Sense.PIT)
+        self.assertEqual(belief.probability(31, Sense.PIT), 0.5)
+        belief.clear(2, Sense.PIT)
+        self.assertEqual(belief.known[Sense.PIT], {31})
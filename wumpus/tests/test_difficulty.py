@@ -0,0 +1,97 @@
+import unittest
+import importlib.resources
+
+import numpy as np
+
+import wumpus.levels
+from wumpus import CaveGraph, Level, PlayerController
+from wumpus.difficulty import BOTS, Bot, RandomBot, Tally, estimate, wilson
+from wumpus.hazards import BottomlessPit, Wumpus
+from wumpus.rng import BufferedGenerator
+from wumpus.sim import BatchLevel
+
+
+class TestDifficulty(unittest.TestCase):
+    def setUp(self):
+        self.level_maps = {
+            "00.json": importlib.resources.read_text(wumpus.levels, "00.json")
+        }
+
+    def test_wilson(self):
+        low, high = wilson(50, 100)
+        self.assertAlmostEqual(low + high, 1)
+        self.assertTrue(0.39 < low < 0.41)
+        self.assertAlmostEqual(wilson(0, 10)[0], 0)
+        self.assertEqual(wilson(0, 0), (0, 1))
+
+    def test_bots(self):
+        for bot in BOTS:
+            tally = estimate(self.level_maps, bot, games=40, jobs=1, chunk=15)[
+                "00.json"
+            ]
+            self.assertEqual(tally.games, 40)
+            self.assertEqual(
+                tally.wins + sum(tally.causes.values()) + tally.timeouts, 40
+            )
+
+    def test_chunks(self):
+        """Results don't depend on how games are split up."""
+        whole = estimate(self.level_maps, "belief", games=30, jobs=1, chunk=30)
+        parts = estimate(self.level_maps, "belief", games=30, jobs=1, chunk=7)
+        self.assertEqual(whole, parts)
+        self.assertEqual((Tally() + whole["00.json"]), whole["00.json"])
+
+    def game(self, seed: int, pit: int, wumpus: int) -> tuple[Bot, BatchLevel]:
+        """
+        Sets up the same game for a bot and for BatchLevel, with the player in
+        cave 0, and their generators at the start of the same stream.
+        """
+        graph = CaveGraph.from_json(self.level_maps["00.json"])
+        rng = BufferedGenerator(seed)
+        start = rng.getstate()
+        level = Level(graph, rng=rng, pits=1, bats=0)
+        for hazard in list(level.hazards.values()):
+            level.remove_hazard(hazard)
+        level.place_hazard(BottomlessPit(graph, rng), pit)
+        level.place_hazard(Wumpus(graph, rng), wumpus)
+        bot = RandomBot(PlayerController(level), rng)
+        bot.player.move(0)
+        rng.setstate(start)
+
+        batch = BatchLevel(graph, 1, np.random.default_rng(seed), 1, 0)
+        batch.pits[:], batch.wumpus[:], batch.player[:] = pit, wumpus, 0
+        batch.rng = np.random.default_rng(seed)
+        return bot, batch
+
+    def assertSameOutcome(self, bot: Bot, batch: BatchLevel):
+        self.assertEqual(bot.player.win, batch.won[0])
+        self.assertEqual(bot.player.alive, batch.alive[0])
+        self.assertEqual(bot.cause, batch.cause[0])
+        self.assertEqual(bot.arrows, batch.arrows[0])
+
+    def test_same_rules_as_sim(self):
+        """Bots play by the same rules as BatchLevel, given the same seed."""
+        # Cave 0 has tunnels to 8, 9 and 10, and cave 8 to 0, 4 and 14
+        for seed in range(20):
+            bot, batch = self.game(seed, 8, 14)
+
+            # The pit can't be hit, so the arrow misses and startles the Wumpus
+            bot.shoot([8, 4])
+            batch.shoot(np.array([[8, 4]]))
+            self.assertFalse(bot.player.win)
+            self.assertEqual(bot.player.level.get_wumpus_location(), batch.wumpus[0])
+
+            bot.shoot([bot.player.level.get_wumpus_location()])
+            batch.shoot(batch.wumpus[:, np.newaxis])
+            self.assertSameOutcome(bot, batch)
+
+    def test_startled_into_player(self):
+        """A missed arrow can startle the Wumpus into the player's cave."""
+        eaten = 0
+        for seed in range(20):
+            bot, batch = self.game(seed, 4, 8)
+            bot.shoot([9])
+            batch.shoot(np.array([[9]]))
+            self.assertSameOutcome(bot, batch)
+            eaten += not bot.player.alive
+        self.assertGreater(eaten, 0)
@@ -0,0 +1,63 @@
+import unittest
+
+from wumpus.dispatch import Cascade, Dispatcher
+from wumpus.events import Event, PlayerKilled, PlayerMoved
+
+
+def countdown(event: Event):
+    """Moves the player down one cave at a time until reaching cave 0."""
+    match event:
+        case PlayerMoved(location):
+            yield f"entered {location}"
+            if location > 0:
+                yield Cascade(["falling", PlayerMoved(location - 1)])
+            yield f"left {location}"
+        case _:
+            yield event
+
+
+class TestDispatcher(unittest.TestCase):
+    def test_depth_first_order(self):
+        """Follow-up events are handled before the handler resumes."""
+        dispatcher = Dispatcher(countdown)
+        self.assertListEqual(
+            list(dispatcher.dispatch(PlayerMoved(2))),
+            [
+                "entered 2",
+                "falling",
+                "entered 1",
+                "falling",
+                "entered 0",
+                "left 0",
+                "left 1",
+                "left 2",
+            ],
+        )
+
+    def test_deep_cascade(self):
+        """Long chains of follow-up events do not grow the Python stack."""
+        dispatcher = Dispatcher(countdown)
+        outputs = list(dispatcher.dispatch(PlayerMoved(10_000)))
+        self.assertEqual(outputs[-1], "left 10000")
+        self.assertEqual(dispatcher.counts[PlayerMoved], 10_001)
+        self.assertEqual(dispatcher.counts[str], 10_000)
+
+    def test_batch(self):
+        dispatcher = Dispatcher(countdown)
+        killed = PlayerKilled()
+        self.assertListEqual(
+            list(dispatcher.dispatch_all([PlayerMoved(0), killed, "done"])),
+            ["entered 0", "left 0", killed, "done"],
+        )
+
+    def test_timing_hooks(self):
+        timings: list[tuple[Event, float]] = []
+        dispatcher = Dispatcher(countdown)
+        dispatcher.add_hook(lambda event, seconds: timings.append((event, seconds)))
+
+        list(dispatcher.dispatch(PlayerMoved(1)))
+
+        self.assertEqual(len(timings), 3)  # 2 moves and a "falling" string
+        self.assertEqual(timings[-1][0], PlayerMoved(1))
+        self.assertTrue(all(seconds >= 0 for _, seconds in timings))
+        self.assertGreater(dispatcher.seconds[PlayerMoved], 0)
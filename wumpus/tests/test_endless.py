@@ -0,0 +1,79 @@
+import unittest
+
+from random import seed
+
+from wumpus.endless import ChunkedCaves, EndlessLevel, RoamingSuperbats
+from wumpus.events import PlayerMoved
+from wumpus.hazards import Wumpus
+
+
+class TestChunkedCaves(unittest.TestCase):
+    def setUp(self):
+        self.caves = ChunkedCaves(seed="test", chunk_size=16, max_chunks=4)
+
+    def test_locations(self):
+        for key in [(0, 0), (3, -2), (-5, 7), (-1, -1)]:
+            location = self.caves.location(key, 5)
+            self.assertEqual(self.caves.chunk_of(location), key)
+
+    def test_tunnels_are_two_way(self):
+        for location in [self.caves.location((x, y), 0) for x, y in [(0, 0), (1, -1)]]:
+            for cave in self.caves.load(self.caves.chunk_of(location)).values():
+                for tunnel in cave.tunnels:
+                    self.assertIn(cave.location, self.caves[tunnel].tunnels)
+
+    def test_reload(self):
+        first = dict(self.caves.load((2, 3)))
+        for x in range(5):
+            self.caves.load((x, 0))
+        self.assertNotIn((2, 3), self.caves.chunks)
+        self.assertEqual(self.caves.load((2, 3)), first)
+        self.assertLessEqual(len(self.caves.chunks), 4)
+
+
+class TestEndlessLevel(unittest.TestCase):
+    def setUp(self):
+        seed("test")
+        self.level = EndlessLevel(seed="test", chunk_size=16, max_chunks=18)
+
+    def hazards_in(self, key):
+        return {
+            (hazard.location, type(hazard)) for hazard in self.level.chunk_hazards[key]
+        }
+
+    def test_hazards_restored(self):
+        far = (10, 10)
+        self.level.caves.load(far)
+        hazards = self.hazards_in(far)
+
+        for x in range(20):
+            self.level.caves.load((x, -10))
+        self.assertNotIn(far, self.level.caves.chunks)
+        self.assertTrue(
+            all(location not in self.level.hazards for location, _ in hazards)
+        )
+
+        self.level.caves.load(far)
+        self.assertEqual(self.hazards_in(far), hazards)
+
+    def test_wumpus_kept_loaded(self):
+        wumpus = self.level.get_wumpus_location()
+        for x in range(20):
+            self.level.caves.load((x, -10))
+        self.assertIn(self.level.caves.chunk_of(wumpus), self.level.caves.chunks)
+        self.assertIsInstance(self.level.hazards[wumpus], Wumpus)
+
+    def test_bats_drop_player_in_unloaded_chunk(self):
+        for _ in range(20):
+            bats = next(
+                hazard
+                for hazard in self.level.hazards.values()
+                if isinstance(hazard, RoamingSuperbats)
+            )
+            bats.radius = 50
+            events = list(self.level.handle_event(PlayerMoved(bats.location)))
+            moved = [event for event in events if isinstance(event, PlayerMoved)][-1]
+            self.assertIn(
+                self.level.caves.chunk_of(moved.location), self.level.caves.chunks
+            )
+            self.assertEqual(self.level.player, moved.location)
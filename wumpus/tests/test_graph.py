@@ -0,0 +1,161 @@
+import unittest
+import importlib.resources
+import json
+import os
+import tempfile
+from unittest import mock
+
+from random import seed
+
+import numpy as np
+
+import wumpus.levels
+from wumpus import Cave, CaveGraph, Level, PlayerController, binary
+from wumpus.templates import LevelTemplates
+
+
+class TestCaveGraph(unittest.TestCase):
+    def setUp(self):
+        self.level_map = importlib.resources.read_text(wumpus.levels, "00.json")
+        self.graph = CaveGraph.from_json(self.level_map)
+
+    def test_matches_json(self):
+        """Every cave view should have the same tunnels and coords as the JSON."""
+        level = json.loads(self.level_map)
+        self.assertEqual(len(self.graph), len(level))
+
+        for cave in level:
+            view = self.graph[cave["location"]]
+            self.assertIsInstance(view, Cave)
+            self.assertEqual(view.location, cave["location"])
+            self.assertListEqual(view.tunnels, cave["tunnels"])
+            self.assertEqual(view.coords, tuple(cave["coords"]))
+            self.assertEqual(
+                view, Cave(cave["location"], cave["tunnels"], tuple(cave["coords"]))
+            )
+
+    def test_view_fields_cached(self):
+        view = self.graph[0]
+        self.assertIs(view.tunnels, view.tunnels)
+        self.assertIs(view.coords, view.coords)
+
+    def test_mapping(self):
+        self.assertIn(0, self.graph)
+        self.assertIs(self.graph.__contains__(np.int64(0)), True)
+        self.assertNotIn(len(self.graph), self.graph)
+        self.assertNotIn(-1, self.graph)
+        self.assertListEqual(list(self.graph), list(range(len(self.graph))))
+
+        with self.assertRaises(KeyError):
+            self.graph[len(self.graph)]
+
+    def test_non_contiguous_locations(self):
+        with self.assertRaises(ValueError):
+            CaveGraph.from_caves([Cave(0, [2], ()), Cave(2, [0], ())])
+
+    def play(self, storage) -> tuple[list[str], PlayerController]:
+        seed("test")
+        player = PlayerController(Level(self.level_map, storage=storage))
+        msgs = player.get_nearby_msgs()
+        player.move(11)
+        player.move(1)
+        return msgs, player
+
+    def test_level_storage(self):
+        """A level stored in CSR form should play identically to a dict level."""
+        dict_msgs, dict_player = self.play("dict")
+        csr_msgs, csr_player = self.play("csr")
+
+        self.assertListEqual(csr_msgs, dict_msgs)
+        self.assertEqual(csr_player.cave.location, dict_player.cave.location)
+        self.assertListEqual(csr_player.cave.tunnels, dict_player.cave.tunnels)
+        self.assertEqual(csr_player.alive, dict_player.alive)
+
+
+class TestBinaryLevel(unittest.TestCase):
+    def setUp(self):
+        self.level_map = importlib.resources.read_text(wumpus.levels, "04.json")
+        self.graph = CaveGraph.from_json(self.level_map)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "04.lvl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertGraphEqual(self, a: CaveGraph, b: CaveGraph):
+        np.testing.assert_array_equal(a.offsets, b.offsets)
+        np.testing.assert_array_equal(a.neighbours, b.neighbours)
+        np.testing.assert_array_equal(a.coords, b.coords)
+
+    def test_round_trip(self):
+        binary.save(self.graph, self.path)
+        for mmap in (True, False):
+            loaded = binary.load(self.path, mmap=mmap)
+            self.assertGraphEqual(loaded, self.graph)
+        self.assertIsInstance(binary.load(self.path).coords, np.memmap)
+
+    def test_streamed(self):
+        """Writing in batches gives the same file as writing all at once."""
+        degrees = np.diff(self.graph.offsets)
+        with binary.LevelWriter(self.path, len(self.graph), 4) as writer:
+            for start in range(0, len(self.graph), 5):
+                end = min(start + 5, len(self.graph))
+                writer.write(
+                    degrees[start:end],
+                    self.graph.neighbours[
+                        self.graph.offsets[start] : self.graph.offsets[end]
+                    ],
+                    self.graph.coords[start:end],
+                )
+        self.assertGraphEqual(binary.load(self.path), self.graph)
+
+    def test_incomplete(self):
+        with self.assertRaises(ValueError):
+            with binary.LevelWriter(self.path, len(self.graph), 4):
+                pass
+
+    def test_play(self):
+        binary.save(self.graph, self.path)
+        seed("test")
+        player = PlayerController(Level(binary.load(self.path)))
+        self.assertIn(player.cave.location, self.graph)
+        player.move(player.cave.tunnels[0])
+
+
+class TestLevelTemplates(unittest.TestCase):
+    def test_parsed_once(self):
+        templates = LevelTemplates()
+        template = templates.get("00.json")
+        self.assertIs(templates.get("00.json"), template)
+        self.assertFalse(template.neighbours.flags.writeable)
+
+        a, b = templates.level("00.json"), templates.level("00.json")
+        self.assertIs(a.level, b.level)
+        self.assertIs(a.entrances, b.entrances)
+        self.assertIsNot(a.spawned[0], b.spawned[0])
+
+    def test_level_reuses_entrances(self):
+        """Games after the first don't reverse the map again."""
+        templates = LevelTemplates()
+        with mock.patch.object(
+            CaveGraph, "reversed", autospec=True, side_effect=CaveGraph.reversed
+        ) as reversed_:
+            templates.level("02.json")
+            templates.level("02.json")
+        self.assertEqual(reversed_.call_count, 1)
+
+    def test_lru_eviction(self):
+        templates = LevelTemplates()
+        templates.get("00.json")
+        templates.get("04.json")
+        templates.max_bytes = templates.nbytes
+        templates.clear()
+
+        templates.get("00.json")
+        templates.get("01.json")
+        self.assertListEqual(list(templates.templates), ["00.json", "01.json"])
+
+        templates.get("00.json")  # now the most recently used
+        templates.get("04.json")  # over budget, so 01.json is evicted
+        self.assertListEqual(list(templates.templates), ["00.json", "04.json"])
+        self.assertEqual(templates.nbytes, templates.max_bytes)
@@ -49,3 +49,10 @@ class TestWumpus(unittest.TestCase):
         self.assertAlmostEqual(final_locations[3] / iterations, 0.25, places=1)
 
         sys.stdout = sys.__stdout__
+
+    def test_startle_into_cave_zero(self):
+        """Cave 0 is a cave like any other to move into."""
+        wumpus = hazards.Wumpus({1: cave.Cave(1, [0], coords=())})
+        wumpus.location = 1
+        moves = {type(event) for _ in range(100) for event in wumpus.on_arrow_miss()}
+        self.assertIn(events.WumpusMoved, moves)
@@ -0,0 +1,173 @@
+import unittest
+import importlib.resources
+
+import random
+from random import seed
+
+import wumpus.levels
+from wumpus import Level, PlayerController
+from wumpus.level import CaveSet
+from wumpus.events import WumpusMoved
+from wumpus.hazards import BottomlessPit, Sense, Superbats, Wumpus
+
+
+class TestCaveSet(unittest.TestCase):
+    def test_every(self):
+        """A set made from a count behaves like one made from a list."""
+        rng = random.Random("test")
+        every, listed = CaveSet.every(20), CaveSet(range(20))
+        for _ in range(200):
+            location = rng.randrange(25)
+            if rng.random() < 0.5:
+                every.add(location)
+                listed.add(location)
+            else:
+                every.discard(location)
+                listed.discard(location)
+            self.assertListEqual(list(every), list(listed))
+            self.assertEqual(location in every, location in listed)
+
+        self.assertEqual(
+            every.choice(random.Random(1)), listed.choice(random.Random(1))
+        )
+        with self.assertRaises(IndexError):
+            CaveSet.every(0).choice()
+
+
+class TestHazardIndex(unittest.TestCase):
+    """Checks the incrementally maintained hazard index against a full scan."""
+
+    def setUp(self):
+        level_map = importlib.resources.read_text(wumpus.levels, "00.json")
+        seed("test")
+        self.level = Level(level_map)
+
+    def assertIndexConsistent(self):
+        for location, cave in self.level.level.items():
+            senses = Sense.NONE
+            for hazard in self.level.get_nearby_hazards(cave):
+                senses |= hazard.sense
+            self.assertEqual(self.level.get_nearby_senses(cave), senses, location)
+
+        self.assertSetEqual(
+            set(self.level.empty_caves), set(self.level.level) - set(self.level.hazards)
+        )
+
+        for kind in (BottomlessPit, Superbats, Wumpus):
+            self.assertSetEqual(
+                self.level.hazard_locations[kind],
+                {
+                    location
+                    for location, hazard in self.level.hazards.items()
+                    if type(hazard) is kind
+                },
+            )
+
+    def test_spawn(self):
+        self.assertIndexConsistent()
+        self.assertEqual(len(self.level.hazards), 5)
+        self.assertIsInstance(
+            self.level.hazards[self.level.get_wumpus_location()], Wumpus
+        )
+
+    def test_wumpus_moved(self):
+        for _ in range(50):
+            location = self.level.get_wumpus_location()
+            tunnels = self.level.get_cave(location).tunnels
+            empty = [tunnel for tunnel in tunnels if tunnel not in self.level.hazards]
+            if not empty:
+                continue
+
+            list(self.level.handle_event(WumpusMoved(empty[0])))
+            self.assertEqual(self.level.get_wumpus_location(), empty[0])
+            self.assertNotIn(location, self.level.hazards)
+            self.assertIndexConsistent()
+
+    def test_remove_hazard(self):
+        for hazard in list(self.level.hazards.values()):
+            self.level.remove_hazard(hazard)
+            self.assertIsNone(hazard.location)
+            self.assertIndexConsistent()
+
+        self.assertDictEqual(self.level.senses, {})
+        with self.assertRaises(ValueError):
+            self.level.get_wumpus_location()
+
+    def test_hazard_counts(self):
+        level = Level(self.level.level, pits=5, bats=0)
+        self.assertEqual(len(level.hazard_locations[BottomlessPit]), 5)
+        self.assertEqual(len(level.hazard_locations[Superbats]), 0)
+        with self.assertRaises(ValueError):
+            Level(self.level.level, pits=10, bats=9)
+
+    def test_shared_entrances(self):
+        """Levels on the same map can share its entrances."""
+        entrances = self.level.entrances
+        self.level = Level(self.level.level, entrances=entrances)
+        self.assertIs(self.level.entrances, entrances)
+        self.assertIndexConsistent()
+
+    def test_one_way_tunnels(self):
+        """Hazards are sensed from the caves with tunnels into them."""
+        level_map = importlib.resources.read_text(wumpus.levels, "02.json")
+        for storage in ("dict", "csr"):
+            level = Level(level_map, storage=storage)
+            for hazard in list(level.hazards.values()):
+                level.remove_hazard(hazard)
+
+            # 0 leads to 31 and 31 leads to 2, but neither leads back
+            pit = BottomlessPit(level.level, level.rng)
+            level.place_hazard(pit, 31)
+            self.assertEqual(level.get_nearby_senses(level.get_cave(0)), Sense.PIT)
+            self.assertListEqual(level.get_nearby_hazards(level.get_cave(0)), [pit])
+            self.assertEqual(level.get_nearby_senses(level.get_cave(2)), Sense.NONE)
+
+            level.remove_hazard(pit)
+            self.assertDictEqual(level.senses, {})
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        level_map = importlib.resources.read_text(wumpus.levels, "00.json")
+        seed("test")
+        self.level = Level(level_map)
+        self.player = PlayerController(self.level)
+
+    def state(self):
+        return (
+            dict(self.level.hazards),
+            dict(self.level.senses),
+            self.level.player,
+        )
+
+    def test_restore(self):
+        snapshot = self.level.snapshot()
+        before = self.state()
+
+        # play until the Wumpus has been startled out of its cave
+        wumpus = self.level.get_wumpus_location()
+        while self.level.get_wumpus_location() == wumpus:
+            self.player.move(wumpus)
+            self.player.respawn()
+
+        self.level.restore(snapshot)
+        self.assertEqual(self.state(), before)
+
+        # the random state is restored too, so play continues identically
+        first = self.level.choose_empty_cave()
+        self.level.restore(snapshot)
+        self.assertEqual(self.level.choose_empty_cave(), first)
+
+    def test_snapshot_is_immutable(self):
+        snapshot = self.level.snapshot(random_state=False)
+        self.assertIsNone(snapshot.random_state)
+        with self.assertRaises(AttributeError):
+            snapshot.player = 0  # type: ignore
+
+    def test_spawn_hazards(self):
+        old = list(self.level.spawned)
+        self.level.spawn_hazards()
+
+        self.assertEqual(len(self.level.hazards), 5)
+        self.assertTrue(all(hazard.location is None for hazard in old))
+        self.assertSetEqual(set(self.level.hazards.values()), set(self.level.spawned))
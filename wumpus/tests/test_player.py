@@ -21,44 +21,46 @@ class TestPlayerController(unittest.TestCase):
         self.player = PlayerController(self.level)
 
     def test_spawn(self):
-        self.assertListEqual(self.player.get_nearby_msgs(), ["I feel a draft."])
+        self.assertListEqual(self.player.get_nearby_msgs(), [])
         self.assertIsInstance(self.player.cave, Cave)
-        self.assertEqual(self.player.cave.location, 17)
-        self.assertListEqual(self.player.cave.tunnels, [3, 7, 11])
+        self.assertEqual(self.player.cave.location, 15)
+        self.assertListEqual(self.player.cave.tunnels, [4, 5, 9])
 
     def test_eaten(self):
-        self.player.move(11)
-        self.player.move(5)
-        self.player.move(19)
-        self.player.move(16)
+        self.player.move(9)
+        self.player.move(0)
+        self.player.move(10)
+        self.player.move(2)
+        self.player.move(12)
 
         self.assertFalse(self.player.alive, "Player should be dead.")
         self.assertFalse(self.player.win, "Player should not have won.")
 
     def test_pit(self):
-        self.player.move(7)
+        self.player.move(4)
+        self.player.move(8)
         self.assertFalse(self.player.alive, "Player should be dead.")
         self.assertFalse(self.player.win, "Player should not have won.")
 
         # respawn
         self.player.respawn()
         self.assertEqual(
-            self.player.cave.location, 17, "Player should respawn in the same place."
+            self.player.cave.location, 15, "Player should respawn in the same place."
         )
 
     def test_bats(self):
-        self.player.move(11)
+        self.player.move(9)
         self.player.move(1)
 
         # bats move player to random location
         self.assertEqual(self.player.cave.location, 4)
 
     def test_shoot_self(self):
-        self.player.shoot([11, 17])
+        self.player.shoot([4, 15])
         self.assertFalse(self.player.alive, "Player should be dead.")
         self.assertFalse(self.player.win, "Player should not have won.")
 
     def test_shoot_wumpus(self):
-        self.player.shoot([7, 19, 16])
+        self.player.shoot([9, 0, 10, 2, 12])
         self.assertTrue(self.player.alive, "Player should be alive.")
         self.assertTrue(self.player.win, "Player should have won.")
@@ -0,0 +1,48 @@
+import unittest
+import importlib.resources
+
+import wumpus.levels
+from wumpus import Level, PlayerController
+from wumpus.rng import BufferedGenerator, spawn_rngs
+
+
+class TestBufferedGenerator(unittest.TestCase):
+    def test_state(self):
+        rng = BufferedGenerator(1, buffer_size=8)
+        for _ in range(5):
+            rng.random()
+
+        for _ in range(3):
+            state = rng.getstate()
+            draws = [rng.randrange(100) for _ in range(20)]
+            rng.setstate(state)
+            self.assertListEqual([rng.randrange(100) for _ in range(20)], draws)
+
+    def test_ranges(self):
+        rng = BufferedGenerator(2)
+        draws = {rng.randrange(-2, 3) for _ in range(1000)}
+        self.assertSetEqual(draws, {-2, -1, 0, 1, 2})
+        self.assertIn(rng.choice("abc"), "abc")
+        with self.assertRaises(ValueError):
+            rng.randrange(0)
+
+    def test_spawn(self):
+        first = [rng.random() for rng in spawn_rngs(3, 4)]
+        self.assertListEqual([rng.random() for rng in spawn_rngs(3, 4)], first)
+        self.assertEqual(len(set(first)), 4)
+        self.assertEqual(spawn_rngs(3, 6)[2].random(), first[2])
+
+
+class TestLevelRng(unittest.TestCase):
+    def play(self, rng):
+        level_map = importlib.resources.read_text(wumpus.levels, "00.json")
+        level = Level(level_map, rng=rng)
+        player = PlayerController(level)
+        for _ in range(10):
+            player.shoot([rng.choice(player.cave.tunnels)])
+        return level.snapshot(random_state=False), player.win
+
+    def test_reproducible(self):
+        games = [self.play(rng) for rng in spawn_rngs(0, 8)]
+        self.assertListEqual([self.play(rng) for rng in spawn_rngs(0, 8)], games)
+        self.assertGreater(len({snapshot.hazards for snapshot, _ in games}), 1)
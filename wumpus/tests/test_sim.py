@@ -0,0 +1,77 @@
+import unittest
+import importlib.resources
+
+import numpy as np
+
+import wumpus.levels
+from wumpus.sim import BatchLevel, Cause
+
+
+class TestBatchLevel(unittest.TestCase):
+    def setUp(self):
+        level_map = importlib.resources.read_text(wumpus.levels, "00.json")
+        self.batch = BatchLevel.from_json(level_map, 1000, rng=np.random.default_rng(0))
+        self.tunnels = self.batch.graph
+
+    def test_crowded_spawn(self):
+        batch = BatchLevel(self.batch.graph, 100, np.random.default_rng(0), 9, 9)
+        spawns = np.column_stack([batch.pits, batch.bats, batch.wumpus, batch.player])
+        self.assertTrue((np.sort(spawns, axis=1) == np.arange(20)).all())
+
+    def test_spawn(self):
+        """The player and every hazard start in different caves."""
+        spawns = np.column_stack(
+            [self.batch.pits, self.batch.bats, self.batch.wumpus, self.batch.player]
+        )
+        ordered = np.sort(spawns, axis=1)
+        self.assertFalse((ordered[:, 1:] == ordered[:, :-1]).any())
+        self.assertTrue(self.batch.active.all())
+
+    def test_pit(self):
+        self.batch.move(self.batch.pits[:, 0])
+        self.assertFalse(self.batch.alive.any())
+        self.assertTrue((self.batch.cause == Cause.PIT).all())
+        self.assertTrue((self.batch.moves == 1).all())
+
+        # finished games ignore further moves
+        self.batch.move(self.batch.wumpus)
+        self.assertTrue((self.batch.cause == Cause.PIT).all())
+        self.assertTrue((self.batch.moves == 1).all())
+
+    def test_eaten(self):
+        self.batch.move(self.batch.wumpus.copy())
+        self.assertFalse(self.batch.alive.any())
+        self.assertTrue((self.batch.cause == Cause.WUMPUS).all())
+
+    def test_bats(self):
+        """Snatched players end up somewhere other than a bat cave."""
+        bats = self.batch.bats[:, 0].copy()
+        self.batch.move(bats)
+
+        alive = self.batch.alive
+        self.assertFalse(
+            (self.batch.bats[alive] == self.batch.player[alive, None]).any()
+        )
+        self.assertTrue((self.batch.cause[~alive] != Cause.NONE).all())
+
+    def test_shoot(self):
+        paths = np.column_stack(
+            [self.batch.random_tunnels(self.batch.player), self.batch.wumpus]
+        )
+        self.batch.shoot(paths)
+        # an arrow can only be stopped before the Wumpus by the player's own cave
+        self.assertTrue((self.batch.won | (self.batch.cause == Cause.ARROW)).all())
+        self.assertTrue((self.batch.arrows == 1).all())
+
+    def test_startle(self):
+        """The Wumpus moves through each tunnel or stays with equal chance."""
+        self.batch.player[:] = -1  # keep the player out of the way
+        before = self.batch.wumpus.copy()
+        self.batch.startle(np.ones(self.batch.games, dtype=np.bool_))
+
+        stayed = np.mean(self.batch.wumpus == before)
+        self.assertAlmostEqual(stayed, 0.25, places=1)
+        for old, new in zip(before, self.batch.wumpus):
+            if old != new:
+                self.assertIn(new, self.tunnels[old].tunnels)
+
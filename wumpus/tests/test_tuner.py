@@ -0,0 +1,16 @@
+import unittest
+import importlib.resources
+
+import wumpus.levels
+from wumpus.graph import CaveGraph
+from wumpus.tuner import tune
+
+
+class TestTuner(unittest.TestCase):
+    def test_tune(self):
+        level_map = importlib.resources.read_text(wumpus.levels, "00.json")
+        graph = CaveGraph.from_json(level_map)
+        easy = tune(graph, target=0.5, tolerance=0.1, batch_size=256, max_games=1024)
+        hard = tune(graph, target=0.2, tolerance=0.1, batch_size=256, max_games=1024)
+        self.assertLess(easy.pits + easy.bats, hard.pits + hard.bats)
+        self.assertLess(abs(easy.chosen.win_rate - 0.5), 0.1)
@@ -0,0 +1,297 @@
+"""
+Tunes the number of hazards in a level to hit a target win rate.
+
+Win rates are estimated by playing batches of games in lockstep with
+BatchLevel, using a vectorised version of the cautious bot from
+wumpus.difficulty. Each candidate is tested sequentially: batches are played
+until the win rate's confidence interval is inside the tolerance around the
+target, or clearly above or below it, so candidates that are far off are
+rejected after a single batch. The win rate falls as hazards are added, so the
+hazard count is found by galloping up from no hazards and then binary search.
+
+    python -m wumpus.tuner --target 0.5
+    python -m wumpus.tuner polytope.lvl --target 0.3 --jobs 4
+"""
+
+import argparse
+import importlib.resources
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+import wumpus.levels
+from . import binary
+from .difficulty import wilson
+from .graph import CaveGraph
+from .sim import BatchLevel
+
+
+def play(batch: BatchLevel, max_actions=500) -> npt.NDArray[np.bool_]:
+    """
+    Plays every game in a batch to the end, or until `max_actions`, and
+    returns which games were won.
+
+    Players shoot into a random neighbouring cave when they smell the Wumpus,
+    back away from a draft or bats, and otherwise wander without turning back.
+    """
+    previous = np.full(batch.games, -1, dtype=np.int64)
+    for _ in range(max_actions):
+        if not batch.active.any():
+            break
+
+        tunnels = batch.random_tunnels(batch.player)
+        smell = batch.nearby(batch.wumpus)
+        batch.shoot(tunnels[:, np.newaxis], smell)
+
+        # Try again once when the random tunnel leads back
+        again = batch.random_tunnels(batch.player)
+        tunnels = np.where(tunnels == previous, again, tunnels)
+
+        danger = batch.nearby(batch.pits) | batch.nearby(batch.bats)
+        targets = np.where(danger & (previous >= 0), previous, tunnels)
+        moving = batch.active & ~smell
+        previous = np.where(moving, batch.player, previous)
+        batch.move(targets, moving)
+
+        # Bats drop the player somewhere new, with nowhere to back away to
+        previous[moving & (batch.player != targets)] = -1
+
+    return batch.won.copy()
+
+
+@dataclass
+class Trial:
+    """The games played with one number of hazards."""
+
+    pits: int
+    bats: int
+    games: int = 0
+    wins: int = 0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / max(self.games, 1)
+
+    def interval(self, z: float) -> tuple[float, float]:
+        return wilson(self.wins, self.games, z)
+
+
+def _play_batch(
+    graph: CaveGraph, pits: int, bats: int, games: int, seed: tuple[int, ...]
+) -> int:
+    rng = np.random.default_rng(np.random.SeedSequence(seed[0], spawn_key=seed[1:]))
+    batch = BatchLevel(graph, games, rng, pits, bats)
+    return int(play(batch).sum())
+
+
+def evaluate(
+    graph: CaveGraph,
+    pits: int,
+    bats: int,
+    target: float,
+    tolerance: float,
+    seed=0,
+    batch_size=1024,
+    max_games=32768,
+    z=2.58,
+    executor: Executor | None = None,
+    jobs=1,
+) -> tuple[Trial, int]:
+    """
+    Plays batches of games until the win rate is known to be within
+    `tolerance` of `target`, or to be above or below it. Returns the games
+    played and 0 if the win rate is on target, 1 if it is too high and -1 if
+    it is too low, going by the estimate if `max_games` runs out first.
+
+    Batches are played `jobs` at a time on `executor`, if it is given.
+    """
+    trial = Trial(pits, bats)
+    rounds = 0
+    while trial.games < max_games:
+        seeds = [(seed, pits, bats, rounds * jobs + job) for job in range(jobs)]
+        if executor is None:
+            wins = [_play_batch(graph, pits, bats, batch_size, s) for s in seeds]
+        else:
+            wins = list(
+                executor.map(
+                    _play_batch,
+                    *zip(*[(graph, pits, bats, batch_size, s) for s in seeds]),
+                )
+            )
+        trial.games += batch_size * jobs
+        trial.wins += sum(wins)
+        rounds += 1
+
+        low, high = trial.interval(z)
+        if low >= target - tolerance and high <= target + tolerance:
+            return trial, 0
+        if low > target + tolerance:
+            return trial, 1
+        if high < target - tolerance:
+            return trial, -1
+
+    if abs(trial.win_rate - target) <= tolerance:
+        return trial, 0
+    return trial, 1 if trial.win_rate > target else -1
+
+
+@dataclass
+class Tuning:
+    """The hazard counts chosen for a level, and every trial along the way."""
+
+    pits: int
+    bats: int
+    trials: list[Trial]
+
+    @property
+    def chosen(self) -> Trial:
+        return next(
+            trial
+            for trial in self.trials
+            if (trial.pits, trial.bats) == (self.pits, self.bats)
+        )
+
+
+def tune(
+    graph: CaveGraph,
+    target=0.5,
+    tolerance=0.05,
+    pit_fraction=0.5,
+    jobs=1,
+    **kwargs,
+) -> Tuning:
+    """
+    Finds how many hazards a level needs for the cautious bot to win about
+    `target` of its games, splitting them into pits and bats by
+    `pit_fraction`. Other arguments are passed to `evaluate`.
+    """
+
+    def split(hazards: int) -> tuple[int, int]:
+        pits = round(hazards * pit_fraction)
+        return pits, hazards - pits
+
+    trials: list[Trial] = []
+    # Leave room for the Wumpus and the player
+    most = len(graph) - 2
+
+    executor = ProcessPoolExecutor(jobs) if jobs > 1 else None
+
+    def test(hazards: int) -> int:
+        trial, verdict = evaluate(
+            graph,
+            *split(hazards),
+            target,
+            tolerance,
+            executor=executor,
+            jobs=jobs,
+            **kwargs,
+        )
+        trials.append(trial)
+        return verdict
+
+    try:
+        # Levels usually need few hazards compared to their size, and crowded
+        # levels are slow to simulate, so gallop up from none until the level
+        # is no longer too easy before searching in between
+        low, high = 0, 0
+        while (verdict := test(high)) > 0 and high < most:
+            low = high + 1
+            high = min(2 * high + 1, most)
+
+        if verdict < 0:
+            high -= 1
+            while low <= high:
+                middle = (low + high) // 2
+                verdict = test(middle)
+                if verdict == 0:
+                    break
+                if verdict > 0:
+                    low = middle + 1  # too easy
+                else:
+                    high = middle - 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    best = min(trials, key=lambda trial: abs(trial.win_rate - target))
+    return Tuning(best.pits, best.bats, trials)
+
+
+def load(name: str) -> CaveGraph:
+    """Loads a level from wumpus.levels, or a JSON or binary level file."""
+    path = Path(name)
+    if not path.exists():
+        return CaveGraph.from_json(importlib.resources.read_text(wumpus.levels, name))
+    if path.suffix == ".json":
+        return CaveGraph.from_json(path.read_text())
+    return binary.load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m wumpus.tuner")
+    parser.add_argument(
+        "levels",
+        nargs="*",
+        help="levels in wumpus.levels or level files (default: wumpus.levels)",
+    )
+    parser.add_argument("-t", "--target", type=float, default=0.5)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--pit-fraction", type=float, default=0.5)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--max-games", type=int, default=32768)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("-o", "--output", help="write results to a file")
+    args = parser.parse_args()
+
+    names = args.levels or sorted(
+        resource.name
+        for resource in importlib.resources.files(wumpus.levels).iterdir()
+        if resource.name.endswith(".json")
+    )
+
+    results = {}
+    for name in names:
+        tuning = tune(
+            load(name),
+            args.target,
+            args.tolerance,
+            args.pit_fraction,
+            args.jobs,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            max_games=args.max_games,
+        )
+        chosen = tuning.chosen
+        low, high = chosen.interval(1.96)
+        print(
+            f"{name}: {tuning.pits} pits, {tuning.bats} bats, win rate "
+            f"{chosen.win_rate:.3f} [{low:.3f}, {high:.3f}] after "
+            f"{sum(trial.games for trial in tuning.trials)} games"
+        )
+        results[name] = {
+            "pits": tuning.pits,
+            "bats": tuning.bats,
+            "win_rate": chosen.win_rate,
+            "trials": [
+                {
+                    "pits": trial.pits,
+                    "bats": trial.bats,
+                    "games": trial.games,
+                    "win_rate": trial.win_rate,
+                }
+                for trial in tuning.trials
+            ],
+        }
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            fp.write(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()